@@ -21,11 +21,32 @@ except NameError:
 __version__ = "0.1.0"
 
 if not __ITFIT_IMPORTED__:
+    # Compute core, only needs NumPy and SciPy
     from . import data
-    from . import fit_functions
-    from . import data_selectors
-    from .fitter_app import Fitter
-    from .function_constructor import FunctionBuilder
+    from . import engine
     
+# GUI modules import matplotlib.pyplot and set rcParams. They are imported on first use.
+_LAZY_ = {
+    "fit_functions" : (".fit_functions", None),
+    "data_selectors" : (".data_selectors", None),
+    "utils" : (".utils", None),
+    "plot" : (".plot", None),
+    "Fitter" : (".fitter_app", "Fitter"),
+    "FunctionBuilder" : (".function_constructor", "FunctionBuilder"),
+    "PlotBuilder" : (".plot", "PlotBuilder"),
+}
+
+def __getattr__(name: str):
+    if name not in _LAZY_:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    module_name, attribute = _LAZY_[name]
+    module = importlib.import_module(module_name, __name__)
+    value = module if attribute is None else getattr(module, attribute)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_))
     
 __ITFIT_IMPORTED__ = True
\ No newline at end of file
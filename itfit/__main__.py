@@ -0,0 +1,30 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Import time checks for the itfit package. Run with `python -m itfit`."""
+import subprocess
+import sys
+
+
+if __name__=='__main__':
+    # The compute core must import without matplotlib, and pyplot must load only with the GUI
+    check = ("import sys, itfit\n"
+             "from itfit.utils import FitResultContainer, FitCollection\n"
+             "from itfit.engine import ModelDescriptor\n"
+             "assert not [m for m in sys.modules if m.startswith('matplotlib')], 'compute core imports matplotlib'\n"
+             "itfit.Fitter\n"
+             "assert 'matplotlib.pyplot' in sys.modules, 'lazy Fitter import error'\n")
+    assert subprocess.run([sys.executable, "-c", check]).returncode == 0, "import time regression"
+    print("All tests OK")
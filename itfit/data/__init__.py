@@ -20,5 +20,9 @@ except NameError:
 
 if not __FITTER_DATA_CLASSES_IMPORTED__:
     from .data_classes import  DataContainer, DataSelection
+    from .streaming import StreamingDataSelection
+    from .loaders import load_csv
+    from .filters import Filter, FilterStage, FilterPipeline
+    from .spatial import GridIndex, points_in_polygon
     
 __FITTER_DATA_CLASSES_IMPORTED__ = True
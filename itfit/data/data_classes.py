@@ -13,15 +13,19 @@
 # limitations under the License.
 
 from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.collections import RegularPolyCollection
 
 import numpy as np
-from matplotlib.collections import RegularPolyCollection
-from matplotlib.axes import Axes
+
+from .spatial import GridIndex
 
 class DataContainer:
     """Container for data.
     """
-    def __init__(self, xdata: list, ydata: list, yerr: list|None=None, xerr: list|None=None):
+    def __init__(self, xdata: list, ydata: list, yerr: list|None=None, xerr: list|None=None, copy: bool=True):
         """Creates a DataContainer.
 
         Parameters:
@@ -33,11 +37,15 @@ class DataContainer:
                 Error en y data. Defaults to None.
             xerr (list | None, optional): 
                 Error in x data. Defaults to None.
+            copy (bool, optional):
+                If False and data are already arrays, they are used without copying. Defaults to True.
         """
-        self.xdata = np.array(xdata).copy()
-        self.ydata = np.array(ydata).copy()
-        self.xerr  = np.array(xerr).copy() if xerr is not None else None
-        self.yerr  = np.array(yerr).copy() if yerr is not None else None
+        _array = np.array if copy else np.asarray
+        self.xdata = _array(xdata)
+        self.ydata = _array(ydata)
+        self.xerr  = _array(xerr) if xerr is not None else None
+        self.yerr  = _array(yerr) if yerr is not None else None
+        self.version = 0 # Increased when data changes. Used to invalidate caches.
         
     def length(self):
         """Returns lenght of data.
@@ -48,6 +56,20 @@ class DataContainer:
         """
         return self.xdata.size
     
+    def get_grid_index(self):
+        """Returns a bucket grid index of the data, used for region queries. It is cached until data changes.
+
+        Returns:
+            (itfit.data.spatial.GridIndex):
+                Index of the data.
+        """
+        key = (self.version, self.length())
+        cached = getattr(self, "_grid_index_", None)
+        if cached is None or cached[0] != key:
+            cached = (key, GridIndex(self.xdata, self.ydata))
+            self._grid_index_ = cached
+        return cached[1]
+
     def get_data(self):
         """Returns data. As list of tuples: `lenght x 2`.
 
@@ -68,8 +90,8 @@ class DataContainer:
 
         
 class DataSelection(DataContainer):
-    def __init__(self, xdata, ydata, yerr: list|None=None, xerr: list|None=None):
-        super().__init__(xdata, ydata, yerr=yerr, xerr=xerr)
+    def __init__(self, xdata, ydata, yerr: list|None=None, xerr: list|None=None, copy: bool=True):
+        super().__init__(xdata, ydata, yerr=yerr, xerr=xerr, copy=copy)
         self.indexes_used = np.ones(len(self.xdata), dtype=bool)  
 
         self._was_plotted: bool = False
@@ -81,6 +103,8 @@ class DataSelection(DataContainer):
         """
         if self._was_plotted:
             return
+        # Imported here, data containers must not need matplotlib
+        from matplotlib.collections import RegularPolyCollection
         self._was_plotted = True
         self._axes = ax
 
@@ -94,6 +118,19 @@ class DataSelection(DataContainer):
         
         self.collection_ = self._axes.add_collection(self.collection)
 
+    def __getstate__(self):
+        """Drops figure objects and caches, so the data pickles detached from the figure."""
+        state = self.__dict__.copy()
+        for key in ("collection", "collection_", "collection_facecolors", "_axes", "_grid_index_"):
+            state.pop(key, None)
+        state["_was_plotted"] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.collection = None
+        self._axes = None
+
     def _update_poly(self):
         """Updates poly collection colors.
         """
@@ -0,0 +1,301 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .data_classes import DataContainer
+
+import weakref
+
+import numpy as np
+
+
+class Filter:
+    """Base class of data filters. A filter produces a boolean mask over a DataContainer.
+    Masks are cached and only recomputed when the data version or the filter itself changes.
+    Filters can be combined with `&`, `|` and `~`.
+    """
+    def __init__(self):
+        self._cache_key_ = None
+        self._data_ref_: weakref.ref|None = None # Ids of freed containers can be reused, so data is compared by identity
+        self._mask_: np.ndarray|None = None
+        self.generation: int = 0
+
+    def _evaluate_(self, data: DataContainer) -> np.ndarray:
+        """Computes the mask. Must be implemented by subclasses."""
+        ...
+
+    def _state_(self):
+        """Key of the filter state. Mask is recomputed when it changes."""
+        return None
+
+    def mask(self, data: DataContainer):
+        """Returns the boolean mask of `data`, from cache if nothing changed.
+
+        Parameters:
+            data (itfit.data.DataContainer):
+                Data to filter.
+
+        Returns:
+            (NDArray[bool]):
+                True for data that passes the filter.
+        """
+        key = (data.version, data.length(), self._state_())
+        cached_data = self._data_ref_() if self._data_ref_ is not None else None
+        if cached_data is not data or key != self._cache_key_:
+            self._mask_ = np.asarray(self._evaluate_(data), dtype=bool)
+            self._cache_key_ = key
+            self._data_ref_ = weakref.ref(data)
+            self.generation += 1
+        return self._mask_
+
+    def invalidate(self):
+        """Forces the mask to be computed again on next use."""
+        self._cache_key_ = None
+        self._data_ref_ = None
+
+    def __getstate__(self):
+        """Drops the cached mask, weak references can not be pickled."""
+        state = self.__dict__.copy()
+        state.update(_cache_key_=None, _data_ref_=None, _mask_=None)
+        state.pop("_data_", None)
+        return state
+
+    def __and__(self, other: Filter):
+        return FilterAnd(self, other)
+
+    def __or__(self, other: Filter):
+        return FilterOr(self, other)
+
+    def __invert__(self):
+        return FilterNot(self)
+
+
+class FilterStage(Filter):
+    """Filter defined by a function with signature `f(x, y) -> list[bool]`."""
+    def __init__(self, function):
+        """Creates a FilterStage.
+
+        Parameters:
+            function (callable):
+                Filter function. Must have signature `def f(x, y) -> list[bool]`.
+        """
+        super().__init__()
+        self.function = function
+        self._version_ = 0
+
+    def set_function(self, function):
+        """Replaces the filter function. Only this stage is evaluated again.
+
+        Parameters:
+            function (callable):
+                Filter function. Must have signature `def f(x, y) -> list[bool]`.
+        """
+        self.function = function
+        self._version_ += 1
+
+    def _state_(self):
+        return self._version_
+
+    def _evaluate_(self, data: DataContainer):
+        return self.function(data.xdata, data.ydata)
+
+
+class _FilterOperation_(Filter):
+    """Filter that combines the masks of other filters. Only the bitwise operation is recomputed when a child changes."""
+    def __init__(self, *filters: Filter):
+        super().__init__()
+        self.filters = [f if isinstance(f, Filter) else FilterStage(f) for f in filters]
+        self._data_ = None
+
+    def mask(self, data: DataContainer):
+        self._data_ = data
+        return super().mask(data)
+
+    def _state_(self):
+        # Children masks are refreshed here so their generation is up to date
+        for f in self.filters:
+            f.mask(self._data_)
+        return tuple(f.generation for f in self.filters)
+
+
+class FilterAnd(_FilterOperation_):
+    """Data passes if it passes both filters."""
+    def _evaluate_(self, data: DataContainer):
+        return np.logical_and(self.filters[0].mask(data), self.filters[1].mask(data))
+
+
+class FilterOr(_FilterOperation_):
+    """Data passes if it passes any of the filters."""
+    def _evaluate_(self, data: DataContainer):
+        return np.logical_or(self.filters[0].mask(data), self.filters[1].mask(data))
+
+
+class FilterNot(_FilterOperation_):
+    """Data passes if it does not pass the filter."""
+    def _evaluate_(self, data: DataContainer):
+        return np.logical_not(self.filters[0].mask(data))
+
+
+class FilterPipeline(Filter):
+    """Named collection of filter stages. By default data must pass every stage.
+    Stages can be combined differently setting `expression`:
+```py
+pipeline = FilterPipeline()
+pipeline["range"] = lambda x, y: (x > 0) & (x < 10)
+pipeline["nan"] = lambda x, y: ~np.isnan(y)
+pipeline["outliers"] = lambda x, y: np.abs(y - np.median(y)) > 5
+pipeline.expression = pipeline["range"] & pipeline["nan"] & ~pipeline["outliers"]
+```
+    Replacing a stage function keeps the stage object, so expressions stay valid and only that stage is evaluated again.
+    Stages that are not a FilterStage, or are replaced by a Filter, are swapped for the new object instead, and
+    expressions using them must be set again.
+    """
+    def __init__(self):
+        super().__init__()
+        self.stages: dict[str, FilterStage] = {}
+        self._expression_: Filter|None = None
+        self._combined_: Filter|None = None
+        self._data_ = None
+
+    def __setitem__(self, name: str, function):
+        if isinstance(self.stages.get(name), FilterStage) and not isinstance(function, Filter):
+            self.stages[name].set_function(function)
+        else:
+            self.stages[name] = function if isinstance(function, Filter) else FilterStage(function)
+            self._combined_ = None
+
+    def __getitem__(self, name: str):
+        return self.stages[name]
+
+    def __delitem__(self, name: str):
+        self.stages.pop(name)
+        self._combined_ = None
+
+    def __contains__(self, name: str):
+        return name in self.stages
+
+    def set_stage(self, name: str, function):
+        """Adds or replaces a stage.
+
+        Parameters:
+            name (str):
+                Stage name.
+            function (callable | Filter):
+                Filter function with signature `def f(x, y) -> list[bool]`, or a Filter.
+        """
+        self[name] = function
+
+    def remove_stage(self, name: str):
+        """Removes a stage.
+
+        Parameters:
+            name (str):
+                Stage name.
+        """
+        del self[name]
+
+    @property
+    def expression(self):
+        return self._expression_
+
+    @expression.setter
+    def expression(self, expression: Filter|None):
+        self._expression_ = expression
+        self._combined_ = None
+
+    def _get_combined_(self):
+        """Filter evaluated by the pipeline: `expression` or the AND of all stages."""
+        if self._expression_ is not None:
+            return self._expression_
+        if self._combined_ is None:
+            stages = list(self.stages.values())
+            combined = stages[0] if stages else None
+            for stage in stages[1:]:
+                combined = combined & stage
+            self._combined_ = combined
+        return self._combined_
+
+    def mask(self, data: DataContainer):
+        self._data_ = data
+        return super().mask(data)
+
+    def _state_(self):
+        combined = self._get_combined_()
+        if combined is None:
+            return None
+        combined.mask(self._data_)
+        return (id(combined), combined.generation)
+
+    def _evaluate_(self, data: DataContainer):
+        combined = self._get_combined_()
+        if combined is None:
+            return np.ones(data.length(), dtype=bool)
+        return combined.mask(data)
+
+
+if __name__=='__main__':
+    from .data_classes import DataSelection
+
+    calls = {"range": 0, "nan": 0}
+    def counted(name, function):
+        def f(x, y):
+            calls[name] += 1
+            return function(x, y)
+        return f
+
+    x = np.linspace(0, 10, 11)
+    y = x.copy()
+    y[3] = np.nan
+    data = DataSelection(x, y)
+
+    pipeline = FilterPipeline()
+    pipeline["range"] = counted("range", lambda x, y: x < 8)
+    pipeline["nan"] = counted("nan", lambda x, y: ~np.isnan(y))
+    mask = pipeline.mask(data)
+    assert mask.sum() == 7 and not mask[3]                          , "pipeline mask error"
+    pipeline.mask(data)
+    assert calls == {"range": 1, "nan": 1}                          , "cached mask evaluated again"
+
+    pipeline["range"] = counted("range", lambda x, y: x < 5)
+    assert pipeline.mask(data).sum() == 4                           , "replaced stage mask error"
+    assert calls == {"range": 2, "nan": 1}                          , "only the replaced stage must be evaluated"
+
+    data.version += 1
+    pipeline.mask(data)
+    assert calls == {"range": 3, "nan": 2}                          , "data version change not detected"
+
+    expression = ~pipeline["range"] | pipeline["nan"]
+    pipeline.expression = expression
+    assert (pipeline.mask(data) == (x >= 5) | ~np.isnan(y)).all()   , "expression mask error"
+    assert calls == {"range": 3, "nan": 2}                          , "expression evaluated cached stages again"
+    pipeline.expression = pipeline["range"] & ~pipeline["nan"]
+    assert (pipeline.mask(data) == (x < 5) & np.isnan(y)).all()     , "operators mask error"
+    assert calls == {"range": 3, "nan": 2}                          , "operators evaluated cached stages again"
+
+    # A new container can get the id, version and length of a freed one, it must not get its mask
+    def positive(x, y):
+        return y > 0
+    stage = FilterStage(positive)
+    other = DataSelection(x, x)
+    for sign in (-1, 1)*10:
+        del other
+        other = DataSelection(x, sign*x)
+        assert stage.mask(other).sum() == (10 if sign > 0 else 0)   , "stale mask of a freed container"
+
+    import pickle
+    copy = pickle.loads(pickle.dumps(stage))
+    assert copy._data_ref_ is None and (copy.mask(data) == (y > 0)).all(), "pickle error"
+    print("All tests OK")
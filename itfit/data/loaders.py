@@ -0,0 +1,185 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import io
+import mmap
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .data_classes import DataSelection
+
+_NEWLINE_ = ord('\n')
+
+
+def _line_starts_(buffer, skiprows: int):
+    """Returns the offset of the first byte after skipping `skiprows` lines."""
+    offset = 0
+    for _ in range(skiprows):
+        offset = buffer.find(b'\n', offset) + 1
+        if offset == 0:
+            return len(buffer)
+    return offset
+
+
+def _split_ranges_(buffer, start: int, chunk_size: int):
+    """Splits `buffer[start:]` in byte ranges of about `chunk_size` bytes that end on a newline."""
+    ranges = []
+    size = len(buffer)
+    while start < size:
+        stop = buffer.find(b'\n', min(start + chunk_size, size) - 1)
+        stop = size if stop == -1 else stop + 1
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _count_rows_(buffer, start: int, stop: int):
+    """Counts lines in `buffer[start:stop]` without copying it."""
+    chunk = np.frombuffer(buffer, dtype=np.uint8, count=stop-start, offset=start)
+    rows = int(np.count_nonzero(chunk == _NEWLINE_))
+    if stop > start and chunk[-1] != _NEWLINE_:
+        rows += 1
+    return rows
+
+
+def load_csv(path, xcol: int, ycol: int, yerr_col: int|None=None, xerr_col: int|None=None, *,
+             delimiter: str=',', skiprows: int=0, comments: str|None='#', dtype=np.float64,
+             chunk_size: int=2**26, threads: int=1):
+    """Loads columns of a delimited text file into a DataSelection.
+    The file is memory mapped and split in byte ranges aligned to line ends. Rows are counted first so one
+    row-major output block is allocated once. Each range is decoded from the map and parsed by `numpy.loadtxt`
+    into a temporary array of at most `chunk_size` bytes of text, whose rows are copied into its slice of the
+    output. Ranges can be parsed in parallel threads. The returned columns are strided views of the output block.
+
+    Parameters:
+        path (str | os.PathLike):
+            File to load.
+        xcol (int):
+            Column index of x data.
+        ycol (int):
+            Column index of y data.
+        yerr_col (int | None, optional):
+            Column index of y errors. Defaults to None.
+        xerr_col (int | None, optional):
+            Column index of x errors. Defaults to None.
+        delimiter (str, optional):
+            Column delimiter. Defaults to ','.
+        skiprows (int, optional):
+            Number of header lines to skip. Defaults to 0.
+        comments (str | None, optional):
+            Lines starting with this string are ignored. Defaults to '#'.
+        dtype (numpy.dtype, optional):
+            Type of output arrays. Defaults to numpy.float64.
+        chunk_size (int, optional):
+            Approximate size in bytes of each parsed range. Defaults to 64 MiB.
+        threads (int, optional):
+            Number of threads used to parse ranges. Defaults to 1.
+
+    Returns:
+        (itfit.data.DataSelection):
+            Data loaded, not copied.
+    """
+    columns = [c for c in (xcol, ycol, yerr_col, xerr_col) if c is not None]
+
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            buffer = b''
+        else:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            ranges = _split_ranges_(buffer, _line_starts_(buffer, skiprows), chunk_size)
+
+            with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+                counts = list(executor.map(lambda r: _count_rows_(buffer, *r), ranges))
+                offsets = np.concatenate(([0], np.cumsum(counts, dtype=int)))
+                # Row-major, so each parsed range is one contiguous copy
+                output = np.empty((int(offsets[-1]), len(columns)), dtype=dtype)
+
+                def parse(i):
+                    start, stop = ranges[i]
+                    with memoryview(buffer) as view:
+                        text = str(view[start:stop], 'utf-8')
+                    values = np.loadtxt(io.StringIO(text), delimiter=delimiter, comments=comments,
+                                        usecols=columns, dtype=dtype, ndmin=2)
+                    output[offsets[i]:offsets[i]+values.shape[0]] = values
+                    return values.shape[0]
+
+                # Ranges with only comments or blank lines parse to nothing, which is expected here.
+                # The filter is set from this thread because warning filters are process wide.
+                with warnings.catch_warnings():
+                    warnings.filterwarnings("ignore", message="loadtxt: input contained no data")
+                    parsed = list(executor.map(parse, range(len(ranges))))
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+    # Comments and blank lines are counted but not parsed, close the gaps they leave
+    if sum(parsed) != offsets[-1]:
+        position = 0
+        for i, n in enumerate(parsed):
+            output[position:position+n] = output[offsets[i]:offsets[i]+n]
+            position += n
+        output = output[:position]
+
+    columns_data = iter(output.T)
+    xdata = next(columns_data)
+    ydata = next(columns_data)
+    yerr = next(columns_data) if yerr_col is not None else None
+    xerr = next(columns_data) if xerr_col is not None else None
+    return DataSelection(xdata, ydata, yerr=yerr, xerr=xerr, copy=False)
+
+
+if __name__=='__main__':
+    import tempfile
+
+    lines = ["x,y,e,f", "# header comment"]
+    for i in range(200):
+        lines.append(f"{i},{2*i+0.5},{i%7},{-i}")
+        if i % 37 == 0:
+            lines.append("")
+        if i == 120:
+            lines.extend(["#" + "c"*40]*20) # several chunks of only comments
+    lines.append("# trailing comment")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.csv")
+        with open(path, "w") as file:
+            file.write("\n".join(lines))
+        expected = np.loadtxt(path, delimiter=',', skiprows=1, usecols=(0, 1, 2, 3))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            for threads in (1, 3):
+                for chunk_size in (2**26, 64):
+                    data = load_csv(path, 0, 1, 2, 3, skiprows=1, chunk_size=chunk_size, threads=threads)
+                    assert data.length() == expected.shape[0]                     , "row count error"
+                    assert (data.xdata == expected[:, 0]).all()                     , "x column error"
+                    assert (data.ydata == expected[:, 1]).all()                     , "y column error"
+                    assert (data.yerr == expected[:, 2]).all()                      , "y error column error"
+                    assert (data.xerr == expected[:, 3]).all()                      , "x error column error"
+
+        data = load_csv(path, 1, 0, skiprows=1, chunk_size=64, dtype=np.float32)
+        assert data.xdata.dtype == np.float32 and (data.xdata == expected[:, 1].astype(np.float32)).all(), "dtype error"
+        assert data.yerr is None and data.xerr is None                              , "optional columns error"
+
+        empty = os.path.join(directory, "empty.csv")
+        open(empty, "w").close()
+        assert load_csv(empty, 0, 1).length() == 0                                  , "empty file error"
+    print("All tests OK")
@@ -0,0 +1,151 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class GridIndex:
+    """Uniform grid of buckets over the data bounding box. Points are sorted by bucket, so the points of
+    any rectangle of buckets are found with a few contiguous slices instead of scanning the whole dataset.
+    Non finite points are never returned.
+    """
+    def __init__(self, xdata, ydata, points_per_cell: int=16, max_cells: int=1024):
+        """Creates a GridIndex.
+
+        Parameters:
+            xdata (NDArray[float]):
+                x data.
+            ydata (NDArray[float]):
+                y data.
+            points_per_cell (int, optional):
+                Average number of points per bucket. Defaults to 16.
+            max_cells (int, optional):
+                Maximum number of buckets per axis. Defaults to 1024.
+        """
+        xdata = np.asarray(xdata, dtype=float)
+        ydata = np.asarray(ydata, dtype=float)
+        finite = np.isfinite(xdata) & np.isfinite(ydata)
+
+        self.cells = int(np.clip(np.sqrt(xdata.size/points_per_cell), 1, max_cells))
+        if finite.any():
+            self.xmin, self.xmax = xdata[finite].min(), xdata[finite].max()
+            self.ymin, self.ymax = ydata[finite].min(), ydata[finite].max()
+        else:
+            self.xmin = self.xmax = self.ymin = self.ymax = 0.
+
+        with np.errstate(invalid='ignore'):
+            cx = self._cell_(xdata, self.xmin, self.xmax)
+            cy = self._cell_(ydata, self.ymin, self.ymax)
+        cell = cx*self.cells + cy
+        cell[~finite] = self.cells**2 # Extra bucket, never queried
+
+        self.order = np.argsort(cell)
+        self.bounds = np.zeros(self.cells**2 + 2, dtype=np.intp)
+        np.cumsum(np.bincount(cell, minlength=self.cells**2 + 1), out=self.bounds[1:])
+
+    def _cell_(self, values, vmin, vmax):
+        """Bucket coordinate of `values` along one axis."""
+        scale = self.cells/(vmax - vmin) if vmax > vmin else 0.
+        cell = ((values - vmin)*scale).astype(np.intp)
+        np.clip(cell, 0, self.cells - 1, out=cell)
+        return cell
+
+    def in_box(self, xmin: float, xmax: float, ymin: float, ymax: float):
+        """Indexes of the points in the buckets that overlap a rectangle. Some of them may lie outside of it.
+
+        Parameters:
+            xmin (float):
+                Rectangle left side.
+            xmax (float):
+                Rectangle right side.
+            ymin (float):
+                Rectangle bottom side.
+            ymax (float):
+                Rectangle top side.
+        Returns:
+            (NDArray[int]):
+                Indexes in the original data.
+        """
+        if xmax < self.xmin or xmin > self.xmax or ymax < self.ymin or ymin > self.ymax:
+            return np.empty(0, dtype=np.intp)
+        cx0, cx1 = self._cell_(np.array([xmin, xmax]), self.xmin, self.xmax)
+        cy0, cy1 = self._cell_(np.array([ymin, ymax]), self.ymin, self.ymax)
+
+        # Buckets of one x column with consecutive y are contiguous
+        columns = np.arange(cx0, cx1 + 1)*self.cells
+        starts = self.bounds[columns + cy0]
+        stops = self.bounds[columns + cy1 + 1]
+        return np.concatenate([self.order[a:b] for a, b in zip(starts, stops)])
+
+
+def points_in_polygon(verts, xdata, ydata, index: GridIndex|None=None, *, chunk_size: int=2**18, threads: int=1):
+    """Boolean mask of the points inside a polygon.
+    Points are first filtered by the polygon bounding box, using `index` buckets if given.
+    Only the remaining candidates are tested with `matplotlib.path.Path.contains_points`, in chunks.
+
+    Parameters:
+        verts (NDArray[float]):
+            Polygon vertices, shape (M, 2).
+        xdata (NDArray[float]):
+            x data.
+        ydata (NDArray[float]):
+            y data.
+        index (GridIndex | None, optional):
+            Index of the data. Defaults to None, a linear scan.
+        chunk_size (int, optional):
+            Points tested per `contains_points` call. Defaults to 2**18.
+        threads (int, optional):
+            Number of threads used to test chunks. Defaults to 1.
+
+    Returns:
+        (NDArray[bool]):
+            True for points inside the polygon.
+    """
+    xdata = np.asarray(xdata)
+    ydata = np.asarray(ydata)
+    verts = np.asarray(verts, dtype=float)
+    inside = np.zeros(xdata.size, dtype=bool)
+    if verts.shape[0] < 3:
+        return inside
+
+    (xmin, ymin), (xmax, ymax) = verts.min(axis=0), verts.max(axis=0)
+    if index is not None:
+        candidates = index.in_box(xmin, xmax, ymin, ymax)
+        x, y = xdata[candidates], ydata[candidates]
+        candidates = candidates[(x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)]
+    else:
+        candidates = np.flatnonzero((xdata >= xmin) & (xdata <= xmax) & (ydata >= ymin) & (ydata <= ymax))
+    if candidates.size == 0:
+        return inside
+
+    from matplotlib import path # Only needed here, importing the module does not load matplotlib
+    polygon = path.Path(verts)
+    points = np.empty((candidates.size, 2))
+    points[:, 0] = xdata[candidates]
+    points[:, 1] = ydata[candidates]
+
+    chunks = [slice(i, i+chunk_size) for i in range(0, candidates.size, chunk_size)]
+    test = lambda sl: polygon.contains_points(points[sl])
+    if threads > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(test, chunks))
+    else:
+        results = [test(sl) for sl in chunks]
+
+    inside[candidates] = np.concatenate(results)
+    return inside
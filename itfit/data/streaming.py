@@ -0,0 +1,342 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+
+from .data_classes import DataSelection
+
+
+class StreamingDataSelection(DataSelection):
+    """DataSelection that accepts new samples after creation.
+
+    Samples are stored in preallocated buffers. Without `maxlen` the buffers double their size when full,
+    so `append` is amortized O(1). With `maxlen` the buffers behave as a ring buffer that keeps only the
+    last `maxlen` samples. In both cases `xdata`, `ydata`, `yerr`, `xerr` and `indexes_used` are contiguous
+    views in chronological order, so the rest of itfit can use them as with a regular DataSelection.
+    """
+    _INITIAL_CAPACITY_ = 1024
+
+    def __init__(self, xdata=(), ydata=(), yerr: list|None=None, xerr: list|None=None, *, maxlen: int|None=None, select_new: bool=True):
+        """Creates a StreamingDataSelection.
+
+        Parameters:
+            xdata (list[float], optional):
+                Initial x data. Defaults to no data.
+            ydata (list[float], optional):
+                Initial y data. Defaults to no data.
+            yerr (list | None, optional):
+                Initial error in y data. If given, all appended samples must carry an y error. Defaults to None.
+            xerr (list | None, optional):
+                Initial error in x data. If given, all appended samples must carry a x error. Defaults to None.
+            maxlen (int | None, optional):
+                Capacity of the ring buffer. If None the container grows without limit. Defaults to None.
+            select_new (bool, optional):
+                Whether appended samples are selected. Defaults to True.
+        """
+        if maxlen is not None and maxlen < 1:
+            raise Exception("maxlen must be a positive integer.")
+
+        self.maxlen = maxlen
+        self.select_new = select_new
+        self.version: int = 0
+
+        self._has_yerr_ = yerr is not None
+        self._has_xerr_ = xerr is not None
+
+        # Ring buffers are mirrored: every sample is written at `i` and `i + maxlen`,
+        # so the last `maxlen` samples are always a contiguous slice.
+        self._capacity_ = maxlen if maxlen is not None else self._INITIAL_CAPACITY_
+        _size = 2*self._capacity_ if maxlen is not None else self._capacity_
+        self._xbuffer_ = np.empty(_size)
+        self._ybuffer_ = np.empty(_size)
+        self._yerrbuffer_ = np.empty(_size) if self._has_yerr_ else None
+        self._xerrbuffer_ = np.empty(_size) if self._has_xerr_ else None
+        self._selection_buffer_ = np.zeros(_size, dtype=bool)
+
+        self._start_ = 0
+        self._length_ = 0
+        self._total_appended_ = 0
+
+        self.connection_callbacks = {}
+        self._cid_counter_ = itertools.count()
+
+        self._was_plotted: bool = False
+        self.collection = None
+        self._axes = None
+
+        if len(xdata):
+            self.extend(xdata, ydata, yerr=yerr, xerr=xerr)
+
+    @property
+    def xdata(self):
+        return self._xbuffer_[self._start_:self._start_+self._length_]
+
+    @property
+    def ydata(self):
+        return self._ybuffer_[self._start_:self._start_+self._length_]
+
+    @property
+    def yerr(self):
+        if self._yerrbuffer_ is None:
+            return None
+        return self._yerrbuffer_[self._start_:self._start_+self._length_]
+
+    @property
+    def xerr(self):
+        if self._xerrbuffer_ is None:
+            return None
+        return self._xerrbuffer_[self._start_:self._start_+self._length_]
+
+    @property
+    def indexes_used(self):
+        return self._selection_buffer_[self._start_:self._start_+self._length_]
+
+    @indexes_used.setter
+    def indexes_used(self, indexes_used):
+        self.indexes_used[:] = indexes_used
+
+    def length(self):
+        """Returns lenght of data.
+
+        Returns:
+            (int):
+                lenght of data.
+        """
+        return self._length_
+
+    def total_appended(self):
+        """Returns the number of samples appended since creation, including those dropped by the ring buffer.
+
+        Returns:
+            (int):
+                Number of samples appended.
+        """
+        return self._total_appended_
+
+    def _grow_(self, needed: int):
+        """Doubles the buffers size until `needed` samples fit."""
+        new_capacity = self._capacity_
+        while new_capacity < needed:
+            new_capacity *= 2
+
+        def _resize(buffer):
+            if buffer is None:
+                return None
+            new_buffer = np.empty(new_capacity, dtype=buffer.dtype)
+            new_buffer[:self._length_] = buffer[:self._length_]
+            return new_buffer
+
+        self._xbuffer_ = _resize(self._xbuffer_)
+        self._ybuffer_ = _resize(self._ybuffer_)
+        self._yerrbuffer_ = _resize(self._yerrbuffer_)
+        self._xerrbuffer_ = _resize(self._xerrbuffer_)
+        self._selection_buffer_ = _resize(self._selection_buffer_)
+        self._capacity_ = new_capacity
+
+    def _sync_mirror_(self):
+        """Copies the visible selection into its mirror. Selection changes are made through the
+        `indexes_used` view, which only touches one of the two copies."""
+        s, L, m = self._start_, self._length_, self.maxlen
+        head = min(L, m - s)
+        self._selection_buffer_[s+m:s+m+head] = self._selection_buffer_[s:s+head]
+        if L > head:
+            self._selection_buffer_[:L-head] = self._selection_buffer_[m:m+L-head]
+
+    def _write_(self, position: int, x, y, yerr, xerr, selected):
+        """Writes samples starting at buffer `position`. In ring mode also writes the mirror."""
+        positions = [position] if self.maxlen is None else [position, position+self.maxlen]
+        for p in positions:
+            sl = slice(p, p+len(x))
+            self._xbuffer_[sl] = x
+            self._ybuffer_[sl] = y
+            if self._yerrbuffer_ is not None:
+                self._yerrbuffer_[sl] = yerr
+            if self._xerrbuffer_ is not None:
+                self._xerrbuffer_[sl] = xerr
+            self._selection_buffer_[sl] = selected
+
+    def extend(self, xdata, ydata, yerr=None, xerr=None):
+        """Appends several samples at once.
+
+        Parameters:
+            xdata (list[float]):
+                x data.
+            ydata (list[float]):
+                y data.
+            yerr (list | None, optional):
+                Error in y data. Defaults to None.
+            xerr (list | None, optional):
+                Error in x data. Defaults to None.
+
+        Raises:
+            ValueError: If the container was created with errors and they are not given.
+        """
+        xdata = np.atleast_1d(np.asarray(xdata, dtype=float))
+        ydata = np.atleast_1d(np.asarray(ydata, dtype=float))
+        if xdata.shape != ydata.shape:
+            raise Exception("xdata and ydata must have the same length.")
+        if yerr is not None and self._yerrbuffer_ is None:
+            raise Exception("This container was created without y errors.")
+        if xerr is not None and self._xerrbuffer_ is None:
+            raise Exception("This container was created without x errors.")
+
+        n = xdata.size
+        if n == 0:
+            return
+        # Missing errors would reach the fits as `sigma`
+        if yerr is None and self._yerrbuffer_ is not None:
+            raise ValueError("This container was created with y errors, yerr must be given.")
+        if xerr is None and self._xerrbuffer_ is not None:
+            raise ValueError("This container was created with x errors, xerr must be given.")
+
+        if self.maxlen is None:
+            if self._length_ + n > self._capacity_:
+                self._grow_(self._length_ + n)
+            self._write_(self._length_, xdata, ydata, yerr, xerr, self.select_new)
+            self._length_ += n
+        else:
+            self._sync_mirror_()
+            # Only the last `maxlen` samples can survive
+            if n > self.maxlen:
+                xdata, ydata = xdata[-self.maxlen:], ydata[-self.maxlen:]
+                yerr = np.atleast_1d(yerr)[-self.maxlen:] if yerr is not None else None
+                xerr = np.atleast_1d(xerr)[-self.maxlen:] if xerr is not None else None
+                self._total_appended_ += n - self.maxlen
+                n = self.maxlen
+
+            end = (self._start_ + self._length_) % self.maxlen
+            first = min(n, self.maxlen - end)
+            _slice = lambda a, s: a[s] if (a is not None and np.ndim(a)) else a
+            self._write_(end, xdata[:first], ydata[:first], _slice(yerr, slice(None, first)), _slice(xerr, slice(None, first)), self.select_new)
+            if first < n:
+                self._write_(0, xdata[first:], ydata[first:], _slice(yerr, slice(first, None)), _slice(xerr, slice(first, None)), self.select_new)
+
+            dropped = max(0, self._length_ + n - self.maxlen)
+            self._start_ = (self._start_ + dropped) % self.maxlen
+            self._length_ = min(self._length_ + n, self.maxlen)
+
+        self._total_appended_ += n
+        self.version += 1
+        self._update_poly()
+
+        for function in self.connection_callbacks.values():
+            function(self)
+
+    def append(self, x: float, y: float, yerr: float|None=None, xerr: float|None=None):
+        """Appends one sample.
+
+        Parameters:
+            x (float):
+                x value.
+            y (float):
+                y value.
+            yerr (float | None, optional):
+                Error in y. Defaults to None.
+            xerr (float | None, optional):
+                Error in x. Defaults to None.
+        """
+        self.extend((x,), (y,),
+                    yerr=(yerr,) if yerr is not None else None,
+                    xerr=(xerr,) if xerr is not None else None)
+
+    def clear(self):
+        """Removes all samples."""
+        self._start_ = 0
+        self._length_ = 0
+        self.version += 1
+        self._update_poly()
+
+        for function in self.connection_callbacks.values():
+            function(self)
+
+    def connect(self, function):
+        """Connects a callback for new data events.
+
+        Parameters:
+            function (callable):
+                Function to be executed when data is appended. Must have signature `def f(data)`.
+        Returns:
+            (Int):
+                Connection id. Can be used in `StreamingDataSelection.disconnect`.
+        """
+        cid = next(self._cid_counter_)
+        self.connection_callbacks.update({cid: function})
+        return cid
+
+    def disconnect(self, cid):
+        """Disconnects the callback with given `cid`.
+
+        Parameters:
+            cid (Int):
+                Connection id.
+        """
+        if cid in self.connection_callbacks.keys():
+            self.connection_callbacks.pop(cid)
+
+    def __getstate__(self):
+        """Drops callbacks and figure objects."""
+        state = super().__getstate__()
+        state.pop("connection_callbacks")
+        state.pop("_cid_counter_")
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.connection_callbacks = {}
+        self._cid_counter_ = itertools.count()
+
+    def _update_poly(self):
+        """Updates poly collection offsets and colors.
+        """
+        if self._was_plotted:
+            self.collection.set_offsets(self.get_data())
+            self.collection.set_facecolors(self.get_colors((0, 1, 0, 1), (1, 0, 0, 1)))
+
+
+if __name__=='__main__':
+    d = StreamingDataSelection()
+    for i in range(3000):
+        d.append(i, 2*i)
+    assert d.length() == 3000                           , "growth error"
+    assert (d.ydata == 2*d.xdata).all()                 , "growth data error"
+
+    r = StreamingDataSelection(maxlen=4)
+    r.extend([0,1,2], [0,1,2])
+    r.extend([3,4,5], [3,4,5])
+    assert (r.xdata == np.array([2,3,4,5])).all()       , "ring buffer error"
+    r.selection([0])
+    r.append(6, 6)
+    assert (r.indexes_used == [False,False,False,True]).all(), "ring selection error"
+    assert r.total_appended() == 7                      , "total appended error"
+
+    import pickle
+    p = pickle.loads(pickle.dumps(r))
+    assert (p.xdata == r.xdata).all() and p.connection_callbacks == {}, "pickle error"
+
+    e = StreamingDataSelection([0, 1], [0, 1], yerr=[1, 1])
+    e.append(2, 2, yerr=0.5)
+    try:
+        e.append(3, 3)
+        raise AssertionError("missing yerr error")
+    except ValueError:
+        pass
+    assert e.length() == 3 and not np.isnan(e.yerr).any(), "missing yerr stored"
+
+    c = r.copy()
+    assert (c.xdata == r.xdata).all()                   , "copy error"
+    print("All tests OK")
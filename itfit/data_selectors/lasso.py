@@ -12,13 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import matplotlib.pyplot as plt
-from matplotlib import path
 from matplotlib.backend_tools import ToolToggleBase
 from matplotlib.collections import RegularPolyCollection
 from matplotlib.widgets import Lasso
 
-from ..data import DataSelection
+from ..data import DataSelection, points_in_polygon
 
 
 class LassoManager:
@@ -51,9 +49,11 @@ class LassoManager:
 
         self.data.create_selected_poly(self.axes)
 
+        # Built now, so the selection callback only has to query it
+        self.data.get_grid_index()
+
     def callback(self, verts):
-        p = path.Path(verts)
-        ind = p.contains_points(self.data.get_data())
+        ind = points_in_polygon(verts, self.data.xdata, self.data.ydata, self.data.get_grid_index())
 
         self.data.bool_selection(ind)
         self.delete()
@@ -63,7 +63,8 @@ class LassoManager:
             self.canvas.draw_idle()
             self.canvas.widgetlock.release(self.lasso)
             del self.lasso
-        plt.disconnect(self.cid)
+        if self.cid is not None:
+            self.canvas.mpl_disconnect(self.cid)
         self.cid = None
 
     def on_press(self, event):
@@ -0,0 +1,28 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Headless fitting engines. They only depend on NumPy and SciPy."""
+try:
+    __FITTER_ENGINE_IMPORTED__
+except NameError:
+    __FITTER_ENGINE_IMPORTED__= False
+
+if not __FITTER_ENGINE_IMPORTED__:
+    from .rolling import RollingFitResult, rolling_fit
+    from .global_fit import GlobalFitResult, global_fit
+    from .worker import FitJob, SnapJob, FitCancelled
+    from .model import ModelDescriptor
+    from .telemetry import FitTelemetry, TelemetryStats
+    
+__FITTER_ENGINE_IMPORTED__ = True
@@ -0,0 +1,77 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import inspect
+
+import numpy as np
+
+
+def resolve_model(model, p0=None):
+    """Gets the fit function and an initial guess from a model.
+
+    Parameters:
+        model (GenericFitter | type[GenericFitter] | FunctionBuilder | callable):
+            Fitter class (e.g. `GaussianFitter`), fitter instance, built FunctionBuilder or function `f(x, *args)`.
+        p0 (list[float] | None, optional):
+            Initial guess. If None, the current arguments of the model are used when available
+            (fitter instances and builders), otherwise all parameters start at 1. Defaults to None.
+
+    Returns:
+        (tuple[callable, NDArray[float]]):
+            Fit function and initial parameters.
+    """
+    function = getattr(model, "function", model)
+    if not callable(function):
+        raise Exception(f"Model {model} has no fit function.")
+
+    if p0 is None and not inspect.isclass(model) and hasattr(model, "get_args"):
+        try:
+            p0 = model.get_args()
+        except AttributeError:
+            p0 = None
+
+    if p0 is None:
+        try:
+            parameters = inspect.signature(function).parameters.values()
+        except (TypeError, ValueError):
+            raise Exception("Initial guess `p0` must be given for this model.")
+        if any(p.kind == p.VAR_POSITIONAL for p in parameters):
+            raise Exception("Initial guess `p0` must be given for this model.")
+        p0 = np.ones(len(parameters) - 1)
+
+    return function, np.array(p0, dtype=float)
+
+
+def parameter_names(function, length: int):
+    """Gets the parameter names of a fit function `f(x, *args)`.
+
+    Parameters:
+        function (callable):
+            Fit function.
+        length (int):
+            Number of parameters.
+
+    Returns:
+        (list[str]):
+            Parameter names. Falls back to `p0, p1, ...` if the signature can not be inspected.
+    """
+    try:
+        parameters = list(inspect.signature(function).parameters.values())[1:]
+        if len(parameters) == length and all(p.kind == p.POSITIONAL_OR_KEYWORD for p in parameters):
+            return [p.name for p in parameters]
+    except (TypeError, ValueError):
+        pass
+    return [f"p{i}" for i in range(length)]
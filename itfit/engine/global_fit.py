@@ -0,0 +1,260 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from ..data import DataSelection
+
+import time
+
+import numpy as np
+from scipy import optimize, sparse
+
+from .common import resolve_model, parameter_names
+from .telemetry import FitTelemetry
+
+
+class GlobalFitResult:
+    """Result of a simultaneous fit of several datasets.
+
+    Attributes:
+        popt (NDArray[float]):
+            Optimal parameters of each dataset, shape `datasets x parameters`. Shared parameters are repeated.
+        perr (NDArray[float]):
+            Parameters standard error of each dataset, shape `datasets x parameters`.
+        index_map (NDArray[int]):
+            Position of each dataset parameter in the solved vector, shape `datasets x parameters`.
+        theta (NDArray[float]):
+            Solved vector of independent parameters.
+        covariance (NDArray[float]):
+            Covariance of the solved vector.
+        telemetry (itfit.engine.FitTelemetry):
+            Gather and optimizer times and evaluations. The Jacobian is estimated by sparse finite differences.
+    """
+    def __init__(self, function, parameter_names: list[str], shared, index_map, scipy_result, covariance):
+        self.function = function
+        self.parameter_names = parameter_names
+        self.shared = shared
+        self.index_map = index_map
+        self.theta = scipy_result.x
+        self.covariance = covariance
+        self.popt = self.theta[index_map]
+        self.perr = np.sqrt(np.diag(covariance))[index_map]
+        self.cost = scipy_result.cost
+        self.nfev = scipy_result.nfev
+        self.njev = scipy_result.njev
+        self.success = scipy_result.success
+        self.message = scipy_result.message
+        self.telemetry = FitTelemetry(nfev=self.nfev, njev=self.njev)
+
+    def __len__(self):
+        return self.popt.shape[0]
+
+    def get_parameters(self, dataset: int|None=None):
+        """Gets the optimal parameters.
+
+        Parameters:
+            dataset (int | None, optional):
+                Dataset index. If None all datasets are returned. Defaults to None.
+
+        Returns:
+            (NDArray[float]):
+                Parameters of the dataset, or of all datasets with shape `datasets x parameters`.
+        """
+        return self.popt if dataset is None else self.popt[dataset]
+
+    def get_parameters_errors(self, dataset: int|None=None):
+        """Gets the parameters standard error.
+
+        Parameters:
+            dataset (int | None, optional):
+                Dataset index. If None all datasets are returned. Defaults to None.
+
+        Returns:
+            (NDArray[float]):
+                Parameters errors of the dataset, or of all datasets with shape `datasets x parameters`.
+        """
+        return self.perr if dataset is None else self.perr[dataset]
+
+    def get_parameters_covariance(self, dataset: int):
+        """Gets the parameters covariance matrix of one dataset, including correlations through shared parameters.
+
+        Parameters:
+            dataset (int):
+                Dataset index.
+
+        Returns:
+            (NDArray[float]):
+                Covariance matrix `parameters x parameters`.
+        """
+        index = self.index_map[dataset]
+        return self.covariance[np.ix_(index, index)]
+
+    def get_shared_parameters(self):
+        """Gets the shared parameters values.
+
+        Returns:
+            (dict[str, float]):
+                Value of each shared parameter by name.
+        """
+        return {name: self.popt[0, i] for i, name in enumerate(self.parameter_names) if self.shared[i]}
+
+    def evaluate(self, x, dataset: int):
+        """Evaluates the fit function of one dataset.
+
+        Parameters:
+            x (float):
+                Independent variable.
+            dataset (int):
+                Dataset index.
+
+        Returns:
+            y (float):
+                Dependent variable.
+        """
+        return self.function(x, *self.popt[dataset])
+
+
+def _shared_mask_(shared, names: list[str]):
+    """Converts a sharing map into a boolean array, one element per parameter."""
+    if isinstance(shared, dict):
+        unknown = set(shared) - set(names)
+        if unknown:
+            raise Exception(f"Unknown parameters in sharing map: {unknown}. Parameters are {names}.")
+        return np.array([bool(shared.get(name, False)) for name in names])
+    shared = list(shared)
+    if all(isinstance(s, (bool, np.bool_)) for s in shared) and len(shared) == len(names):
+        return np.array(shared, dtype=bool)
+    return _shared_mask_({s: True for s in shared}, names)
+
+
+def global_fit(model, datasets: list[DataSelection], shared, p0=None, *, only_selected: bool=True):
+    """Fits `model` to several datasets at once as a single least squares problem.
+    Shared parameters take the same value in every dataset, the rest are independent for each dataset.
+    The Jacobian is block structured: residuals of a dataset only depend on its own and the shared parameters.
+    This sparsity is given to the optimizer so finite differences need as many evaluations as parameters per dataset.
+
+    Parameters:
+        model (GenericFitter | type[GenericFitter] | FunctionBuilder | callable):
+            Model to fit. See `itfit.engine.common.resolve_model`.
+        datasets (list[itfit.data.DataSelection]):
+            Data to fit.
+        shared (dict[str, bool] | list[str] | list[bool]):
+            Sharing map. Either a dict from parameter name to True if shared, a list of shared parameter names,
+            or a list of booleans with one element per parameter.
+        p0 (list[float] | NDArray[float] | None, optional):
+            Initial guess. Either one set of parameters used for all datasets or one row per dataset. Defaults to None.
+        only_selected (bool, optional):
+            Only fits selected data of each dataset. Defaults to True.
+
+    Returns:
+        (GlobalFitResult):
+            Optimal parameters of every dataset.
+    """
+    if len(datasets) == 0:
+        raise Exception("At least one dataset is needed.")
+
+    p0_rows = None if p0 is None else np.atleast_2d(np.asarray(p0, dtype=float))
+    function, p0 = resolve_model(model, None if p0_rows is None else p0_rows[0])
+    n_datasets, n_parameters = len(datasets), p0.size
+    names = parameter_names(function, n_parameters)
+    shared_mask = _shared_mask_(shared, names)
+
+    # Independent parameters: shared ones once, the rest once per dataset
+    index_map = np.empty((n_datasets, n_parameters), dtype=int)
+    n_shared = int(shared_mask.sum())
+    index_map[:, shared_mask] = np.arange(n_shared)
+    index_map[:, ~shared_mask] = n_shared + np.arange(n_datasets*(n_parameters-n_shared)).reshape(n_datasets, -1)
+    n_theta = int(index_map.max()) + 1
+
+    guess = np.broadcast_to(p0_rows if p0_rows is not None else p0, (n_datasets, n_parameters))
+    theta0 = np.empty(n_theta)
+    theta0[index_map[:, ~shared_mask]] = guess[:, ~shared_mask]
+    theta0[:n_shared] = guess[:, shared_mask].mean(axis=0)
+
+    start = time.perf_counter()
+    blocks = []
+    for data in datasets:
+        if only_selected and data.indexes_used.any():
+            x, y = data.get_selected()
+            sigma = data.get_selected_errors()[1]
+        else:
+            x, y, sigma = data.xdata, data.ydata, data.yerr
+        blocks.append((x, y, 1/np.asarray(sigma) if sigma is not None else None))
+    offsets = np.concatenate(([0], np.cumsum([b[0].size for b in blocks])))
+    residuals = np.empty(offsets[-1])
+
+    def residual(theta):
+        parameters = theta[index_map]
+        for i, (x, y, weight) in enumerate(blocks):
+            r = residuals[offsets[i]:offsets[i+1]]
+            np.subtract(function(x, *parameters[i]), y, out=r)
+            if weight is not None:
+                r *= weight
+        return residuals.copy()
+
+    sparsity = sparse.lil_matrix((offsets[-1], n_theta), dtype=int)
+    for i in range(n_datasets):
+        sparsity[offsets[i]:offsets[i+1], index_map[i]] = 1
+
+    gathered = time.perf_counter()
+    result = optimize.least_squares(residual, theta0, jac_sparsity=sparsity.tocsr(), method='trf', x_scale='jac')
+    solved = time.perf_counter()
+
+    # Same covariance estimate as scipy.optimize.curve_fit with absolute_sigma=False
+    jtj = result.jac.T @ result.jac
+    jtj = jtj.toarray() if sparse.issparse(jtj) else jtj
+    covariance = np.linalg.pinv(jtj, hermitian=True)
+    dof = offsets[-1] - n_theta
+    covariance = covariance * (2*result.cost/dof) if dof > 0 else np.full_like(covariance, np.inf)
+
+    global_result = GlobalFitResult(function, names, shared_mask, index_map, result, covariance)
+    global_result.telemetry.gather = gathered - start
+    global_result.telemetry.optimizer = solved - gathered
+    return global_result
+
+
+if __name__=='__main__':
+    from ..data import DataSelection
+
+    def _decay(x, a, k, c):
+        return a*np.exp(-k*x) + c
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 5, 200)
+    truth = [(3, 0.8, 0.5), (1.5, 0.8, -0.2)]
+    datasets = [DataSelection(x, _decay(x, *t) + rng.normal(0, 1e-3, x.size)) for t in truth]
+    separate = [optimize.curve_fit(_decay, d.xdata, d.ydata, p0=[1, 1, 0]) for d in datasets]
+
+    result = global_fit(_decay, datasets, shared=["k"], p0=[1, 1, 0])
+    assert result.success                                                               , "global fit error"
+    assert result.theta.size == 5 and (result.index_map[:, 1] == 0).all()               , "shared layout error"
+    assert len(np.unique(result.index_map[:, [0, 2]])) == 4                             , "per dataset layout error"
+    assert result.popt.shape == result.perr.shape == (2, 3)                             , "popt and perr shape error"
+    assert result.popt[0, 1] == result.popt[1, 1] == result.get_shared_parameters()["k"], "shared value error"
+    for i, (popt, pcov) in enumerate(separate):
+        assert np.allclose(result.get_parameters(i), popt, rtol=1e-2, atol=1e-3)        , "global parameters error"
+        covariance = result.get_parameters_covariance(i)
+        assert covariance.shape == (3, 3) and np.allclose(covariance, covariance.T)     , "covariance block error"
+        assert np.allclose(np.sqrt(np.diag(covariance)), result.perr[i])                , "perr error"
+    assert np.isclose(result.get_shared_parameters()["k"], 0.8, rtol=1e-2)              , "shared parameter error"
+
+    # Without shared parameters the problem splits and matches separate fits
+    independent = global_fit(_decay, datasets, shared=[], p0=[[1, 1, 0], [1, 1, 0]])
+    assert independent.theta.size == 6 and independent.get_shared_parameters() == {}    , "independent layout error"
+    for i, (popt, pcov) in enumerate(separate):
+        assert np.allclose(independent.get_parameters(i), popt, rtol=1e-6)              , "independent parameters error"
+        assert np.allclose(independent.get_parameters_errors(i), np.sqrt(np.diag(pcov)), rtol=0.1), "independent errors error"
+    print("All tests OK")
@@ -0,0 +1,229 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import inspect
+
+import numpy as np
+
+from .common import parameter_names
+
+
+_OPERATIONS_ = {
+    "+" : lambda f,g: f + g,
+    "-" : lambda f,g: f - g,
+    "*" : lambda f,g: f * g,
+    "/" : lambda f,g: f / g,
+    "//" : lambda f,g: f // g,
+    "%" : lambda f,g: f % g,
+    "**" : lambda f,g: f ** g
+}
+
+_CHAIN_RULE_ = {
+    "+" : lambda f,g,df,dg: df + dg,
+    "-" : lambda f,g,df,dg: df - dg,
+    "*" : lambda f,g,df,dg: f*dg + g*df,
+    "/" : lambda f,g,df,dg: (g*df - dg*f) / (g*g),
+    "**" : lambda f,g,df,dg: f**(g-1)*(g*df + f*np.log(f)*dg)
+}
+
+
+class ModelDescriptor:
+    """Figure detached description of a fit model.
+    A leaf references a fitter class (e.g. `GaussianFitter`) or a plain function, and a composite combines two
+    descriptors with an operation, mirroring `FunctionContainer` trees. Descriptors keep no GUI objects, so they
+    pickle quickly, and `function`/`gradient` are rebuilt after unpickling.
+    """
+    __slots__ = ("name", "model_class", "parameter_names", "left", "right", "operation", "_function_", "_gradient_")
+
+    def __init__(self, name: str, parameter_names: tuple[str], *, model_class: type|None=None, function=None,
+                 gradient=None, left: ModelDescriptor|None=None, right: ModelDescriptor|None=None, operation: str|None=None):
+        """Creates a ModelDescriptor. Use `ModelDescriptor.from_model` to describe existing models.
+
+        Parameters:
+            name (str):
+                Model name.
+            parameter_names (tuple[str]):
+                Names of the parameters, in order.
+            model_class (type | None, optional):
+                Fitter class with static `function` and `gradient`. Defaults to None.
+            function (callable | None, optional):
+                Fit function, if there is no `model_class`. Must be importable to be pickled. Defaults to None.
+            gradient (callable | None, optional):
+                Gradient of `function`. Defaults to None.
+            left (ModelDescriptor | None, optional):
+                Left operand of a composite model. Defaults to None.
+            right (ModelDescriptor | None, optional):
+                Right operand of a composite model. Defaults to None.
+            operation (str | None, optional):
+                Operation of a composite model, as in `FunctionContainer.operations`. Defaults to None.
+        """
+        self.name = name
+        self.model_class = model_class
+        self.parameter_names = tuple(parameter_names)
+        self.left = left
+        self.right = right
+        self.operation = operation
+        self._function_ = function
+        self._gradient_ = gradient
+        self._build_()
+
+    @classmethod
+    def from_model(cls, model):
+        """Describes a model.
+
+        Parameters:
+            model (ModelDescriptor | GenericFitter | type[GenericFitter] | FunctionContainer | FunctionBuilder | callable):
+                Model to describe. Custom function fitters are described through their FunctionContainer tree.
+
+        Returns:
+            (ModelDescriptor):
+                Descriptor of `model`.
+        """
+        if isinstance(model, ModelDescriptor):
+            return model
+
+        # Fitter instance created by a FunctionBuilder, and the builder itself
+        builder = getattr(model, "function_container", None)
+        if builder is not None:
+            return cls.from_model(builder)
+
+        if hasattr(model, "left_fitter"): # FunctionContainer
+            left = cls.from_model(model.left_fitter)
+            if model.right_fitter is None:
+                return left
+            right = cls.from_model(model.right_fitter)
+            return cls(f"({left.name}{model.operation}{right.name})", left.parameter_names + right.parameter_names,
+                       left=left, right=right, operation=model.operation)
+
+        model_class = model if inspect.isclass(model) else type(model)
+        function = getattr(model_class, "function", None)
+        if callable(function) and not inspect.isfunction(model):
+            names = parameter_names(function, len(inspect.signature(function).parameters) - 1)
+            return cls(getattr(model_class, "name", model_class.__name__), names, model_class=model_class)
+
+        if callable(model):
+            length = len(inspect.signature(model).parameters) - 1
+            return cls(getattr(model, "__name__", "function"), parameter_names(model, length), function=model)
+
+        raise Exception(f"Can not describe model {model}.")
+
+    def _build_(self):
+        """Rebuilds `function` and `gradient` from the description."""
+        if self.model_class is not None:
+            self._function_ = self.model_class.function
+            self._gradient_ = getattr(self.model_class, "gradient", None)
+
+    @property
+    def composite(self):
+        """True if the model combines two models."""
+        return self.left is not None
+
+    @property
+    def key(self):
+        """Hashable identity of the model structure."""
+        if self.composite:
+            return (self.operation, self.left.key, self.right.key)
+        return (self.model_class or self._function_, self.parameter_names)
+
+    def __eq__(self, other):
+        return isinstance(other, ModelDescriptor) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"ModelDescriptor({self.name}: {', '.join(self.parameter_names)})"
+
+    def __getstate__(self):
+        return (self.name, self.model_class, self.parameter_names, self.left, self.right, self.operation,
+                None if self.model_class is not None else self._function_,
+                None if self.model_class is not None else self._gradient_)
+
+    def __setstate__(self, state):
+        (self.name, self.model_class, self.parameter_names, self.left, self.right, self.operation,
+         self._function_, self._gradient_) = state
+        self._build_()
+
+    def get_args_length(self):
+        """Gets number of arguments of `function`.
+
+        Returns:
+            (int): Number of arguments of `function`.
+        """
+        return len(self.parameter_names)
+
+    def function(self, x, *args):
+        """Evaluates the model.
+
+        Parameters:
+            x (float | NDArray[float]):
+                Independent variable.
+            *args (float):
+                Parameters.
+        Returns:
+            (float | NDArray[float]):
+                `f(x, *args)`
+        """
+        if self.composite:
+            n = self.left.get_args_length()
+            return _OPERATIONS_[self.operation](self.left.function(x, *args[:n]), self.right.function(x, *args[n:]))
+        return self._function_(x, *args)
+
+    def gradient(self, x, *args):
+        """Evaluates the gradient of the model with respect to the parameters.
+
+        Parameters:
+            x (float | NDArray[float]):
+                Independent variable.
+            *args (float):
+                Parameters.
+        Returns:
+            (NDArray[float]):
+                Gradient, one row per parameter.
+        """
+        if not self.composite:
+            if self._gradient_ is None:
+                raise AttributeError(f"Model {self.name} has no gradient.")
+            return self._gradient_(x, *args)
+
+        if self.operation not in _CHAIN_RULE_:
+            raise AttributeError(f"Operation {self.operation} has no gradient.")
+        n = self.left.get_args_length()
+        m = self.right.get_args_length()
+        f = np.asarray(self.left.function(x, *args[:n]), dtype=float).reshape(1, -1)
+        g = np.asarray(self.right.function(x, *args[n:]), dtype=float).reshape(1, -1)
+        df = np.asarray(self.left.gradient(x, *args[:n]), dtype=float).reshape(n, -1)
+        dg = np.asarray(self.right.gradient(x, *args[n:]), dtype=float).reshape(m, -1)
+        df = np.vstack((df, np.zeros((m, df.shape[1]))))
+        dg = np.vstack((np.zeros((n, dg.shape[1])), dg))
+        return _CHAIN_RULE_[self.operation](f, g, df, dg)
+
+
+if __name__=='__main__':
+    import pickle
+
+    def _line(x, m, n):
+        return m*x + n
+    def _line_gradient(x, m, n):
+        return np.array([x, np.ones_like(x)])
+
+    line = ModelDescriptor("line", ("m", "n"), function=_line, gradient=_line_gradient)
+    model = ModelDescriptor("(line*line)", ("m", "n", "a", "b"), left=line, right=line, operation="*")
+    x = np.linspace(0, 1, 5)
+    assert np.allclose(model.function(x, 1, 2, 3, 4), (x + 2)*(3*x + 4))                , "composite function error"
+    assert np.allclose(model.gradient(x, 1, 2, 3, 4)[0], x*(3*x + 4))                   , "composite gradient error"
+    assert model == ModelDescriptor("other", ("m", "n", "a", "b"), left=line, right=line, operation="*"), "equality error"
+    print("All tests OK")
@@ -0,0 +1,220 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from ..data import DataSelection
+
+import time
+import warnings
+
+import numpy as np
+from scipy import optimize
+
+from .common import resolve_model, parameter_names
+from .telemetry import FitTelemetry
+
+
+class RollingFitResult:
+    """Compact time series of rolling window fits. Every attribute is an array with one row per window.
+
+    Attributes:
+        start (NDArray[int]):
+            First data index of each window.
+        stop (NDArray[int]):
+            Last data index (excluded) of each window.
+        x_center (NDArray[float]):
+            Mean x of the data used in each window.
+        popt (NDArray[float]):
+            Optimal parameters, shape `windows x parameters`.
+        pcov (NDArray[float]):
+            Parameters covariance, shape `windows x parameters x parameters`.
+        nfev (NDArray[int]):
+            Number of function evaluations of each window.
+        success (NDArray[bool]):
+            True if the optimization of the window converged.
+        telemetry (itfit.engine.FitTelemetry):
+            Gather and optimizer times and evaluations, summed over all windows.
+    """
+    def __init__(self, function, parameter_names: list[str], windows: int):
+        """Preallocates the result arrays.
+
+        Parameters:
+            function (callable):
+                Fit function.
+            parameter_names (list[str]):
+                Names of the fit function parameters.
+            windows (int):
+                Number of windows.
+        """
+        n = len(parameter_names)
+        self.function = function
+        self.parameter_names = parameter_names
+        self.start = np.zeros(windows, dtype=int)
+        self.stop = np.zeros(windows, dtype=int)
+        self.x_center = np.full(windows, np.nan)
+        self.popt = np.full((windows, n), np.nan)
+        self.pcov = np.full((windows, n, n), np.nan)
+        self.nfev = np.zeros(windows, dtype=int)
+        self.success = np.zeros(windows, dtype=bool)
+        self.telemetry = FitTelemetry(gather=0., optimizer=0.)
+
+    def __len__(self):
+        return self.start.size
+
+    def get_parameters(self):
+        """Gets the optimal parameters of every window.
+
+        Returns:
+            (NDArray[float]):
+                Array of shape `windows x parameters`.
+        """
+        return self.popt
+
+    def get_parameters_errors(self):
+        """Gets the parameters standard error of every window.
+
+        Returns:
+            (NDArray[float]):
+                Array of shape `windows x parameters`.
+        """
+        return np.sqrt(np.diagonal(self.pcov, axis1=1, axis2=2))
+
+    def get_parameter(self, name: str):
+        """Gets the time series of one parameter.
+
+        Parameters:
+            name (str):
+                Parameter name, as in the fit function signature.
+
+        Returns:
+            (NDArray[float]):
+                Parameter value on each window.
+        """
+        return self.popt[:, self.parameter_names.index(name)]
+
+    def total_nfev(self):
+        """Total number of function evaluations.
+
+        Returns:
+            (int):
+                Sum of `nfev` over all windows.
+        """
+        return int(self.nfev.sum())
+
+
+def rolling_fit(model, data: DataSelection, window: int, step: int, p0=None, *, warm_start: bool=True, only_selected: bool=True):
+    """Fits `model` on consecutive windows of `data`. Each fit starts from the optimal parameters of the previous window.
+
+    Parameters:
+        model (GenericFitter | type[GenericFitter] | FunctionBuilder | callable):
+            Model to fit. See `itfit.engine.common.resolve_model`.
+        data (itfit.data.DataSelection):
+            Data to fit, windows are taken in index order.
+        window (int):
+            Number of samples in each window.
+        step (int):
+            Number of samples between consecutive windows.
+        p0 (list[float] | None, optional):
+            Initial guess of the first window. Defaults to None.
+        warm_start (bool, optional):
+            If True each window starts from the previous optimal parameters, otherwise always from `p0`. Defaults to True.
+        only_selected (bool, optional):
+            Ignores not selected data inside each window. Defaults to True.
+
+    Returns:
+        (RollingFitResult):
+            Parameters and covariances of each window.
+    """
+    if window < 1 or step < 1:
+        raise Exception("window and step must be positive integers.")
+
+    function, p0 = resolve_model(model, p0)
+    xdata, ydata, yerr = data.xdata, data.ydata, data.yerr
+    mask = data.indexes_used if only_selected else None
+
+    windows = max(0, (data.length() - window) // step + 1)
+    result = RollingFitResult(function, parameter_names(function, p0.size), windows)
+
+    telemetry = result.telemetry
+    guess = p0
+    for i in range(windows):
+        t0 = time.perf_counter()
+        start = i*step
+        stop = start + window
+        result.start[i], result.stop[i] = start, stop
+
+        x, y = xdata[start:stop], ydata[start:stop]
+        sigma = yerr[start:stop] if yerr is not None else None
+        if mask is not None:
+            used = mask[start:stop]
+            x, y = x[used], y[used]
+            sigma = sigma[used] if sigma is not None else None
+        t1 = time.perf_counter()
+        telemetry.gather += t1 - t0
+        if x.size < p0.size:
+            continue
+        result.x_center[i] = x.mean()
+
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", optimize.OptimizeWarning)
+                popt, pcov, infodict, _, ier = optimize.curve_fit(function, x, y, p0=guess, sigma=sigma, full_output=True)
+        except RuntimeError:
+            continue
+        finally:
+            telemetry.optimizer += time.perf_counter() - t1
+
+        telemetry.nfev += int(infodict["nfev"])
+        result.popt[i] = popt
+        result.pcov[i] = pcov
+        result.nfev[i] = infodict["nfev"]
+        result.success[i] = ier in (1, 2, 3, 4)
+        if warm_start and result.success[i]:
+            guess = popt
+
+    return result
+
+
+if __name__=='__main__':
+    from ..data import DataSelection
+
+    def _exponential(x, a, k):
+        return a*np.exp(-k*x)
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 10, 400)
+    y = 3*np.exp(-0.5*x) + rng.normal(0, 1e-4, x.size)
+    data = DataSelection(x, y)
+
+    warm = rolling_fit(_exponential, data, window=40, step=20, p0=[1, 1])
+    cold = rolling_fit(_exponential, data, window=40, step=20, p0=[1, 1], warm_start=False)
+    assert len(warm) == 19 and warm.success.all()                                       , "rolling windows error"
+    assert np.allclose(warm.start, np.arange(19)*20) and (warm.stop - warm.start == 40).all(), "window bounds error"
+    assert np.allclose(warm.get_parameters(), [3, 0.5], rtol=0.05)                      , "rolling parameters error"
+    assert np.allclose(warm.popt, cold.popt, rtol=1e-3, atol=1e-6)                      , "warm start result error"
+    assert warm.total_nfev() < cold.total_nfev()                                        , "warm start not used"
+    assert warm.telemetry.nfev == warm.total_nfev()                                     , "telemetry nfev error"
+
+    # Windows with less selected points than parameters are skipped, but their gather time is counted
+    data.indexes_used[40:100] = False
+    skipped = rolling_fit(_exponential, data, window=40, step=20, p0=[1, 1])
+    assert not skipped.success[2:4].any() and np.isnan(skipped.popt[2:4]).all()         , "skip error"
+    assert np.isnan(skipped.x_center[2:4]).all() and skipped.success[[0, 1, 5]].all()   , "skip neighbours error"
+    data.indexes_used[:] = False
+    all_skipped = rolling_fit(_exponential, data, window=40, step=20, p0=[1, 1])
+    assert not all_skipped.success.any() and all_skipped.telemetry.gather > 0           , "skipped gather time error"
+    assert all_skipped.telemetry.optimizer == 0 and all_skipped.total_nfev() == 0       , "skipped optimizer error"
+    print("All tests OK")
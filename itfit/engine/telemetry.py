@@ -0,0 +1,194 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import numpy as np
+
+
+JACOBIAN_SOURCES = ("finite-difference", "analytic")
+
+
+class FitTelemetry:
+    """Timing breakdown of one fit. Times are wall times in seconds, NaN if the step did not run.
+
+    Attributes:
+        gather (float):
+            Time spent collecting the data to fit.
+        optimizer (float):
+            Time spent in the optimizer.
+        nfev (int):
+            Number of fit function evaluations, including finite difference steps.
+        njev (int):
+            Number of analytic Jacobian evaluations.
+        jacobian (str):
+            Jacobian source, "finite-difference" or "analytic".
+        error_band (float):
+            Time spent computing the error band.
+        draw (float):
+            Time spent drawing the result.
+    """
+    __slots__ = ("gather", "optimizer", "nfev", "njev", "jacobian", "error_band", "draw")
+    TIMES = ("gather", "optimizer", "error_band", "draw")
+    dtype = np.dtype([
+        ("gather", np.float64),
+        ("optimizer", np.float64),
+        ("error_band", np.float64),
+        ("draw", np.float64),
+        ("nfev", np.int64),
+        ("njev", np.int64),
+        ("jacobian", np.int8), # Index in JACOBIAN_SOURCES, -1 if there is no telemetry
+    ])
+
+    def __init__(self, gather: float=np.nan, optimizer: float=np.nan, nfev: int=0, njev: int=0,
+                 jacobian: str="finite-difference", error_band: float=np.nan, draw: float=np.nan):
+        """Creates a FitTelemetry. Steps not given are marked as not run."""
+        if jacobian not in JACOBIAN_SOURCES:
+            raise Exception(f"Unknown Jacobian source '{jacobian}'. Use one of {', '.join(JACOBIAN_SOURCES)}.")
+        self.gather = gather
+        self.optimizer = optimizer
+        self.nfev = nfev
+        self.njev = njev
+        self.jacobian = jacobian
+        self.error_band = error_band
+        self.draw = draw
+
+    @property
+    def total(self):
+        """Sum of the times of every step that ran."""
+        return float(np.nansum([getattr(self, name) for name in self.TIMES]))
+
+    def as_dict(self):
+        """Returns the telemetry as a dictionary.
+
+        Returns:
+            (dict):
+                Step name to value.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_record(self):
+        """Returns the telemetry as a record of `FitTelemetry.dtype`."""
+        return (self.gather, self.optimizer, self.error_band, self.draw, self.nfev, self.njev,
+                JACOBIAN_SOURCES.index(self.jacobian))
+
+    @classmethod
+    def from_record(cls, record):
+        """Creates a FitTelemetry from a record of `FitTelemetry.dtype`. Returns None for empty records."""
+        if record["jacobian"] < 0:
+            return None
+        return cls(float(record["gather"]), float(record["optimizer"]), int(record["nfev"]), int(record["njev"]),
+                   JACOBIAN_SOURCES[record["jacobian"]], float(record["error_band"]), float(record["draw"]))
+
+    def __repr__(self):
+        times = ", ".join(f"{name}={1e3*getattr(self, name):.3g} ms" for name in self.TIMES if not np.isnan(getattr(self, name)))
+        return f"FitTelemetry({times}, nfev={self.nfev}, njev={self.njev}, jacobian={self.jacobian})"
+
+
+class TelemetryStats:
+    """Running statistics of the telemetry of many fits, used as `Fitter.telemetry`.
+    Only sums are kept, so adding a fit is O(1) and memory does not grow with the session.
+    """
+    def __init__(self):
+        """Creates empty statistics."""
+        self.reset()
+
+    def reset(self):
+        """Forgets every fit added."""
+        self.fits = 0
+        self.nfev = 0
+        self.njev = 0
+        self.jacobian = {source: 0 for source in JACOBIAN_SOURCES}
+        n = len(FitTelemetry.TIMES)
+        self._count_ = np.zeros(n, dtype=int)
+        self._sum_ = np.zeros(n)
+        self._sum_squares_ = np.zeros(n)
+        self._min_ = np.full(n, np.inf)
+        self._max_ = np.full(n, -np.inf)
+
+    def add(self, telemetry: FitTelemetry):
+        """Adds the telemetry of one fit.
+
+        Parameters:
+            telemetry (FitTelemetry):
+                Telemetry of the fit.
+        """
+        self.fits += 1
+        self.nfev += telemetry.nfev
+        self.njev += telemetry.njev
+        self.jacobian[telemetry.jacobian] += 1
+
+        times = np.array([getattr(telemetry, name) for name in FitTelemetry.TIMES], dtype=float)
+        ran = ~np.isnan(times)
+        times = np.where(ran, times, 0)
+        self._count_ += ran
+        self._sum_ += times
+        self._sum_squares_ += times*times
+        self._min_ = np.where(ran, np.minimum(self._min_, times), self._min_)
+        self._max_ = np.where(ran, np.maximum(self._max_, times), self._max_)
+
+    def summary(self):
+        """Returns statistics of every step.
+
+        Returns:
+            (dict[str, dict[str, float]]):
+                For each step: count, total, mean, std, min and max, in seconds.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self._sum_ / self._count_
+            std = np.sqrt(np.clip(self._sum_squares_/self._count_ - mean*mean, 0, None))
+        return {
+            name: {
+                "count": int(self._count_[i]),
+                "total": float(self._sum_[i]),
+                "mean": float(mean[i]),
+                "std": float(std[i]),
+                "min": float(self._min_[i]) if self._count_[i] else np.nan,
+                "max": float(self._max_[i]) if self._count_[i] else np.nan,
+            } for i, name in enumerate(FitTelemetry.TIMES)
+        }
+
+    def table(self):
+        """Returns a text table showing where fitting time goes. Times are in milliseconds.
+
+        Returns:
+            (str):
+                Table with one row per step.
+        """
+        summary = self.summary()
+        total = sum(step["total"] for step in summary.values())
+        lines = [f"{'step':<12}{'count':>7}{'total':>12}{'share':>8}{'mean':>11}{'std':>11}{'min':>11}{'max':>11}"]
+        for name, step in summary.items():
+            share = 100*step["total"]/total if total > 0 else np.nan
+            lines.append(f"{name:<12}{step['count']:>7}{1e3*step['total']:>12.3f}{share:>7.1f}%" +
+                         "".join(f"{1e3*step[key]:>11.3f}" for key in ("mean", "std", "min", "max")))
+        jacobian = ", ".join(f"{source}: {count}" for source, count in self.jacobian.items())
+        lines.append(f"{self.fits} fits, {self.nfev} function evaluations, {self.njev} Jacobian evaluations ({jacobian})")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.table()
+
+
+if __name__=='__main__':
+    stats = TelemetryStats()
+    stats.add(FitTelemetry(gather=1e-3, optimizer=2e-2, nfev=10))
+    stats.add(FitTelemetry(gather=3e-3, optimizer=4e-2, nfev=20, njev=5, jacobian="analytic", draw=1e-2))
+    summary = stats.summary()
+    assert np.isclose(summary["gather"]["mean"], 2e-3)                  , "mean error"
+    assert summary["draw"]["count"] == 1 and summary["error_band"]["count"] == 0, "count error"
+    assert stats.nfev == 30 and stats.jacobian["analytic"] == 1         , "totals error"
+    record = np.array(FitTelemetry(optimizer=1., nfev=3).to_record(), dtype=FitTelemetry.dtype)
+    assert FitTelemetry.from_record(record).optimizer == 1.             , "record error"
+    print("All tests OK")
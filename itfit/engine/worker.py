@@ -0,0 +1,211 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor, Future
+
+import numpy as np
+from scipy import optimize
+
+from .telemetry import FitTelemetry
+
+_EXECUTOR_: ThreadPoolExecutor|None = None
+
+
+def get_executor():
+    """Returns the thread pool shared by all fit jobs. Created on first use.
+
+    Returns:
+        (ThreadPoolExecutor):
+            Shared executor.
+    """
+    global _EXECUTOR_
+    if _EXECUTOR_ is None:
+        _EXECUTOR_ = ThreadPoolExecutor(max_workers=2, thread_name_prefix="itfit")
+    return _EXECUTOR_
+
+
+class FitCancelled(Exception):
+    """Raised inside a fit job when it is cancelled."""
+
+
+class FitJob:
+    """Runs `scipy.optimize.curve_fit` in a worker thread.
+    The fit function is wrapped to count evaluations, keep the current cost and stop the optimization when
+    the job is cancelled. All progress attributes can be read from any thread while the job runs.
+
+    Attributes:
+        nfev (int):
+            Function evaluations done so far.
+        cost (float):
+            Half the sum of squared (weighted) residuals of the last evaluation.
+        njev (int):
+            Analytic Jacobian evaluations done so far.
+        telemetry (itfit.engine.FitTelemetry):
+            Optimizer time, evaluations and Jacobian source. Filled by `run`.
+    """
+    def __init__(self, function, xdata, ydata, p0, sigma=None, **kargs):
+        """Creates a FitJob. It does not start until `start` is called.
+
+        Parameters:
+            function (callable):
+                Fit function `f(x, *args)`.
+            xdata (NDArray[float]):
+                x data.
+            ydata (NDArray[float]):
+                y data.
+            p0 (list[float]):
+                Initial guess.
+            sigma (NDArray[float] | None, optional):
+                Error in y data. Defaults to None.
+            **kargs:
+                Extra arguments for `scipy.optimize.curve_fit`.
+        """
+        self.function = function
+        self.xdata = xdata
+        self.ydata = ydata
+        self.p0 = p0
+        self.sigma = sigma
+        self.kargs = kargs
+
+        self.nfev: int = 0
+        self.njev: int = 0
+        self.cost: float = np.nan
+        self.telemetry = FitTelemetry(jacobian="analytic" if callable(kargs.get("jac")) else "finite-difference")
+        self._cancel_ = threading.Event()
+        self.future: Future|None = None
+
+    def _wrapped_function_(self, x, *args):
+        if self._cancel_.is_set():
+            raise FitCancelled()
+        y = self.function(x, *args)
+        self.nfev += 1
+        if np.shape(y) == np.shape(self.ydata):
+            residuals = y - self.ydata
+            if self.sigma is not None:
+                residuals = residuals / self.sigma
+            self.cost = 0.5*float(np.dot(residuals, residuals))
+        return y
+
+    def _wrapped_jacobian_(self, x, *args):
+        if self._cancel_.is_set():
+            raise FitCancelled()
+        self.njev += 1
+        return self.kargs["jac"](x, *args)
+
+    def run(self):
+        """Runs the fit in the current thread.
+
+        Returns:
+            (tuple):
+                `scipy.optimize.curve_fit` output with `full_output=True`.
+        """
+        kargs = self.kargs
+        if self.telemetry.jacobian == "analytic":
+            kargs = dict(kargs, jac=self._wrapped_jacobian_)
+        start = time.perf_counter()
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", optimize.OptimizeWarning)
+                return optimize.curve_fit(self._wrapped_function_, self.xdata, self.ydata, p0=self.p0,
+                                          sigma=self.sigma, full_output=True, **kargs)
+        finally:
+            self.telemetry.optimizer = time.perf_counter() - start
+            self.telemetry.nfev = self.nfev
+            self.telemetry.njev = self.njev
+
+    def start(self, executor: ThreadPoolExecutor|None=None):
+        """Starts the fit in a worker thread.
+
+        Parameters:
+            executor (ThreadPoolExecutor | None, optional):
+                Executor to use. Defaults to the shared executor.
+
+        Returns:
+            (FitJob):
+                Returns itself.
+        """
+        self.future = (executor or get_executor()).submit(self.run)
+        return self
+
+    def cancel(self):
+        """Requests the job to stop. The optimization stops at the next function evaluation."""
+        self._cancel_.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def cancelled(self):
+        """Returns True if the job was cancelled."""
+        return self._cancel_.is_set()
+
+    def done(self):
+        """Returns True if the job finished, failed or was cancelled."""
+        return self.future is not None and self.future.done()
+
+    def result(self):
+        """Returns the fit output. Raises the worker exception if the fit failed.
+
+        Returns:
+            (tuple):
+                `scipy.optimize.curve_fit` output with `full_output=True`.
+        """
+        return self.future.result()
+
+
+class SnapJob(FitJob):
+    """FitJob limited to a few Levenberg-Marquardt iterations. Used for live previews, where an approximate
+    result soon is better than a converged one late. Unlike `curve_fit`, running out of evaluations is not an error.
+    """
+    def __init__(self, function, xdata, ydata, p0, sigma=None, max_iterations: int=5):
+        """Creates a SnapJob. It does not start until `start` is called.
+
+        Parameters:
+            function (callable):
+                Fit function `f(x, *args)`.
+            xdata (NDArray[float]):
+                x data.
+            ydata (NDArray[float]):
+                y data.
+            p0 (list[float]):
+                Initial guess.
+            sigma (NDArray[float] | None, optional):
+                Error in y data. Defaults to None.
+            max_iterations (int, optional):
+                Maximum number of Levenberg-Marquardt iterations. Defaults to 5.
+        """
+        super().__init__(function, xdata, ydata, p0, sigma)
+        self.max_iterations = max_iterations
+
+    def _residuals_(self, args):
+        residuals = self._wrapped_function_(self.xdata, *args) - self.ydata
+        if self.sigma is not None:
+            residuals = residuals / self.sigma
+        return residuals
+
+    def run(self):
+        """Runs the bounded fit in the current thread.
+
+        Returns:
+            (NDArray[float]):
+                Best parameters found.
+        """
+        p0 = np.asarray(self.p0, dtype=float)
+        # Each iteration estimates the jacobian with one evaluation per parameter
+        max_nfev = self.max_iterations * (p0.size + 1)
+        result = optimize.least_squares(self._residuals_, p0, method='lm', max_nfev=max_nfev)
+        return result.x
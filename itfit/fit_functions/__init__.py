@@ -30,13 +30,15 @@ except NameError:
 if not __FITTER_FIT_FUNCTIONS_IMPORTED__:
     from .common.generic_fitter import GenericFitter, GenericFitterTool
     from .common.function_container import FunctionContainer
-    
-    from .linear import Line
-    from .gaussian import Gaussian
-    from .exponential import Exponential
-    from .quadratic import Quadratic
-    from .lorentzian import Lorentzian
-    from .cosine import Cosine
-    from .sine import Sine
+    from .registry import ModelEntry, ModelRegistry, models, register_model
+
+# Model packages (`gaussian`, ...) and their FunctionContainers (`Gaussian`, ...) are imported on first use
+def __getattr__(name: str):
+    entry = models.find(name)
+    if entry is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = entry.module if name == entry.module_name[1:] else entry.container
+    globals()[name] = value
+    return value
     
 __FITTER_FIT_FUNCTIONS_IMPORTED__ = True
\ No newline at end of file
@@ -139,7 +139,7 @@ class FunctionContainer:
         
         for dp in self.left_fitter.drag_points_managers:
             self.left_fitter.drag_points_cids.append(
-                dp.connect(plot_update_function)
+                self.left_fitter.connect_drag_point(dp, plot_update_function)
             )
             
         if self.right_fitter is not None:
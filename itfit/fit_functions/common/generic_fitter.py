@@ -17,7 +17,9 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from ... import Fitter
 
-import matplotlib.pyplot as plt
+import time
+import warnings
+
 import numpy as np
 from matplotlib.backend_tools import ToolToggleBase
 from matplotlib.lines import Line2D
@@ -27,7 +29,9 @@ from matplotlib.patches import Polygon
 from operator import add
 
 from ...data import DataSelection, DataContainer
-from ...utils import DragPointCollection, FitResultContainer
+from ...utils import DragPointCollection, DragPointManager, FitResultContainer
+from ...engine import FitJob, FitCancelled, FitTelemetry
+from .snap_preview import SnapPreview
 
 class GenericFitter:
     """GenericFitter is a base implementation of a fit function.
@@ -88,12 +92,58 @@ class GenericFitter:
         self.data = data
         
         self.fitter_drag_collection: DragPointCollection
+        self.connections: list[tuple[object, int]] = [] # (owner, cid) of every callback registered by this fitter
+        self.fit_job: FitJob|None = None
+        self._fit_timer_ = None
+        self._memory_snapshot_ = None # tracemalloc snapshot taken when the running fit started
+        self.snap_preview: SnapPreview|None = None
         
         # TODO: this may change when dedicated ui is implemented
-        self.button_axes = plt.axes([0.81, 0.000001, 0.1, 0.055])
+        self.button_axes = self.app.figure.add_axes([0.81, 0.000001, 0.1, 0.055])
         self.button = Button(self.button_axes, "Fit",color="red")
-        self.button.on_clicked(self.on_fit)
+        self.connections.append((self.button, self.button.on_clicked(self.on_fit)))
         
+    def connect_drag_point(self, manager: DragPointManager, function):
+        """Connects `function` to change events of a DragPointManager. The connection is owned by the fitter and undone in `delete`.
+
+        Parameters:
+            manager (DragPointManager):
+                Manager of the point.
+            function (callable):
+                Function to be executed when the point moves. Must have signature `def f(x, y)`.
+        Returns:
+            (int):
+                Connection id.
+        """
+        cid = manager.connect(function)
+        self.connections.append((manager, cid))
+        return cid
+
+    def connect_canvas(self, event: str, function):
+        """Connects `function` to a canvas event. The connection is owned by the fitter and undone in `delete`.
+
+        Parameters:
+            event (str):
+                Matplotlib event name.
+            function (callable):
+                Callback with signature `def f(event)`.
+        Returns:
+            (int):
+                Connection id.
+        """
+        cid = self.fig.canvas.mpl_connect(event, function)
+        self.connections.append((self.fig.canvas, cid))
+        return cid
+
+    def disconnect_all(self):
+        """Disconnects every callback registered by this fitter."""
+        for owner, cid in self.connections:
+            if hasattr(owner, "mpl_disconnect"):
+                owner.mpl_disconnect(cid)
+            else:
+                owner.disconnect(cid)
+        self.connections = []
+
     def get_args(self):
         """Return arguments needed for `self.function`.
 
@@ -103,6 +153,40 @@ class GenericFitter:
         """
         return self.fitter_drag_collection.get_args()
 
+    def get_fit_data(self):
+        """Returns a copy of the data to fit. If there is not data selected all data is used.
+
+        Returns:
+            (Tuple[NDArray, NDArray, NDArray | None]):
+                x data, y data and y error.
+        """
+        if np.sum(self.data.indexes_used)==0:
+            yerr = self.data.yerr.copy() if self.data.yerr is not None else None
+            return self.data.xdata.copy(), self.data.ydata.copy(), yerr
+        xdata, ydata = self.data.get_selected()
+        xerr, yerr = self.data.get_selected_errors()
+        return xdata, ydata, yerr
+
+    def enable_snap_preview(self, max_iterations: int=5):
+        """Shows a second curve refined in the background while DragPoints are moved.
+
+        Parameters:
+            max_iterations (int, optional):
+                Levenberg-Marquardt iterations run after each movement. Defaults to 5.
+        Returns:
+            (SnapPreview):
+                The preview.
+        """
+        if self.snap_preview is None:
+            self.snap_preview = SnapPreview(self, max_iterations)
+        return self.snap_preview
+
+    def disable_snap_preview(self):
+        """Removes the snap preview, if any."""
+        if self.snap_preview is not None:
+            self.snap_preview.remove()
+            self.snap_preview = None
+
     def prop_errors(xdata,self):
         """Returns the error of the fit, given a gradient.
 
@@ -114,29 +198,95 @@ class GenericFitter:
         
     
     def on_fit(self, event):
-        """Event for fit button.
+        """Event for fit button. The optimization runs in a worker thread and the result is drawn
+        from a canvas timer, so the figure stays responsive. Clicking again while fitting cancels it.
 
         Parameters:
             event (Matplotlib event): 
                 Not used
         """
+        if self.fit_job is not None and not self.fit_job.done():
+            self.fit_job.cancel()
+            return
 
-        # If there is not data selected use all data
-        xdata, ydata = self.data.get_selected()
-        xerr, yerr = self.data.get_selected_errors()
-        if np.sum(self.data.indexes_used)==0:
-            xdata, ydata = self.data.xdata.copy(), self.data.ydata.copy()
-        
-        self.fit = optimize.curve_fit(self.function, xdata, ydata, p0=self.get_args(), full_output=True, sigma=yerr)
-        fit_result = FitResultContainer(self.data.copy(), self, self.fit)
+        self._memory_snapshot_ = self.app.memory_tracer.snapshot() if self.app.memory_tracer is not None else None
+        start = time.perf_counter()
+        xdata, ydata, yerr = self.get_fit_data()
+        self._fit_data_ = self.data.copy()
+        self.fit_job = FitJob(self.function, xdata, ydata, self.get_args(), sigma=yerr)
+        self.fit_job.telemetry.gather = time.perf_counter() - start
+
+        if not self.app.threaded_fit:
+            job, self.fit_job = self.fit_job, None
+            try:
+                self.fit = job.run()
+            except Exception as error:
+                warnings.warn(f"{self.name} fit failed: {error}")
+                return
+            self._finish_fit_(job.telemetry)
+            return
+
+        self.fit_job.start()
+        self._set_button_label_("Cancel")
+        self._fit_timer_ = self.fig.canvas.new_timer(interval=100)
+        self._fit_timer_.add_callback(self._poll_fit_)
+        self._fit_timer_.start()
+
+    def _set_button_label_(self, text: str):
+        """Changes the fit button text and redraws only the button."""
+        self.button.label.set_text(text)
+        try:
+            self.button_axes.draw_artist(self.button_axes.patch)
+            self.button_axes.draw_artist(self.button.label)
+            self.fig.canvas.blit(self.button_axes.bbox)
+        except AttributeError: # Renderer not available yet
+            pass
+
+    def _poll_fit_(self):
+        """Timer callback. Shows fit progress and finishes the fit when the worker is done."""
+        job = self.fit_job
+        if job is None:
+            return
+
+        if not job.done():
+            self._set_button_label_(f"{job.nfev} | {job.cost:.3g}")
+            return
+
+        self._fit_timer_.stop()
+        self.fit_job = None
+        self._set_button_label_("Fit")
+        if job.cancelled():
+            return
+        try:
+            self.fit = job.result()
+        except FitCancelled:
+            return
+        except Exception as error: # curve_fit raises RuntimeError, ValueError or TypeError
+            warnings.warn(f"{self.name} fit failed: {error}")
+            return
+        self._finish_fit_(job.telemetry)
+
+    def _finish_fit_(self, telemetry: FitTelemetry|None=None):
+        """Stores the last fit result, draws it and saves it in the app.
+
+        Parameters:
+            telemetry (itfit.engine.FitTelemetry | None, optional):
+                Telemetry of the fit job. Error band and draw times are added to it. Defaults to None.
+        """
+        fit_result = FitResultContainer(self._fit_data_, self, self.fit, diagnostics=self.app.fit_diagnostics,
+                                        telemetry=telemetry)
+        start = time.perf_counter()
+        xdata = fit_result.get_fit_grid()
         
         # Plot fit line in background, and the confidence interval
         with self.app.blit_manager.disabled():
             self.fit_line = Line2D(xdata, fit_result.evaluate(xdata), linestyle='--', color='purple')
             
-            verts_positive, verts_negative = fit_result.error_verts()
-            if verts_positive and verts_negative:
-                self.fit_fill = Polygon(verts_positive + list(reversed(verts_negative)),facecolor='red',edgecolor='None',alpha=0.3)
+            band_start = time.perf_counter()
+            band = fit_result.error_band()
+            band_time = time.perf_counter() - band_start
+            if band is not None:
+                self.fit_fill = Polygon(band,facecolor='red',edgecolor='None',alpha=0.3)
                 self.ax.add_artist(self.fit_fill)
                 self.ax.draw_artist(self.fit_fill)
 
@@ -146,19 +296,32 @@ class GenericFitter:
        
        # Redraw plot to show line     
         self.app.blit_manager.draw()
+        if telemetry is not None:
+            telemetry.error_band = band_time
+            telemetry.draw = time.perf_counter() - start - band_time
 
         # Save fit in app
         self.app._add_fit(fit_result)
+        if self.app.memory_tracer is not None:
+            self.app.memory_tracer.record(self._memory_snapshot_, f"{self.name} #{self.app._last_fit}")
+            self._memory_snapshot_ = None
         
     def delete(self):
         """Remove trigger. Used when tool is disabled."""
+        if self.fit_job is not None:
+            self.fit_job.cancel()
+            self.fit_job = None
+        if self._fit_timer_ is not None:
+            self._fit_timer_.stop()
+        self.disable_snap_preview()
+        self.disconnect_all()
         try:
             del self.button
             self.button_axes.remove()
         
             # Remove artists in order to clean canvas
             for pm in self.drag_points_managers:
-                pm.dragpoint.remove()
+                pm.remove()
                 self.app.blit_manager.artists.remove(pm)
 
             self.fitter_drag_collection.remove()
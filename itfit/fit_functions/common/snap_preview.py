@@ -0,0 +1,122 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .generic_fitter import GenericFitter
+
+from matplotlib.lines import Line2D
+
+from ...engine import SnapJob
+from ...utils import AdaptiveSampler
+
+
+class SnapPreview:
+    """Live fit preview shown while DragPoints are moved.
+    Every time a point moves a few Levenberg-Marquardt iterations are started in a worker thread from the
+    current DragPoints parameters. The result is drawn as a second curve from a canvas timer, so the event
+    thread never waits for the optimizer. Jobs made stale by a new movement are cancelled.
+    """
+    def __init__(self, fitter: GenericFitter, max_iterations: int=5, interval: int=30, *, linestyle=':', color='green'):
+        """Creates a SnapPreview and connects it to the fitter DragPoints.
+
+        Parameters:
+            fitter (GenericFitter):
+                Fitter whose DragPoints are followed.
+            max_iterations (int, optional):
+                Iterations of each background job. Defaults to 5.
+            interval (int, optional):
+                Milliseconds between checks for finished jobs. Defaults to 30.
+            linestyle (str, optional):
+                Preview line style. Defaults to ':'.
+            color (str, optional):
+                Preview line color. Defaults to 'green'.
+        """
+        self.fitter = fitter
+        self.blit_manager = fitter.app.blit_manager
+        self.ax = fitter.ax
+        self.canvas = fitter.fig.canvas
+        self.max_iterations = max_iterations
+        self.interval = interval
+
+        self.job: SnapJob|None = None
+        self.args = None # Parameters of the last finished job
+        self._timer_ = None
+
+        self.sampler = AdaptiveSampler(self.ax)
+        self.poly = Line2D([], [], linestyle=linestyle, color=color, transform=None, animated=True)
+        self.patch = self.ax.add_patch(self.poly)
+        self.blit_manager.artists.append(self)
+
+        self.cids = [(dpm, dpm.connect(self.on_points_moved)) for dpm in self.fitter.drag_points_managers]
+
+    def update(self, *args, **kargs):
+        """Resamples the preview curve with the last refined parameters. Called by BlitManager."""
+        if self.args is None:
+            self.poly.set_data([], [])
+            return
+        xmin, xmax = self.ax.get_xlim()
+        x_display, y_display = self.sampler.sample(self.fitter.function, self.args, xmin, xmax)
+        self.poly.set_data(x_display, y_display)
+
+    def on_points_moved(self, *args):
+        """Callback for DragPoints changes. Cancels the running job and starts a new one."""
+        if self.job is not None:
+            self.job.cancel()
+
+        xdata, ydata, yerr = self.fitter.get_fit_data()
+        if len(xdata) < self.fitter.get_args_length():
+            self.job = None
+            return
+        self.job = SnapJob(self.fitter.function, xdata, ydata, self.fitter.get_args(),
+                           sigma=yerr, max_iterations=self.max_iterations).start()
+
+        if self._timer_ is None:
+            self._timer_ = self.canvas.new_timer(interval=self.interval)
+            self._timer_.add_callback(self.poll)
+            self._timer_.start()
+
+    def poll(self):
+        """Timer callback. Draws the result of the last job once it is finished."""
+        job = self.job
+        if job is not None and not job.done():
+            return
+        self._stop_timer_()
+        if job is None or job.cancelled():
+            return
+        self.job = None
+        try:
+            self.args = tuple(job.result())
+        except Exception: # Bad starting point, keep last preview
+            return
+        self.blit_manager.draw()
+
+    def _stop_timer_(self):
+        if self._timer_ is not None:
+            self._timer_.stop()
+            self._timer_ = None
+
+    def remove(self):
+        """Cancels pending work and removes the preview curve."""
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+        self._stop_timer_()
+        for dpm, cid in self.cids:
+            dpm.disconnect(cid)
+        self.cids = []
+        if self in self.blit_manager.artists:
+            self.blit_manager.artists.remove(self)
+        self.patch.remove()
@@ -97,16 +97,7 @@ class DragCosineManager(DragPointCollection):
 
         #create x and y data of trigonometric function that moves across two points
         dx = abs(p1_x-p2_x) * 1.5 
-        x = np.linspace(min(p1_x,p2_x)-dx,max(p1_x,p2_x)+dx,250)
-        y = self.function(x, a, b, c,d)
-        
-        # from data coordinates to display coordinates
-        xy = np.array((x,y)).T.reshape(-1, 2)
-        x_data, y_data = self.set_xy(xy).T
-        
-        # set new data
-        self.poly.set_xdata(x_data)
-        self.poly.set_ydata(y_data)
+        self.set_curve(min(p1_x,p2_x)-dx,max(p1_x,p2_x)+dx, a, b, c,d)
  
     def get_args(self):
         """Gives cosine function parameters.
@@ -128,6 +119,8 @@ class DragCosineManager(DragPointCollection):
 class CosineFitter(GenericFitter):
     """Cosine function fitter."""
     name = 'cosine'
+    function = staticmethod(DragCosineManager.function)
+    gradient = staticmethod(DragCosineManager.gradient)
 
     def __init__(self, app, data: DataSelection):
         """Cosine fitter following function 'f(x) = a*cos(b*x+b)'.
@@ -153,7 +146,7 @@ class CosineFitter(GenericFitter):
         self.drag_points_cids = [] # Connections ids for change events
         for dp in self.drag_points_managers:
             self.drag_points_cids.append(
-                dp.connect(self.fitter_drag_collection.update)
+                self.connect_drag_point(dp, self.fitter_drag_collection.update)
             )
 
         ## Add created DragPoints and DragLines to BlitManager's artists
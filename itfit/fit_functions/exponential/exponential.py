@@ -90,16 +90,7 @@ class DragExponentialManager(DragPointCollection):
 
         #create x and y data of an exponential that moves across two poitns
         dx = abs(p1_x-p2_x) * 1.5 
-        x = np.linspace(min(p1_x,p2_x)-dx,max(p1_x,p2_x)+dx,250)
-        y = self.function(x, a, b)
-
-        # from data coordinates to display coordinates
-        xy = np.array((x,y)).T.reshape(-1,2)
-        x_data, y_data = self.set_xy(xy).T 
-
-        #set new data
-        self.poly.set_xdata(x_data)
-        self.poly.set_ydata(y_data)
+        self.set_curve(min(p1_x,p2_x)-dx,max(p1_x,p2_x)+dx, a, b)
 
     def get_args(self):
         """Gives exponential function parameters.
@@ -119,6 +110,8 @@ class DragExponentialManager(DragPointCollection):
 class ExponentialFitter(GenericFitter):
     """Exponential function fitter."""
     name = 'exponential'
+    function = staticmethod(DragExponentialManager.function)
+    gradient = staticmethod(DragExponentialManager.gradient)
 
     def __init__(self,app,data: DataSelection):
         """ Exponential fitter following function `f(x) = a*exp(b*x)`
@@ -146,7 +139,7 @@ class ExponentialFitter(GenericFitter):
         self.drag_points_cids = [] #Connection ids for change events
         for dp in self.drag_points_managers:
             self.drag_points_cids.append(
-                dp.connect(self.fitter_drag_collection.update)
+                self.connect_drag_point(dp, self.fitter_drag_collection.update)
             )
 
         ## Add created DragPoints and DragLines to BlitManager's artists
@@ -97,16 +97,7 @@ class DragGaussianManager(DragPointCollection):
 
         #create x and y data of gaussian line of a gaussian that moves across two poitns
         dx = abs(peak_x-side_x) * 1.5
-        x = np.linspace(min(peak_x,side_x)-dx,max(peak_x,side_x)+dx,250)
-        y = self.function(x,A,m,s)
-
-        #from data coordinates to display coordinates
-        xy = np.array((x,y)).T.reshape(-1,2)
-        x_data, y_data = self.set_xy(xy).T
-
-        #set new data
-        self.poly.set_xdata(x_data)
-        self.poly.set_ydata(y_data)
+        self.set_curve(min(peak_x,side_x)-dx,max(peak_x,side_x)+dx, A,m,s)
 
     def get_args(self):
         """Gives Gaussian function parameters.
@@ -134,6 +125,8 @@ class DragGaussianManager(DragPointCollection):
 class GaussianFitter(GenericFitter):
     """Gaussian function fitter."""
     name = 'gaussian'
+    function = staticmethod(DragGaussianManager.function)
+    gradient = staticmethod(DragGaussianManager.gradient)
 
     def __init__(self,app,data: DataSelection):
         """ Gaussian fitter following function `f(x) = A*exp(0.5*(x-m)^2/s^2)`
@@ -160,7 +153,7 @@ class GaussianFitter(GenericFitter):
         self.drag_points_cids = [] #Connections ids for change events
         for dp in self.drag_points_managers:
             self.drag_points_cids.append(
-                dp.connect(self.fitter_drag_collection.update)
+                self.connect_drag_point(dp, self.fitter_drag_collection.update)
             )
         
         ## Add created DragPoints and DragLines to BlitManager's artists
@@ -168,6 +161,9 @@ class GaussianFitter(GenericFitter):
         for dpm in self.drag_points_managers:
             self.app.blit_manager.artists.append(dpm)
         
+        if self.app.snap_preview:
+            self.enable_snap_preview()
+
         self.fig.canvas.draw_idle()
     
 class GaussianTool(GenericFitterTool):
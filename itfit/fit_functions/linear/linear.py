@@ -90,16 +90,7 @@ class DragLineManager(DragPointCollection):
 
         # create x and y data
         dx = abs(x0-x1)*0.5
-        x = np.linspace(min(x0,x1)-dx, max(x0,x1)+dx, 250)
-        y = self.function(x, m, n)
-        
-        # from data coordinates to display coordinates
-        xy = np.array((x,y)).T.reshape(-1, 2)
-        x_data, y_data = self.set_xy(xy).T
-        
-        # set new data
-        self.poly.set_xdata(x_data)
-        self.poly.set_ydata(y_data)
+        self.set_curve(min(x0,x1)-dx, max(x0,x1)+dx, m, n)
  
     def get_args(self):
         """Gives linear function parameters.
@@ -120,6 +111,8 @@ class DragLineManager(DragPointCollection):
 class LineFitter(GenericFitter):
     """Linear function fitter."""
     name = 'linear'
+    function = staticmethod(DragLineManager.function)
+    gradient = staticmethod(DragLineManager.gradient)
     
     def __init__(self, app, data: DataSelection):
         """Linear fitter following function `f(x)=m*x + n`.
@@ -145,7 +138,7 @@ class LineFitter(GenericFitter):
         self.drag_points_cids = [] # Connections ids for change events
         for dp in self.drag_points_managers:
             self.drag_points_cids.append(
-                dp.connect(self.fitter_drag_collection.update)
+                self.connect_drag_point(dp, self.fitter_drag_collection.update)
             )
         
         ## Add created DragPoints and DragLines to BlitManager's artists
@@ -88,16 +88,7 @@ class DragLorentzianManager(DragPointCollection):
 
         #create x and y data of Lorentzian line of a Lorentzian that moves across two points
         dx = abs(peak_x-side_x) * 1.5
-        x = np.linspace(min(peak_x,side_x)-dx,max(peak_x,side_x)+dx,250)
-        y = self.function(x,A,x0,FWHM)
-
-        #from data coordinates to display coordinates
-        xy = np.array((x,y)).T.reshape(-1,2)
-        x_data, y_data = self.set_xy(xy).T
-
-        #set new data
-        self.poly.set_xdata(x_data)
-        self.poly.set_ydata(y_data)
+        self.set_curve(min(peak_x,side_x)-dx,max(peak_x,side_x)+dx, A,x0,FWHM)
 
     def get_args(self):
         """Gives Lorentzian function parameters.
@@ -123,6 +114,8 @@ class DragLorentzianManager(DragPointCollection):
 class LorentzianFitter(GenericFitter):
     """Lorentzian function fitter."""
     name = 'lorentzian'
+    function = staticmethod(DragLorentzianManager.function)
+    gradient = staticmethod(DragLorentzianManager.gradient)
 
     def __init__(self,app,data: DataSelection):
         """ Lorentzian fitter following function `f(x) = A/pi*(FWHM/2)/((x-x0)^2+(FWHM/2)^2)`
@@ -149,7 +142,7 @@ class LorentzianFitter(GenericFitter):
         self.drag_points_cids = [] #Connections ids for change events
         for dp in self.drag_points_managers:
             self.drag_points_cids.append(
-                dp.connect(self.fitter_drag_collection.update)
+                self.connect_drag_point(dp, self.fitter_drag_collection.update)
             )
         self.drag_points_managers[1].add_restriction(self.res_fwhm)
         
@@ -158,6 +151,9 @@ class LorentzianFitter(GenericFitter):
         for dpm in self.drag_points_managers:
             self.app.blit_manager.artists.append(dpm)
         
+        if self.app.snap_preview:
+            self.enable_snap_preview()
+
         self.fig.canvas.draw_idle()
 
     def res_fwhm(self, x, y):
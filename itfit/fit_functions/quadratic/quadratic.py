@@ -94,16 +94,7 @@ class DragQuadraticManager(DragPointCollection):
 
         # create x and y data of quadratic line centered in center_point
         dx = abs(lp_x-cp_x)*1.5
-        x = np.linspace(cp_x-dx, cp_x+dx, 250)
-        y = self.function(x, a, b, c)
-        
-        # from data coordinates to display coordinates
-        xy = np.array((x,y)).T.reshape(-1, 2)
-        x_data, y_data = self.set_xy(xy).T
-        
-        # set new data
-        self.poly.set_xdata(x_data)
-        self.poly.set_ydata(y_data)
+        self.set_curve(cp_x-dx, cp_x+dx, a, b, c)
         
     def get_args(self):
         """Gives quadratic function parameters.
@@ -122,6 +113,8 @@ class DragQuadraticManager(DragPointCollection):
 class QuadraticFitter(GenericFitter):
     """Quadratic function fitter."""
     name = 'quadratic'
+    function = staticmethod(DragQuadraticManager.function)
+    gradient = staticmethod(DragQuadraticManager.gradient)
     
     def __init__(self, app, data: DataSelection):
         """Quadratic fitter following function `f(x)=a*x^2 + b*x + c`
@@ -147,7 +140,7 @@ class QuadraticFitter(GenericFitter):
         self.drag_points_cids = [] # Connections ids for change events
         for dp in self.drag_points_managers:
             self.drag_points_cids.append(
-                dp.connect(self.fitter_drag_collection.update)
+                self.connect_drag_point(dp, self.fitter_drag_collection.update)
             )
         
         ## Add created DragPoints and DragLines to BlitManager's artists
@@ -0,0 +1,221 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import importlib
+import warnings
+
+
+ENTRY_POINT_GROUP = "itfit.models"
+
+
+class ModelEntry:
+    """Registered model. Only names are stored, the model module is imported on first use."""
+    def __init__(self, name: str, module: str, tool: str, fitter: str|None=None, container: str|None=None):
+        """Creates a ModelEntry.
+
+        Parameters:
+            name (str):
+                Model name, also used as toolbar tool name.
+            module (str):
+                Module that defines the model. Relative names are relative to `itfit.fit_functions`.
+            tool (str):
+                Name of the GenericFitterTool in `module`.
+            fitter (str | None, optional):
+                Name of the GenericFitter in `module`. Defaults to None.
+            container (str | None, optional):
+                Name of the FunctionContainer in `module`, used by FunctionBuilder. Defaults to None.
+        """
+        self.name = name
+        self.module_name = module
+        self.tool_name = tool
+        self.fitter_name = fitter
+        self.container_name = container
+
+    def __repr__(self):
+        return f"ModelEntry({self.name}: {self.module_name}{'' if self.loaded else ', not loaded'})"
+
+    @property
+    def loaded(self):
+        """True if the model module was already imported."""
+        return hasattr(self, "_module_")
+
+    @property
+    def module(self):
+        """Model module. Imported on first access."""
+        if not self.loaded:
+            self._module_ = importlib.import_module(self.module_name, __package__)
+        return self._module_
+
+    def _get_(self, attribute: str|None):
+        return None if attribute is None else getattr(self.module, attribute)
+
+    @property
+    def tool(self):
+        """GenericFitterTool of the model."""
+        return self._get_(self.tool_name)
+
+    @property
+    def fitter(self):
+        """GenericFitter of the model, or None if not registered."""
+        return self._get_(self.fitter_name)
+
+    @property
+    def container(self):
+        """FunctionContainer of the model, or None if not registered."""
+        return self._get_(self.container_name)
+
+
+class ModelRegistry:
+    """Ordered registry of the models shown in the Fitter toolbar.
+    Built-in models are registered by name and third-party models are discovered through the
+    `itfit.models` entry point group, both without importing any model module. An entry point value
+    must point to a GenericFitterTool, e.g. `my_gaussian = "my_package.models:MyGaussianTool"`.
+    """
+    def __init__(self, entry_point_group: str|None=ENTRY_POINT_GROUP):
+        """Creates an empty ModelRegistry.
+
+        Parameters:
+            entry_point_group (str | None, optional):
+                Entry point group searched for third-party models. None disables discovery. Defaults to "itfit.models".
+        """
+        self.entry_point_group = entry_point_group
+        self._entries_: dict[str, ModelEntry] = {}
+        self._discovered_ = entry_point_group is None
+
+    def register(self, name: str, module: str, tool: str, fitter: str|None=None, container: str|None=None, *, replace: bool=False):
+        """Registers a model. Its module is not imported.
+
+        Parameters:
+            name (str):
+                Model name, also used as toolbar tool name.
+            module (str):
+                Module that defines the model. Relative names are relative to `itfit.fit_functions`.
+            tool (str):
+                Name of the GenericFitterTool in `module`.
+            fitter (str | None, optional):
+                Name of the GenericFitter in `module`. Defaults to None.
+            container (str | None, optional):
+                Name of the FunctionContainer in `module`. Defaults to None.
+            replace (bool, optional):
+                Replaces a model already registered with the same name. Defaults to False.
+        Returns:
+            (ModelEntry):
+                Registered entry.
+        """
+        if name in self._entries_ and not replace:
+            raise Exception(f"Model '{name}' is already registered.")
+        entry = ModelEntry(name, module, tool, fitter, container)
+        self._entries_[name] = entry
+        return entry
+
+    def unregister(self, name: str):
+        """Removes a model.
+
+        Parameters:
+            name (str):
+                Model name.
+        """
+        self._discover_()
+        self._entries_.pop(name, None)
+
+    def _discover_(self):
+        """Registers models of the entry point group. Only entry point names and values are read."""
+        if self._discovered_:
+            return
+        self._discovered_ = True
+
+        from importlib.metadata import entry_points
+        points = entry_points()
+        points = points.select(group=self.entry_point_group) if hasattr(points, "select") else points.get(self.entry_point_group, ())
+        for point in points:
+            module, _, tool = point.value.partition(":")
+            if not tool or point.name in self._entries_:
+                warnings.warn(f"Ignoring itfit model entry point '{point.name} = {point.value}'.")
+                continue
+            self.register(point.name, module.strip(), tool.strip())
+
+    def __getitem__(self, name: str):
+        self._discover_()
+        return self._entries_[name]
+
+    def __contains__(self, name: str):
+        self._discover_()
+        return name in self._entries_
+
+    def __iter__(self):
+        self._discover_()
+        return iter(list(self._entries_.values()))
+
+    def __len__(self):
+        self._discover_()
+        return len(self._entries_)
+
+    def names(self):
+        """Names of the registered models, in toolbar order.
+
+        Returns:
+            (list[str]):
+                Model names.
+        """
+        self._discover_()
+        return list(self._entries_)
+
+    def find(self, attribute: str):
+        """Finds the entry that defines a FunctionContainer or a package named `attribute`. Used for lazy imports.
+
+        Parameters:
+            attribute (str):
+                Container name (e.g. `Gaussian`) or package name (e.g. `gaussian`).
+        Returns:
+            (ModelEntry | None):
+                Entry found, or None.
+        """
+        for entry in self._entries_.values():
+            if attribute == entry.container_name or entry.module_name == "." + attribute:
+                return entry
+        return None
+
+
+models = ModelRegistry()
+
+models.register("Line", ".linear", "LineTool", "LineFitter", "Line")
+models.register("Quadratic", ".quadratic", "QuadraticTool", "QuadraticFitter", "Quadratic")
+models.register("Exponential", ".exponential", "ExponentialTool", "ExponentialFitter", "Exponential")
+models.register("Gaussian", ".gaussian", "GaussianTool", "GaussianFitter", "Gaussian")
+models.register("Sine", ".sine", "SineTool", "SineFitter", "Sine")
+models.register("Cosine", ".cosine", "CosineTool", "CosineFitter", "Cosine")
+models.register("Lorentzian", ".lorentzian", "LorentzianTool", "LorentzianFitter", "Lorentzian")
+
+
+def register_model(name: str, module: str, tool: str, fitter: str|None=None, container: str|None=None, *, replace: bool=False):
+    """Registers a model in the default registry, used by `Fitter`. See `ModelRegistry.register`.
+
+    Returns:
+        (ModelEntry):
+            Registered entry.
+    """
+    return models.register(name, module, tool, fitter, container, replace=replace)
+
+
+if __name__=='__main__':
+    import sys
+    registry = ModelRegistry(entry_point_group=None)
+    registry.register("Gaussian", "itfit.fit_functions.gaussian", "GaussianTool", "GaussianFitter", "Gaussian")
+    assert not registry["Gaussian"].loaded                                  , "eager import error"
+    assert registry.names() == ["Gaussian"]                                 , "names error"
+    assert registry.find("gaussian") is None and registry.find("Gaussian") is not None, "find error"
+    assert registry["Gaussian"].fitter.name == "gaussian"                   , "lazy import error"
+    print("All tests OK")
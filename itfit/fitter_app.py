@@ -23,11 +23,14 @@ if TYPE_CHECKING:
 
 import matplotlib.pyplot as plt
 
-from .data import DataSelection
+from .data import DataSelection, StreamingDataSelection, Filter, FilterPipeline
 from .data_selectors import LassoTool
 from . import fit_functions
-from .utils import BlitManager, FitSelector
+from .utils import BlitManager, FitSelector, DataStreamArtist
 from .utils.fit_container import FitResultContainer
+from .utils.fit_collection import FitCollection
+from .utils.memory import FitMemoryTracer, memory_report
+from .engine import RollingFitResult, rolling_fit, GlobalFitResult, global_fit, TelemetryStats
 from .plot.builder import PlotBuilder
 
 plt.rcParams['toolbar'] = 'toolmanager'
@@ -36,58 +39,132 @@ class Fitter:
     data : data.DataSelection
     figure : Figure
     ax : Axes
-    fits : dict[int, utils.FitResultContainer]
+    fits : utils.FitCollection
     selections : dict
     blit_manager : utils.BlitManager
     _last_fit : int
     
-    def __init__(self, xdata, ydata, yerr=None, xerr=None, *args, **kargs):
-        self.data = DataSelection(xdata, ydata, yerr=yerr, xerr=xerr)
+    def __init__(self, xdata, ydata=None, yerr=None, xerr=None, *args, streaming: bool=False, maxlen: int|None=None, max_fps: float|None=60, threaded_fit: bool=True, snap_preview: bool=False, fit_diagnostics: str|None=None, **kargs):
+        """Creates the fitter application.
+
+        Parameters:
+            xdata (list[float] | itfit.data.DataSelection):
+                x data. A DataSelection (e.g. from `itfit.data.load_csv`) is used directly and the rest of data arguments are ignored.
+            ydata (list[float]):
+                y data.
+            yerr (list | None, optional):
+                Error in y data. Defaults to None.
+            xerr (list | None, optional):
+                Error in x data. Defaults to None.
+            streaming (bool, optional):
+                If True data is stored in a `StreamingDataSelection` and new samples can be added with
+                `Fitter.append`. Defaults to False.
+            maxlen (int | None, optional):
+                Only used when streaming. Keeps only the last `maxlen` samples. Defaults to None.
+            max_fps (float | None, optional):
+                Maximum frame rate while dragging points. Mouse events between frames are coalesced.
+                If None every event is drawn. Defaults to 60.
+            threaded_fit (bool, optional):
+                Runs fits started with the Fit button in a worker thread, showing progress and allowing
+                cancellation. Defaults to True.
+            snap_preview (bool, optional):
+                Gaussian and Lorentzian tools show a second curve refined in a worker thread while their
+                points are dragged. Defaults to False.
+            fit_diagnostics (str | None, optional):
+                How fit results keep scipy diagnostics (`fvec`, `fjac`, `ipvt`, `qtf`): None drops them, "full"
+                keeps them, "float32" keeps float32 copies and "disk" spills them to temporary files. Defaults to None.
+        """
+        if isinstance(xdata, DataSelection):
+            self.data = xdata
+        elif streaming or maxlen is not None:
+            self.data = StreamingDataSelection(xdata, ydata, yerr=yerr, xerr=xerr, maxlen=maxlen)
+        else:
+            self.data = DataSelection(xdata, ydata, yerr=yerr, xerr=xerr)
         self.figure = plt.figure()
         self.ax = self.figure.gca()
-        self.fits: dict[int, FitResultContainer] = {}
+        self.fits: FitCollection = FitCollection()
         self.selections = {}
         self.blit_manager = BlitManager(self)
+        self.blit_manager.max_fps = max_fps
+        self.threaded_fit = threaded_fit
+        self.snap_preview = snap_preview
+        self.fit_diagnostics = fit_diagnostics
+        self.telemetry = TelemetryStats() # Running statistics of fit times, see `telemetry_table`
+        self.memory_tracer: FitMemoryTracer|None = None # See `trace_fit_memory`
         self._last_fit: int|None = None
         self._data_was_plotted = False
+        self.data_stream: DataStreamArtist|None = None
+        self.filters = FilterPipeline()
+
+    def _plot_data_(self, *args):
+        """Plots the data line once. Streaming data is drawn through the BlitManager."""
+        if self._data_was_plotted:
+            return
+        self.data_line = self.ax.plot(self.data.xdata, self.data.ydata, *args)
+        self._data_was_plotted = True
+
+        if isinstance(self.data, StreamingDataSelection):
+            self.data_stream = DataStreamArtist(self.data, self.blit_manager, self.data_line[0])
+            self.blit_manager.artists.append(self.data_stream)
     
     def __call__(self):
-        if not self._data_was_plotted:
-            self.data_line = self.ax.plot(self.data.xdata, self.data.ydata, '.-')
-            self._data_was_plotted = True
+        self._plot_data_('.-')
         
         self.figure.canvas.manager.toolmanager.add_tool('Lasso', LassoTool, app=self,data=self.data)
         self.figure.canvas.manager.toolbar.add_tool('Lasso', 'fitter')
         
-        self.figure.canvas.manager.toolmanager.add_tool('Line', fit_functions.linear.LineTool, app=self, data=self.data)
-        self.figure.canvas.manager.toolbar.add_tool('Line', 'fitter')
-        
-        self.figure.canvas.manager.toolmanager.add_tool('Quadratic', fit_functions.quadratic.QuadraticTool, app=self, data=self.data)
-        self.figure.canvas.manager.toolbar.add_tool('Quadratic', 'fitter')
-
-        self.figure.canvas.manager.toolmanager.add_tool('Exponential', fit_functions.exponential.ExponentialTool, app=self, data=self.data)
-        self.figure.canvas.manager.toolbar.add_tool('Exponential', 'fitter')
-
-        self.figure.canvas.manager.toolmanager.add_tool('Gaussian', fit_functions.gaussian.GaussianTool, app=self,data=self.data)
-        self.figure.canvas.manager.toolbar.add_tool('Gaussian', 'fitter')
-
-        self.figure.canvas.manager.toolmanager.add_tool('Sine',  fit_functions.sine.SineTool, app=self,data=self.data)
-        self.figure.canvas.manager.toolbar.add_tool('Sine', 'fitter')
-        
-        self.figure.canvas.manager.toolmanager.add_tool('Cosine',  fit_functions.cosine.CosineTool, app=self,data=self.data)
-        self.figure.canvas.manager.toolbar.add_tool('Cosine', 'fitter')
-        
-        self.figure.canvas.manager.toolmanager.add_tool('Lorentzian', fit_functions.lorentzian.LorentzianTool, app=self,data=self.data)
-        self.figure.canvas.manager.toolbar.add_tool('Lorentzian', 'fitter')
+        for model in fit_functions.models:
+            self.figure.canvas.manager.toolmanager.add_tool(model.name, model.tool, app=self, data=self.data)
+            self.figure.canvas.manager.toolbar.add_tool(model.name, 'fitter')
         
     def add_custom_fit_function(self, function_builder: FunctionBuilder):
-        if not self._data_was_plotted:
-            self.data_line = self.ax.plot(self.data.xdata, self.data.ydata)
-            self._data_was_plotted = True
+        self._plot_data_()
         
         self.figure.canvas.manager.toolmanager.add_tool('Custom tool', function_builder.get_custom_tool(), app=self,data=self.data)
         self.figure.canvas.manager.toolbar.add_tool('Custom tool', 'fitter')
 
+    def append(self, x: float, y: float, yerr: float|None=None, xerr: float|None=None):
+        """Appends a new sample to streaming data. The figure is updated using blitting.
+
+        Parameters:
+            x (float):
+                x value.
+            y (float):
+                y value.
+            yerr (float | None, optional):
+                Error in y. Defaults to None.
+            xerr (float | None, optional):
+                Error in x. Defaults to None.
+
+        Raises:
+            Exception: If the Fitter was not created with `streaming=True`.
+            ValueError: If the Fitter was created with errors and they are not given.
+        """
+        self.extend((x,), (y,),
+                    yerr=(yerr,) if yerr is not None else None,
+                    xerr=(xerr,) if xerr is not None else None)
+
+    def extend(self, xdata, ydata, yerr=None, xerr=None):
+        """Appends several samples to streaming data. The figure is updated once using blitting.
+
+        Parameters:
+            xdata (list[float]):
+                x data.
+            ydata (list[float]):
+                y data.
+            yerr (list | None, optional):
+                Error in y data. Defaults to None.
+            xerr (list | None, optional):
+                Error in x data. Defaults to None.
+
+        Raises:
+            Exception: If the Fitter was not created with `streaming=True`.
+            ValueError: If the Fitter was created with errors and they are not given.
+        """
+        if not isinstance(self.data, StreamingDataSelection):
+            raise Exception("Data can only be appended if the Fitter was created with `streaming=True`.")
+        self.data.extend(xdata, ydata, yerr=yerr, xerr=xerr)
+
     def _add_fit(self, fit: FitResultContainer):
         """Adds the fit to the application
 
@@ -95,8 +172,48 @@ class Fitter:
             fit (FitResultContainer):
                 Fit to add
         """
-        self._last_fit = hash(fit)
-        self.fits.update({self._last_fit: fit})
+        self._last_fit = self.fits.add(fit)
+        if fit.telemetry is not None:
+            self.telemetry.add(fit.telemetry)
+
+    def telemetry_table(self):
+        """Returns a table showing where fitting time went during the session: data gathering, optimizer,
+        error band and drawing, plus function and Jacobian evaluation counts.
+
+        Returns:
+            (str): Table of running statistics, times in milliseconds.
+        """
+        return self.telemetry.table()
+
+    def memory_report(self):
+        """Reports memory held by the session: data, selection colors, selections, data copies stored with fits,
+        fit records, diagnostics and curve caches, blitting bitmaps and figure artists. Arrays shared between
+        items are counted once.
+```py
+print(fitter.memory_report())
+fitter.memory_report().largest(5)
+```
+        Returns:
+            (itfit.utils.MemoryReport): Bytes per category and largest items. Includes `tracemalloc` differences
+            around fits if `trace_fit_memory` is enabled.
+        """
+        return memory_report(self)
+
+    def trace_fit_memory(self, enable: bool=True, top: int=10):
+        """Takes `tracemalloc` snapshots when a fit starts and after it is stored, and keeps the difference.
+        Tracing slows allocations down, so it is disabled by default.
+
+        Parameters:
+            enable (bool, optional):
+                Enables or disables tracing. Defaults to True.
+            top (int, optional):
+                Number of allocation sites kept for each fit. Defaults to 10.
+        """
+        if self.memory_tracer is not None:
+            self.memory_tracer.stop()
+            self.memory_tracer = None
+        if enable:
+            self.memory_tracer = FitMemoryTracer(top)
 
     def get_single_fit_selector(self):
         """Stars a fit selector figure where you can select one fit.
@@ -128,7 +245,7 @@ class Fitter:
         """
         return self.fits.get(self._last_fit) if (self._last_fit is not None) else None
     
-    def add_filter(self, filter: function):
+    def add_filter(self, filter: function|Filter):
         """Adds a filter for data selection. The signature must be as:
 ```py
 lambda x,y : bool
@@ -137,15 +254,89 @@ or
 ```py
 def foo(x,y) -> bool:
     return bool
+```
+        A `itfit.data.Filter` can also be used. Its mask is cached, so chained filters are only evaluated again if they change.
+        `Fitter.filters` is a pipeline where named stages can be added and replaced:
+```py
+fitter.filters["range"] = lambda x, y: (x > 0) & (x < 10)
+fitter.filters["nan"] = lambda x, y: ~np.isnan(y)
+fitter.add_filter(fitter.filters)
 ```
         Parameters:
-            filter (function): Filter function.
+            filter (function | itfit.data.Filter): Filter function or Filter.
         """
-        selection = filter(*(self.data.get_data().T))
-        self.data.selection(selection)
+        if isinstance(filter, Filter):
+            self.data.bool_selection(filter.mask(self.data))
+        else:
+            selection = filter(*(self.data.get_data().T))
+            self.data.selection(selection)
         self.data.create_selected_poly(self.ax)
     
-    
+    def rolling_fit(self, model, window: int, step: int, p0=None, *, warm_start: bool=True, only_selected: bool=True):
+        """Refits `model` on consecutive windows of the data, warm started from the previous window.
+        Results are stored as arrays, no FitResultContainer is created.
+```py
+result = fitter.rolling_fit(itfit.fit_functions.gaussian.GaussianFitter, window=500, step=100, p0=(1, 0, 1))
+result.get_parameter("m")
+```
+        Parameters:
+            model (GenericFitter | type[GenericFitter] | FunctionBuilder | callable):
+                Model to fit. A fitter class, a fitter instance, a built FunctionBuilder or a function `f(x, *args)`.
+            window (int):
+                Number of samples in each window.
+            step (int):
+                Number of samples between consecutive windows.
+            p0 (list[float] | None, optional):
+                Initial guess of the first window. Defaults to the model current arguments if available.
+            warm_start (bool, optional):
+                If True each window starts from the previous optimal parameters. Defaults to True.
+            only_selected (bool, optional):
+                Ignores not selected data inside each window. Defaults to True.
+
+        Returns:
+            (itfit.engine.RollingFitResult): Parameters and covariances of each window.
+        """
+        return rolling_fit(model, self.data, window, step, p0, warm_start=warm_start, only_selected=only_selected)
+
+    def global_fit(self, model, datasets: list[DataSelection]|None=None, shared=(), p0=None, *, only_selected: bool=True):
+        """Fits `model` to several datasets at once, with some parameters shared between all of them.
+        Everything is solved as one least squares problem with a block structured Jacobian.
+```py
+result = fitter.global_fit(GaussianFitter, [run_1, run_2, run_3], shared=["m", "s"], p0=(1, 0, 1))
+result.get_shared_parameters()
+```
+        Parameters:
+            model (GenericFitter | type[GenericFitter] | FunctionBuilder | callable):
+                Model to fit. A fitter class, a fitter instance, a built FunctionBuilder or a function `f(x, *args)`.
+            datasets (list[itfit.data.DataSelection] | None, optional):
+                Data to fit. If None only the Fitter data is used. Defaults to None.
+            shared (dict[str, bool] | list[str] | list[bool], optional):
+                Parameters shared between datasets, by name or as one boolean per parameter. Defaults to none.
+            p0 (list[float] | None, optional):
+                Initial guess, one set for all datasets or one row per dataset. Defaults to the model current arguments if available.
+            only_selected (bool, optional):
+                Only fits selected data of each dataset. Defaults to True.
+
+        Returns:
+            (itfit.engine.GlobalFitResult): Optimal parameters of every dataset.
+        """
+        datasets = [self.data] if datasets is None else datasets
+        return global_fit(model, datasets, shared, p0, only_selected=only_selected)
+
+    def live_handlers(self):
+        """Counts callbacks currently alive on the figure. Useful to detect leaked connections after toggling tools.
+
+        Returns:
+            (dict[str, int]): Number of canvas callbacks per event, plus `drag_points` (points receiving events)
+            and `drag_point_callbacks` (change callbacks connected to those points).
+        """
+        canvas_callbacks = self.figure.canvas.callbacks.callbacks
+        counts = {event: len(callbacks) for event, callbacks in canvas_callbacks.items()}
+        managers = self.blit_manager.dispatcher.managers
+        counts["drag_points"] = len(managers)
+        counts["drag_point_callbacks"] = sum(len(m.connection_callbacks) for m in managers)
+        return counts
+
     def get_plot_builder(self):
         """Returns a itfit.plot.PlotBuilder instance. Used to ease plot creation.
         """
@@ -157,7 +348,7 @@ def foo(x,y) -> bool:
 ```py
 .plot_data(label="Data")\\
 .with_errors()\\
-.with_fit(label=fit.fit_manager.name.capitalize())\\
+.with_fit(label=fit.model.name.capitalize())\\
 .xlabel(xlabel).ylabel(ylabel).title(title)\\       
 .spines()\\
     .start_top_spine().invisible().end_top_spine()\\
@@ -180,7 +371,7 @@ Returns:
         return PlotBuilder(self, fit)\
             .plot_data(label="Data")\
             .with_errors()\
-            .with_fit(label=fit.fit_manager.name.capitalize())\
+            .with_fit(label=fit.model.name.capitalize())\
             .xlabel(xlabel).ylabel(ylabel).title(title)\
             .spines()\
                 .start_top_spine().invisible().end_top_spine()\
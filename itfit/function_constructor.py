@@ -23,6 +23,7 @@ import numpy as np
 
 from .fit_functions import GenericFitter
 from .fit_functions.common import (GenericFitter, GenericFitterTool, FunctionContainer)
+from .utils.sampling import AdaptiveSampler
 
 
 class FunctionBuilder:
@@ -62,9 +63,11 @@ class FunctionBuilder:
                 self.data.get_data()[:,1],
                 linestyle='--',
                 color='black',
-                transform=None
+                transform=None,
+                animated=True
             )
             self.patch = self.app.ax.add_patch(self.poly)
+            self.sampler = AdaptiveSampler(self.app.ax)
             
             self.app.blit_manager.artists.append(self)
         
@@ -73,12 +76,9 @@ class FunctionBuilder:
     def update(self, *_):
         args = self.function_container.get_args()
         _x_data = self.data.get_selected()[0]
-        _length = min(len(_x_data)*3, 250)
-        x = np.linspace(min(_x_data), max(_x_data), _length)
-        y = self.function(x, *args)
-        
-        xy = np.array((x,y)).T.reshape(-1,2)
-        x_data, y_data = self.app.ax.transData.transform(xy).T
+        if len(_x_data) == 0:
+            _x_data = self.data.xdata
+        x_data, y_data = self.sampler.sample(self.function, args, min(_x_data), max(_x_data))
 
         self.poly.set_xdata(x_data)
         self.poly.set_ydata(y_data)
@@ -115,9 +115,11 @@ class PlotBuilder:
         except AttributeError:
             raise Exception("Fit must be plotted prior to fit's error shadow.")
         
-        verts_positive, verts_negative = self.fit.error_verts(only_selected=_only_selected_)
+        band = self.fit.error_band(only_selected=_only_selected_)
+        if band is None:
+            return self
         
-        self.fit_fill = Polygon(verts_positive + list(reversed(verts_negative)),facecolor=color, edgecolor=edgecolor, alpha=alpha, **kargs)
+        self.fit_fill = Polygon(band,facecolor=color, edgecolor=edgecolor, alpha=alpha, **kargs)
         self.ax.add_artist(self.fit_fill)
         self.ax.draw_artist(self.fit_fill)
         return self
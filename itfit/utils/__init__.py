@@ -19,10 +19,32 @@ except NameError:
     __FITTER_UTILS_IMPORTED__= False
 
 if not __FITTER_UTILS_IMPORTED__:
-    from .blit_manager import BlitManager
+    from .blit_manager import BlitManager, AxesCompositor
+    from .dispatcher import DragPointDispatcher
     from .fit_container import FitResultContainer
-    from .fit_selector import FitSelector
-    from .point import DragPoint, DragPointManager
-    from .collection import DragPointCollection
+    from .fit_collection import FitCollection
+    from .sampling import AdaptiveSampler
+    from .data_stream import DataStreamArtist
+    from .frame_stats import FrameRecorder, FPSOverlay
+    from .memory import MemoryReport, FitMemoryTracer
+    
+# Utilities that import matplotlib artists or pyplot are imported on first use
+_LAZY_ = {
+    "FitSelector" : ".fit_selector",
+    "DragPoint" : ".point",
+    "DragPointManager" : ".point",
+    "DragPointCollection" : ".collection",
+}
+
+def __getattr__(name: str):
+    if name not in _LAZY_:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(_LAZY_[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_))
     
 __FITTER_UTILS_IMPORTED__ = True
\ No newline at end of file
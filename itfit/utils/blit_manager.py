@@ -12,13 +12,119 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
+import time
+
+from .dispatcher import DragPointDispatcher
+from .frame_stats import FrameRecorder, FPSOverlay
+
+
+class AxesCompositor:
+    """Blitting layers of one axes.
+
+    * background: the axes as drawn by a full canvas draw. Blitted artists are animated, so they are not part of it.
+    * overlay: background plus the blitted artists that are not being dragged. Only cached during a drag.
+    * drag: artists that change while dragging. They are the only ones redrawn on each drag frame.
+
+    Each axes has its own bitmaps, so several subplots or residual panels can blit independently.
+    """
+    def __init__(self, blit_manager: BlitManager, ax):
+        """Creates an AxesCompositor and connects it to view changes of the axes.
+
+        Parameters:
+            blit_manager (BlitManager):
+                Owner BlitManager.
+            ax (Axes):
+                Axes to composite.
+        """
+        self.blit_manager = blit_manager
+        self.ax = ax
+        self.canvas = blit_manager.canvas
+
+        self.artists = []
+        self.drag_artists: list|None = None # None when nothing is being dragged
+
+        self.background = None
+        self.overlay = None
+
+        self.limits_connection_ids = [self.ax.callbacks.connect('xlim_changed', self.invalidate),
+                                      self.ax.callbacks.connect('ylim_changed', self.invalidate)]
+
+    def invalidate(self, *_):
+        """Marks the cached bitmaps as stale. The next frame will be a full draw."""
+        self.background = None
+        self.overlay = None
+
+    def invalidate_overlay(self):
+        """Marks the overlay bitmap as stale. Used when an artist outside the drag layer changes."""
+        self.overlay = None
+
+    def _draw_artists_(self, artists, artists_visible=True):
+        for a in artists:
+            poly = getattr(a, "poly", a) # custom objects keep their artist in `poly`
+            if poly is not a:
+                a.update()
+            poly.set_visible(artists_visible or getattr(a, "persistent", False))
+            if poly.get_visible() and self.blit_manager._is_drawn_(a):
+                self.ax.draw_artist(poly)
+
+    def capture(self):
+        """Saves the clean background and draws all artists over it. Called right after a full canvas draw."""
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.overlay = None
+        self._draw_artists_(self.artists)
+
+    def begin_drag(self, artists: list):
+        """Moves `artists` to the drag layer. Every other artist goes to the overlay, except `live` ones.
+
+        Parameters:
+            artists (list):
+                Artists that change while dragging.
+        """
+        self.drag_artists = [a for a in self.artists if a in artists or getattr(a, "live", False)]
+        self.overlay = None
+
+    def end_drag(self):
+        """Merges the drag layer back. Every artist is redrawn on the next frame."""
+        self.drag_artists = None
+        self.overlay = None
+
+    def blit(self, artists_visible=True):
+        """Draws one frame from the cached bitmaps. Only the drag layer is redrawn while dragging.
+        The background must be valid."""
+        if self.drag_artists is None or not artists_visible:
+            self.canvas.restore_region(self.background)
+            self._draw_artists_(self.artists, artists_visible)
+        else:
+            if self.overlay is None:
+                self.canvas.restore_region(self.background)
+                self._draw_artists_([a for a in self.artists if a not in self.drag_artists])
+                self.overlay = self.canvas.copy_from_bbox(self.ax.bbox)
+            else:
+                self.canvas.restore_region(self.overlay)
+            self._draw_artists_(self.drag_artists)
+        self.canvas.blit(self.ax.bbox)
+
+    def remove(self):
+        """Disconnects from the axes callbacks."""
+        for cid in self.limits_connection_ids:
+            self.ax.callbacks.disconnect(cid)
+        self.limits_connection_ids = []
+
+
 class BlitManager:
     """**Do not use this class unless you know what blitting is and you are familiar with the rest of the code.**"""
     def __init__(self, app):
-        """Class for managing blitting. DragObjects must be appended to `self.artists`.
+        """Class for managing blitting. DragObjects must be appended to `self.artists` (or added to other
+        axes with `add_artist`) and be animated, so full canvas draws leave them out of the background.
         BlitManager must be manualy enabled and disabled.
         `with` statements can be used to enable or disable blitting temporaly.
 
+        Bitmaps are kept per axes and layer by `AxesCompositor`. They are only recaptured after the canvas is
+        fully drawn. View changes (`xlim_changed`, `ylim_changed`) and `resize_event` invalidate them, so the
+        next frame is a full draw.
+
         Parameters:
             app (Fitter):
                 Aplication using BlitManager.
@@ -28,63 +134,249 @@ class BlitManager:
         self.ax = app.ax
         self.canvas = app.figure.canvas
         
-        self.artists = []
+        self.compositors: dict = {} # Axes -> AxesCompositor
+        self.compositor(self.ax)
 
         self._bind_motion_ : int = -1
         self._enabled_ = False
-        self.background = None
-        self.draw_event_connection_id = None
-        
-    def get_background(self):
-        """"Gets current background and saves it, used in blitting process."""
-        for a in self.artists:
-            a.poly.set_visible(False)
-        
-        for a in self.ax.artists:
-            self.ax.draw_artists(a)
-            
-        self.canvas.blit()
 
-        return self.canvas.copy_from_bbox(self.ax.bbox)
+        self.last_frame: str|None = None # "blit" or "full", kind of the last frame drawn
+        self.frame_counts = {"blit": 0, "full": 0}
+        self.frame_stats: FrameRecorder|None = None # Opt-in, see `enable_frame_stats`
+        self.fps_overlay: FPSOverlay|None = None
+
+        self.max_fps: float|None = 60 # None draws on every event
+        self._pending_ = {} # Objects with pending updates, used as an ordered set
+        self._frame_timer_ = None
+        self._last_frame_time_ = 0.
+
+        self.dispatcher = DragPointDispatcher(self)
+
+        self.draw_event_connection_id = self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.resize_event_connection_id = self.canvas.mpl_connect('resize_event', self.invalidate)
+
+    def compositor(self, ax=None):
+        """Returns the compositor of an axes, creating it if needed.
+
+        Parameters:
+            ax (Axes | None, optional):
+                Axes. Defaults to the main axes.
+        Returns:
+            (AxesCompositor):
+                Compositor of `ax`.
+        """
+        ax = self.ax if ax is None else ax
+        if ax not in self.compositors:
+            self.compositors[ax] = AxesCompositor(self, ax)
+        return self.compositors[ax]
+
+    @property
+    def artists(self):
+        """Blitted artists of the main axes."""
+        return self.compositors[self.ax].artists
+
+    @property
+    def background(self):
+        """Cached background of the main axes."""
+        return self.compositors[self.ax].background
+
+    @background.setter
+    def background(self, background):
+        self.compositors[self.ax].background = background
+
+    def add_artist(self, artist, ax=None):
+        """Adds a blitted artist to an axes.
+
+        Parameters:
+            artist (Any):
+                Animated matplotlib artist or object with `poly` and `update()`.
+            ax (Axes | None, optional):
+                Axes of the artist. Defaults to the main axes.
+        """
+        self.compositor(ax).artists.append(artist)
+
+    def remove_artist(self, artist):
+        """Removes a blitted artist from any axes.
+
+        Parameters:
+            artist (Any):
+                Artist to remove.
+        """
+        for compositor in self.compositors.values():
+            if artist in compositor.artists:
+                compositor.artists.remove(artist)
+                compositor.invalidate_overlay()
+
+    def invalidate(self, *_):
+        """Marks all cached bitmaps as stale. The next frame will be a full draw."""
+        for compositor in self.compositors.values():
+            compositor.invalidate()
+
+    def invalidate_overlay(self, ax=None):
+        """Marks the overlay of an axes as stale. Must be called when an artist outside the drag layer changes during a drag.
+
+        Parameters:
+            ax (Axes | None, optional):
+                Axes. Defaults to the main axes.
+        """
+        self.compositor(ax).invalidate_overlay()
+
+    def _is_drawn_(self, a):
+        """Whether an artist is blitted in the current state."""
+        return self._enabled_ or getattr(a, "persistent", False)
+
+    def get_background(self):
+        """"Draws the whole canvas and returns the clean background of the main axes, without blitted artists."""
+        self.canvas.draw()
+        return self.background
     
     def update_background(self):
         """Updates saved background, used in blitting process."""
         self.background = self.get_background()
 
-    def draw(self, artists_visible=True):
-        """Draws the canvas using blitting."""
-        if self.background is None:
-            self.update_background()
-        self.canvas.restore_region(self.background)
-        
-        for a in self.artists:
-            try: # if custom object
-                a.update()
-                a.poly.set_visible(artists_visible)
-                self.ax.draw_artist(a.poly)
-            except AttributeError: # if matplotlib artists
-                a.set_visible(artists_visible)
-                self.ax.draw_artis(a)
-            
-        self.canvas.blit(self.ax.bbox)
+    def begin_drag(self, artists: list):
+        """Puts `artists` in the drag layer of their axes. Until `end_drag`, frames only redraw them
+        over the cached overlay.
+
+        Parameters:
+            artists (list):
+                Artists that change while dragging.
+        """
+        for compositor in self.compositors.values():
+            compositor.begin_drag(artists)
+
+    def end_drag(self):
+        """Ends a drag started with `begin_drag`."""
+        for compositor in self.compositors.values():
+            compositor.end_drag()
+
+    def draw(self, artists_visible=True, ax=None):
+        """Draws the artists using blitting. If a needed background is stale the canvas is fully drawn instead.
+
+        Parameters:
+            artists_visible (bool, optional):
+                Whether non persistent artists are shown. Defaults to True.
+            ax (Axes | None, optional):
+                Only this axes is drawn. Defaults to every axes with artists, or with a drag layer while dragging.
+        """
+        if ax is not None:
+            compositors = [self.compositor(ax)]
+        else:
+            compositors = [c for c in self.compositors.values() if c.artists]
+            dragging = [c for c in compositors if c.drag_artists]
+            if dragging and artists_visible:
+                compositors = dragging
+            if not compositors:
+                compositors = [self.compositor()]
+
+        start = time.perf_counter() if self.frame_stats is not None else 0.
+        if any(c.background is None for c in compositors):
+            self.canvas.draw() # on_draw captures the backgrounds and draws the artists
+            self.last_frame = "full"
+        else:
+            for compositor in compositors:
+                compositor.blit(artists_visible)
+            self.last_frame = "blit"
+        self.frame_counts[self.last_frame] += 1
+        if self.frame_stats is not None:
+            self.frame_stats.frame(self.last_frame, start)
+
+    def enable_frame_stats(self, capacity: int=1024, overlay: bool=False):
+        """Starts recording frame timings in `frame_stats`. Recording is off by default.
+```py
+fitter.blit_manager.enable_frame_stats(overlay=True)
+# ... drag some points ...
+fitter.blit_manager.frame_stats.histogram("latency", bins=20)
+```
+        Parameters:
+            capacity (int, optional):
+                Number of frames kept in the ring buffer. Defaults to 1024.
+            overlay (bool, optional):
+                Shows frames per second and latency percentiles on the axes. Defaults to False.
+        Returns:
+            (FrameRecorder):
+                Recorder of frame timings.
+        """
+        if self.frame_stats is None or self.frame_stats.capacity != capacity:
+            self.frame_stats = FrameRecorder(capacity)
+            if self.fps_overlay is not None:
+                self.fps_overlay.recorder = self.frame_stats
+        if overlay and self.fps_overlay is None:
+            self.fps_overlay = FPSOverlay(self, self.frame_stats)
+        elif not overlay and self.fps_overlay is not None:
+            self.fps_overlay.remove()
+            self.fps_overlay = None
+        return self.frame_stats
+
+    def disable_frame_stats(self):
+        """Stops recording frame timings and removes the overlay. Recorded frames are kept in the returned recorder.
+
+        Returns:
+            (FrameRecorder | None):
+                Recorder of frame timings, None if recording was not enabled.
+        """
+        if self.fps_overlay is not None:
+            self.fps_overlay.remove()
+            self.fps_overlay = None
+        frame_stats, self.frame_stats = self.frame_stats, None
+        return frame_stats
         
-    def on_draw(self, event):
-        """Trigger for draw event."""
+    def schedule(self, pending):
+        """Schedules a frame. Events arriving faster than `max_fps` are coalesced: only the latest
+        state of each scheduled object is applied before the next frame is drawn.
+
+        Parameters:
+            pending (Any):
+                Object with an `apply_pending()` method, called right before drawing.
+        """
+        self._pending_[pending] = None
+
+        if self.max_fps is None:
+            self.flush()
+            return
+
+        remaining = 1/self.max_fps - (time.perf_counter() - self._last_frame_time_)
+        if remaining <= 0:
+            self.flush()
+        elif self._frame_timer_ is None:
+            self._frame_timer_ = self.canvas.new_timer(interval=int(remaining*1000) + 1)
+            self._frame_timer_.single_shot = True
+            self._frame_timer_.add_callback(self.flush)
+            self._frame_timer_.start()
+
+    def flush(self):
+        """Applies all pending updates and draws one frame."""
+        if self._frame_timer_ is not None:
+            self._frame_timer_.stop()
+            self._frame_timer_ = None
+        if not self._pending_:
+            return
+
+        pending, self._pending_ = self._pending_, {}
+        for p in pending:
+            p.apply_pending()
+
         self.draw()
+        self._last_frame_time_ = time.perf_counter()
+
+    def on_draw(self, event):
+        """Trigger for draw event. Saves the clean background and draws the artists over it."""
+        if event is not None and event.canvas is not self.canvas:
+            return
+        for compositor in self.compositors.values():
+            compositor.capture()
               
     def enable(self):
         """Enables BlitManager."""
         if not self._enabled_:
-            self.update_background()
             self._enabled_ = True
-            # self.draw_event_connection_id = self.canvas.mpl_connect('draw_event', self.on_draw)
+            if self.background is None:
+                self.update_background()
             
     def disable(self):
         """Disables BlitManager."""
         if self._enabled_:
             self._enabled_ = False
-            # self.canvas.mpl_disconnect(self.draw_event_connection_id)
-            self.draw_event_connection_id = None
       
     def enabled(self):
         """Enables Blit Manager and returns itself."""
@@ -92,9 +384,11 @@ class BlitManager:
         return self     
      
     def disabled(self):
-        """Disables BlitManager, redraws without DragObjects and returns itself."""
+        """Disables BlitManager, redraws without DragObjects and returns itself.
+        Artists added to the axes while disabled become part of the background on the next frame."""
         self.disable()
         self.draw(artists_visible=False)
+        self.invalidate()
         return self
     
     @property
@@ -15,6 +15,7 @@
 from matplotlib.lines import Line2D
 
 from . import DragPoint, BlitManager
+from .sampling import AdaptiveSampler
 
 class DragPointCollection:
     """A collection of DragPoints used to implement complex interactive functions.
@@ -46,13 +47,15 @@ class DragPointCollection:
         
         self.ax = blit_manager.ax
         self.canvas = blit_manager.canvas
+        self.sampler = AdaptiveSampler(self.ax)
         
         self.poly = Line2D(
             self.get_xdata_display(),
             self.get_ydata_display(),
             linestyle=linestyle,
             color=color,
-            transform=None
+            transform=None,
+            animated=True
         )
         
         self.patch = self.blit_manager.ax.add_patch(self.poly)  
@@ -84,6 +87,22 @@ class DragPointCollection:
         args  = args if len(args)==2 else args[0]
         return self.ax.transData.transform(args)
         
+    def set_curve(self, xmin, xmax, *args):
+        """Samples `function` between `xmin` and `xmax` and sets it as line data.
+        Sampling adapts to the axes pixel width and the curve shape, and is clipped to the visible x range.
+        
+        Parameters:
+            xmin (float):
+                Interval start in data coordinates.
+            xmax (float):
+                Interval end in data coordinates.
+            *args (list[float]):
+                Arguments of `function`.
+        """
+        x_display, y_display = self.sampler.sample(self.function, args, xmin, xmax)
+        self.poly.set_xdata(x_display)
+        self.poly.set_ydata(y_display)
+        
     def get_xdata_display(self):
         """Gets xdata from DragPoints in display coordinates.
         
@@ -0,0 +1,138 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from matplotlib.lines import Line2D
+    from ..data.streaming import StreamingDataSelection
+    from .blit_manager import BlitManager
+
+
+class _SelectionArtist_:
+    """Selection collection of the streaming data, blitted with the data line."""
+    persistent = True
+
+    def __init__(self, collection):
+        self.poly = collection
+        self.poly.set_animated(True)
+
+    def update(self):
+        pass
+
+
+class DataStreamArtist:
+    """Shows a StreamingDataSelection through the BlitManager.
+    The data line and the selection collection are animated, so they are never part of the blitting background
+    and new samples are drawn by restoring the background and blitting them again. A full redraw only happens
+    when new samples fall outside the current view limits.
+    """
+    persistent = True
+
+    def __init__(self, data: StreamingDataSelection, blit_manager: BlitManager, line: Line2D):
+        """Creates a DataStreamArtist and connects it to data events.
+
+        Parameters:
+            data (itfit.data.StreamingDataSelection):
+                Data to show.
+            blit_manager (BlitManager):
+                Used for automatic ploting.
+            line (Line2D):
+                Line already added to the axes that shows the data.
+        """
+        self.data = data
+        self.blit_manager = blit_manager
+        self.ax = blit_manager.ax
+        self.canvas = blit_manager.canvas
+
+        self.poly = line
+        self.poly.set_animated(True)
+        self.selection: _SelectionArtist_|None = None
+
+        self._seen_ = self.data.total_appended()
+        self._bounds_ = None
+        self._reset_bounds_()
+
+        self.data_cid = self.data.connect(self.on_new_data)
+
+    def update(self):
+        """Updates line data with the data stored. Uses views, data is not copied."""
+        self.poly.set_data(self.data.xdata, self.data.ydata)
+
+    def _reset_bounds_(self):
+        """Computes the data bounds from all stored samples. Only used on full redraws."""
+        if self.data.length() == 0:
+            self._bounds_ = None
+        else:
+            self._bounds_ = [self.data.xdata.min(), self.data.xdata.max(), self.data.ydata.min(), self.data.ydata.max()]
+
+    def _update_bounds_(self):
+        """Extends the data bounds with the samples appended since the last call. Samples dropped by
+        a ring buffer are not removed, so the bounds may be larger than the data until the next full redraw."""
+        total = self.data.total_appended()
+        n = min(total - self._seen_, self.data.length())
+        self._seen_ = total
+        if self.data.length() == 0:
+            self._bounds_ = None
+            return
+        if n <= 0:
+            return
+        x, y = self.data.xdata[-n:], self.data.ydata[-n:]
+        bounds = [x.min(), x.max(), y.min(), y.max()]
+        if self._bounds_ is not None:
+            bounds = [min(bounds[0], self._bounds_[0]), max(bounds[1], self._bounds_[1]),
+                      min(bounds[2], self._bounds_[2]), max(bounds[3], self._bounds_[3])]
+        self._bounds_ = bounds
+
+    def _outside_view_(self):
+        """Checks if the data bounds exceed the current view limits."""
+        if self._bounds_ is None:
+            return False
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        return self._bounds_[0] < x0 or self._bounds_[1] > x1 or \
+               self._bounds_[2] < y0 or self._bounds_[3] > y1
+
+    def _blit_selection_(self):
+        """Moves the selection collection to the BlitManager the first time it exists.
+        Returns True if it was just added, the background must then be redrawn without it."""
+        if self.selection is not None or not self.data._was_plotted:
+            return False
+        self.selection = _SelectionArtist_(self.data.collection)
+        self.blit_manager.add_artist(self.selection)
+        return True
+
+    def on_new_data(self, data):
+        """Callback for new samples."""
+        self.update()
+        self._update_bounds_()
+
+        if self._blit_selection_() or self._outside_view_():
+            self.ax.relim()
+            self.ax.autoscale_view()
+            self._reset_bounds_()
+            self.blit_manager.invalidate()
+            self.canvas.draw_idle()
+            return
+
+        self.blit_manager.invalidate_overlay(self.ax)
+        self.blit_manager.draw()
+
+    def remove(self):
+        """Disconnects from data events."""
+        self.data.disconnect(self.data_cid)
+        if self.selection is not None:
+            self.blit_manager.remove_artist(self.selection)
+            self.selection.poly.set_animated(False)
+            self.selection = None
@@ -0,0 +1,183 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .blit_manager import BlitManager
+    from .point import DragPointManager
+
+import numpy as np
+
+
+class DragPointDispatcher:
+    """Single entry point for mouse and key events of all DragPointManagers on a canvas.
+    Centers and radii of all points are kept in arrays, so a button press is resolved with one
+    vectorized distance query. Motion, release and key events are only routed to the point being dragged.
+    """
+    def __init__(self, blit_manager: BlitManager):
+        """Creates a DragPointDispatcher. Canvas events are connected when the first point is added.
+
+        Parameters:
+            blit_manager (BlitManager):
+                BlitManager of the canvas.
+        """
+        self.blit_manager = blit_manager
+        self.ax = blit_manager.ax
+        self.canvas = blit_manager.canvas
+
+        self.managers: list[DragPointManager] = []
+        self.centers = np.empty((0, 2))
+        self.radii = np.empty(0)
+        self.active: DragPointManager|None = None
+        self.cids: list[int] = []
+
+    def connect_events(self):
+        """Connects canvas events."""
+        if self.cids:
+            return
+        self.cids = [
+            self.canvas.mpl_connect('button_press_event', self.on_button_press),
+            self.canvas.mpl_connect('key_press_event', self.on_key_press),
+            self.canvas.mpl_connect('button_release_event', self.on_button_release),
+            self.canvas.mpl_connect('motion_notify_event', self.on_mouse_move),
+        ]
+
+    def disconnect_events(self):
+        """Disconnects canvas events."""
+        for cid in self.cids:
+            self.canvas.mpl_disconnect(cid)
+        self.cids = []
+
+    def add(self, manager: DragPointManager):
+        """Adds a DragPointManager.
+
+        Parameters:
+            manager (DragPointManager):
+                Manager to route events to.
+        """
+        manager._dispatch_index_ = len(self.managers)
+        self.managers.append(manager)
+        self.centers = np.vstack((self.centers, manager.poly.center))
+        self.radii = np.append(self.radii, manager.poly.get_radius())
+        self.connect_events()
+
+    def remove(self, manager: DragPointManager):
+        """Removes a DragPointManager. Canvas events are disconnected when no point is left.
+
+        Parameters:
+            manager (DragPointManager):
+                Manager to remove.
+        """
+        if manager not in self.managers:
+            return
+        index = self.managers.index(manager)
+        self.managers.pop(index)
+        self.centers = np.delete(self.centers, index, axis=0)
+        self.radii = np.delete(self.radii, index)
+        for i, m in enumerate(self.managers[index:], start=index):
+            m._dispatch_index_ = i
+        if self.active is manager:
+            self.active = None
+        if not self.managers:
+            self.disconnect_events()
+
+    def move(self, manager: DragPointManager, x: float, y: float):
+        """Updates the stored center of a point.
+
+        Parameters:
+            manager (DragPointManager):
+                Manager of the point.
+            x (float):
+                x in display coordinates.
+            y (float):
+                y in display coordinates.
+        """
+        self.centers[manager._dispatch_index_] = (x, y)
+
+    def hit_test(self, x: float, y: float):
+        """Finds the point under the given display position.
+
+        Parameters:
+            x (float):
+                x in display coordinates.
+            y (float):
+                y in display coordinates.
+        Returns:
+            (DragPointManager | None):
+                Closest manager whose point is under the position, None if there is none.
+        """
+        if not self.managers:
+            return None
+        distance = np.hypot(self.centers[:, 0] - x, self.centers[:, 1] - y)
+        index = int(np.argmin(distance / self.radii))
+        if distance[index] < 1.5*self.radii[index]:
+            return self.managers[index]
+        return None
+
+    def on_button_press(self, event):
+        """Callback for mouse button presses. Routes it to the point under the mouse.
+        Presses on axes without points, like buttons or residual panels, are ignored."""
+        if event.inaxes is None:
+            return
+        if event.button != 1:
+            return
+        if self.blit_manager.bind_motion != -1:
+            return
+        if not any(m.ax is event.inaxes for m in self.managers):
+            return
+
+        manager = self.hit_test(event.x, event.y)
+        if manager is not None and manager.ax is event.inaxes:
+            self.active = manager
+            self.blit_manager.begin_drag(self.dependents(manager))
+            manager.on_button_press(event)
+
+    def on_button_release(self, event):
+        """Callback for mouse button releases. Routed to the active point."""
+        if self.active is not None:
+            self.active.on_button_release(event)
+            if event.button == 1:
+                self.active = None
+                self.blit_manager.end_drag()
+
+    def dependents(self, manager: DragPointManager):
+        """Finds the blitted artists that change when a point moves: the point itself and the owners
+        of its change callbacks. If a callback has no known owner, every artist is returned.
+
+        Parameters:
+            manager (DragPointManager):
+                Manager of the point.
+        Returns:
+            (list):
+                Artists to redraw while the point is dragged.
+        """
+        artists = [a for c in self.blit_manager.compositors.values() for a in c.artists]
+        dependents = [manager]
+        for function in manager.connection_callbacks.values():
+            owner = getattr(function, "__self__", None)
+            if not any(owner is a for a in artists):
+                return artists
+            dependents.append(owner)
+        return dependents
+
+    def on_mouse_move(self, event):
+        """Callback for mouse movements. Routed to the active point."""
+        if self.active is not None:
+            self.active.on_mouse_move(event)
+
+    def on_key_press(self, event):
+        """Callback for key presses. Routed to the active point."""
+        if self.active is not None:
+            self.active.on_key_press(event)
@@ -0,0 +1,670 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .fit_container import FitResultContainer
+    from ..engine.model import ModelDescriptor
+
+import operator
+import weakref
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from ..engine.common import parameter_names
+from ..engine.telemetry import FitTelemetry
+
+
+class ColumnTable:
+    """Growable set of equally long NumPy columns. Buffers double their size when full."""
+    _INITIAL_CAPACITY_ = 64
+
+    def __init__(self, dtypes: dict):
+        """Creates an empty ColumnTable.
+
+        Parameters:
+            dtypes (dict[str, dtype]):
+                Column names and types.
+        """
+        self.dtypes = dict(dtypes)
+        self._capacity_ = self._INITIAL_CAPACITY_
+        self._buffers_ = {name: np.zeros(self._capacity_, dtype=dtype) for name, dtype in self.dtypes.items()}
+        self._length_ = 0
+
+    @classmethod
+    def from_columns(cls, columns: dict):
+        """Creates a ColumnTable from equally long arrays. Arrays are copied.
+
+        Parameters:
+            columns (dict[str, NDArray]):
+                Column names and values.
+        Returns:
+            (ColumnTable):
+                New table.
+        """
+        table = cls({name: values.dtype for name, values in columns.items()})
+        length = len(next(iter(columns.values()))) if columns else 0
+        table._capacity_ = max(cls._INITIAL_CAPACITY_, length)
+        table._buffers_ = {name: np.zeros(table._capacity_, dtype=values.dtype) for name, values in columns.items()}
+        for name, values in columns.items():
+            table._buffers_[name][:length] = values
+        table._length_ = length
+        return table
+
+    def __len__(self):
+        return self._length_
+
+    def __getitem__(self, name: str):
+        """Returns a view of column `name`."""
+        return self._buffers_[name][:self._length_]
+
+    def __contains__(self, name: str):
+        return name in self._buffers_
+
+    def append(self, **values):
+        """Appends one row. Missing columns are left as zeros.
+
+        Returns:
+            (int):
+                Row index.
+        """
+        if self._length_ == self._capacity_:
+            self._capacity_ *= 2
+            for name, buffer in self._buffers_.items():
+                new_buffer = np.zeros(self._capacity_, dtype=buffer.dtype)
+                new_buffer[:self._length_] = buffer[:self._length_]
+                self._buffers_[name] = new_buffer
+        row = self._length_
+        for name, value in values.items():
+            self._buffers_[name][row] = value
+        self._length_ += 1
+        return row
+
+    def clear(self):
+        """Removes all rows. Capacity is kept."""
+        self._length_ = 0
+
+
+_OPERATORS_ = {
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "in": lambda column, values: np.isin(column, list(values)),
+}
+
+
+class IdCounter:
+    """Next free fit id. Shared by a FitCollection and the collections derived from it, so ids are never reused."""
+    def __init__(self):
+        self.next = 0
+
+    def take(self):
+        """Returns a new id."""
+        key = self.next
+        self.next += 1
+        return key
+
+    def reserve(self, key: int):
+        """Marks `key` and every smaller id as used."""
+        self.next = max(self.next, key + 1)
+
+
+class FitFamily:
+    """Fits of one model stored as a structured NumPy array, one record per fit.
+    The array doubles its size when full.
+    """
+    _INITIAL_CAPACITY_ = 64
+
+    def __init__(self, name: str, names: tuple[str], model: ModelDescriptor):
+        """Creates an empty FitFamily.
+
+        Parameters:
+            name (str):
+                Model name.
+            names (tuple[str]):
+                Parameter names.
+            model (itfit.engine.ModelDescriptor):
+                Model of the fits. Used to rebuild FitResultContainers.
+        """
+        self.name = name
+        self.names = names
+        self.model = model
+
+        p = len(names)
+        self.dtype = np.dtype([
+            ("id", np.int64),
+            ("row", np.int64), # Row in the FitCollection index
+            ("popt", np.float64, (p,)),
+            ("perr", np.float64, (p,)),
+            ("pcov", np.float64, (p, p)),
+            ("nfev", np.int64),
+            ("cost", np.float64),
+            ("chi2_red", np.float64),
+            ("dof", np.int64),
+            ("ier", np.int64),
+            ("mesg", np.int32), # Index in FitCollection messages
+            ("selection", np.int64), # Index in FitCollection selections
+            ("telemetry", FitTelemetry.dtype),
+        ])
+        self._records_ = np.zeros(self._INITIAL_CAPACITY_, dtype=self.dtype)
+        self._length_ = 0
+
+    def __len__(self):
+        return self._length_
+
+    @property
+    def records(self):
+        """View of the stored records."""
+        return self._records_[:self._length_]
+
+    def append(self, **values):
+        """Appends one record.
+
+        Returns:
+            (int):
+                Record index.
+        """
+        if self._length_ == len(self._records_):
+            records = np.zeros(2*len(self._records_), dtype=self.dtype)
+            records[:self._length_] = self._records_[:self._length_]
+            self._records_ = records
+        index = self._length_
+        record = self._records_[index]
+        for name, value in values.items():
+            record[name] = value
+        self._length_ += 1
+        return index
+
+    @classmethod
+    def from_records(cls, family: FitFamily, records):
+        """Creates a FitFamily like `family` holding a copy of `records`."""
+        new = cls(family.name, family.names, family.model)
+        new._records_ = np.array(records, dtype=family.dtype)
+        new._length_ = len(records)
+        if len(new._records_) == 0:
+            new._records_ = np.zeros(cls._INITIAL_CAPACITY_, dtype=family.dtype)
+        return new
+
+
+class FitCollection(MutableMapping):
+    """Registry of fits, used as `Fitter.fits`. Behaves as a dictionary from fit id to FitResultContainer.
+
+    Fits are not kept as FitResultContainers. Each model family stores parameters, errors, covariance, number
+    of evaluations, cost and a reference to the data fitted in one structured array (`FitFamily`), and a
+    columnar index (model, chi2, reduced chi2, degrees of freedom, evaluations, parameters by name) is kept
+    for all fits. FitResultContainers are rebuilt on access. Ids increase monotonically and are never reused.
+    `query` selects fits with vectorized masks and never needs a figure.
+    """
+    _COLUMNS_ = {
+        "key": np.int64,
+        "model": np.int32,
+        "alive": bool,
+        "chi2": np.float64,
+        "chi2_red": np.float64,
+        "dof": np.int64,
+        "nfev": np.int64,
+        "ier": np.int64,
+        "family": np.int32,
+        "index": np.int64, # Record in the family
+    }
+    _NO_TELEMETRY_ = (np.nan, np.nan, np.nan, np.nan, 0, 0, -1)
+
+    def __init__(self, *args, **kargs):
+        """Creates a FitCollection. Accepts the same arguments as `dict`."""
+        self._table_ = ColumnTable(self._COLUMNS_)
+        self._rows_: dict = {} # key -> row in `_table_`
+        self._models_: list[str] = [] # model code -> model name
+        self._families_: list[FitFamily] = []
+        self._family_codes_: dict = {} # (model name, parameter names, model) -> family code
+        self._names_cache_: dict = {}
+        self._ids_ = IdCounter()
+
+        self._selections_: list = [] # Data fitted, shared by all fits of the same selection
+        self._selection_codes_: dict = {} # id(selection) -> index
+        self._messages_: list[str] = []
+
+        self._materialized_ = weakref.WeakValueDictionary()
+        self._kept_: dict = {} # Fits that can not be rebuilt from records
+        self.update(*args, **kargs)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_materialized_") # Weak references can not be pickled
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._materialized_ = weakref.WeakValueDictionary(self._kept_)
+        self._selection_codes_ = {id(data): code for code, data in enumerate(self._selections_)}
+
+    # Mapping interface
+    def __getitem__(self, key):
+        row = self._rows_[key]
+        fit = self._materialized_.get(key)
+        if fit is None:
+            fit = self._materialize_(row)
+            self._materialized_[key] = fit
+        return fit
+
+    def __setitem__(self, key, fit: FitResultContainer):
+        if key in self._rows_:
+            self._kill_(key)
+        self._index_(key, fit)
+        self._ids_.reserve(key)
+        self._materialized_[key] = fit
+        if getattr(fit, "diagnostics", None) is not None:
+            self._kept_[key] = fit # Diagnostics are not in the records
+
+    def __delitem__(self, key):
+        if key not in self._rows_:
+            raise KeyError(key)
+        self._kill_(key)
+
+    def __iter__(self):
+        return iter(list(self._rows_))
+
+    def __len__(self):
+        return len(self._rows_)
+
+    def __contains__(self, key):
+        return key in self._rows_
+
+    def __repr__(self):
+        return f"FitCollection({len(self)} fits, models: {', '.join(sorted(set(self._models_)))})"
+
+    def clear(self):
+        self._table_.clear()
+        self._rows_.clear()
+        self._families_.clear()
+        self._family_codes_.clear()
+        self._materialized_.clear()
+        self._kept_.clear()
+
+    def copy(self):
+        return self._subset_(np.flatnonzero(self._table_["alive"]))
+
+    def add(self, fit: FitResultContainer):
+        """Stores a fit with a new id.
+
+        Parameters:
+            fit (FitResultContainer):
+                Fit to store.
+        Returns:
+            (int):
+                Id of the fit.
+        """
+        key = self._ids_.take()
+        self[key] = fit
+        return key
+
+    def _kill_(self, key):
+        row = self._rows_.pop(key, None)
+        if row is not None:
+            self._table_["alive"][row] = False
+        self._materialized_.pop(key, None)
+        self._kept_.pop(key, None)
+
+    def _code_(self, values: list, value):
+        if value not in values:
+            values.append(value)
+        return values.index(value)
+
+    def _selection_code_(self, data):
+        code = self._selection_codes_.get(id(data))
+        if code is None or self._selections_[code] is not data:
+            code = len(self._selections_)
+            self._selections_.append(data)
+            self._selection_codes_[id(data)] = code
+        return code
+
+    def _parameter_names_(self, function, length: int):
+        """Parameter names of a fit function. Cached, signatures are slow to inspect."""
+        key = (getattr(function, "__func__", function), length)
+        if key not in self._names_cache_:
+            self._names_cache_[key] = tuple(parameter_names(function, length))
+        return self._names_cache_[key]
+
+    def _family_code_(self, name: str, names: tuple, fit: FitResultContainer):
+        family_key = (name, names, fit.model)
+        code = self._family_codes_.get(family_key)
+        if code is None:
+            code = len(self._families_)
+            self._families_.append(FitFamily(name, names, fit.model))
+            self._family_codes_[family_key] = code
+        return code
+
+    def _index_(self, key, fit: FitResultContainer):
+        """Stores the summary of a fit in its family and in the index."""
+        name = fit.model.name
+        popt = np.atleast_1d(np.asarray(fit.get_parameters(), dtype=float))
+        pcov = np.asarray(fit.get_parameters_covariance(), dtype=float).reshape(popt.size, popt.size)
+        names = fit.model.parameter_names
+        if len(names) != popt.size:
+            names = self._parameter_names_(fit.function, popt.size)
+        code = self._family_code_(name, names, fit)
+        family = self._families_[code]
+
+        chi2, chi2_red, dof = fit.get_chi2(), fit.get_chi2_reduced(), fit.get_dof()
+        nfev, ier = fit.nfev or 0, fit.ier
+        row = len(self._table_)
+        index = family.append(
+            id=key, row=row, popt=popt, perr=np.sqrt(np.abs(np.diag(pcov))), pcov=pcov,
+            nfev=nfev, cost=0.5*chi2, chi2_red=chi2_red, dof=dof, ier=ier,
+            mesg=self._code_(self._messages_, fit.get_message()), selection=self._selection_code_(fit.data),
+            telemetry=fit.telemetry.to_record() if fit.telemetry is not None else self._NO_TELEMETRY_,
+        )
+        self._table_.append(
+            key=key, model=self._code_(self._models_, name), alive=True,
+            chi2=chi2, chi2_red=chi2_red, dof=dof, nfev=nfev, ier=ier, family=code, index=index,
+        )
+        self._rows_[key] = row
+
+    def _materialize_(self, row: int):
+        """Builds the FitResultContainer of an index row."""
+        # Imported here, FitResultContainer module imports this one for type checking only
+        from .fit_container import FitResultContainer
+        family = self._families_[self._table_["family"][row]]
+        record = family.records[self._table_["index"][row]]
+        info = {"nfev": int(record["nfev"]), "chi2": 2*float(record["cost"]), "dof": int(record["dof"])}
+        scipy_result = (record["popt"].copy(), record["pcov"].copy(), info, self._messages_[record["mesg"]], int(record["ier"]))
+        return FitResultContainer(self._selections_[record["selection"]], family.model, scipy_result,
+                                  telemetry=FitTelemetry.from_record(record["telemetry"]))
+
+    def get_record(self, key):
+        """Returns the stored record of a fit without building a FitResultContainer.
+
+        Parameters:
+            key (int):
+                Fit id.
+        Returns:
+            (numpy.void):
+                Record with fields id, popt, perr, pcov, nfev, cost, chi2_red, dof, ier, mesg and selection.
+        """
+        row = self._rows_[key]
+        return self._families_[self._table_["family"][row]].records[self._table_["index"][row]]
+
+    def families(self, model: str|None=None):
+        """Returns the stored model families.
+
+        Parameters:
+            model (str | None, optional):
+                Only families of this model. Defaults to None, all.
+        Returns:
+            (list[FitFamily]):
+                Families. Records of removed or replaced fits are included, filter them with `FitCollection.live_records`.
+        """
+        return [f for f in self._families_ if model is None or f.name == model]
+
+    def live_records(self, family: FitFamily):
+        """Returns the records of a family whose fits are still stored. Records of removed fits, and of fits
+        replaced by assigning a new fit to the same id, are left out.
+
+        Parameters:
+            family (FitFamily):
+                Family of this collection.
+        Returns:
+            (NDArray):
+                Live records.
+        """
+        records = family.records
+        rows = records["row"]
+        live = self._table_["alive"][rows] & (self._table_["key"][rows] == records["id"])
+        return records[live]
+
+    def column(self, name: str):
+        """Returns a metadata column, aligned with internal rows. Rows of removed fits are kept but not alive.
+
+        Parameters:
+            name (str):
+                Column name. One of key, model, alive, chi2, chi2_red, dof, nfev or ier.
+        Returns:
+            (NDArray):
+                Column view.
+        """
+        if name not in self._table_:
+            raise Exception(f"Unknown fit column '{name}'.")
+        return self._table_[name]
+
+    def parameter_column(self, name: str, errors: bool=False):
+        """Returns a parameter column aligned with internal rows. Rows of fits without that parameter are NaN.
+
+        Parameters:
+            name (str):
+                Parameter name, as in the fit function signature.
+            errors (bool, optional):
+                Return parameter errors instead of values. Defaults to False.
+        Returns:
+            (NDArray[float]):
+                Parameter values.
+        """
+        values = np.full(len(self._table_), np.nan)
+        found = False
+        for family in self._families_:
+            if name in family.names:
+                records = family.records
+                values[records["row"]] = records["perr" if errors else "popt"][:, family.names.index(name)]
+                found = True
+        if not found:
+            raise Exception(f"No fit has a parameter named '{name}'.")
+        return values
+
+    def _field_(self, field: str):
+        if field in self._table_ and field not in ("model", "family", "index"):
+            return self._table_[field]
+        return self.parameter_column(field)
+
+    def mask(self, model: str|list[str]|None=None, param_range: dict|None=None, **conditions):
+        """Vectorized mask over internal rows. Arguments as in `query`.
+
+        Returns:
+            (NDArray[bool]):
+                True for rows of fits that match.
+        """
+        mask = self._table_["alive"].copy()
+
+        if model is not None:
+            models = [model] if isinstance(model, str) else list(model)
+            codes = [self._models_.index(m) for m in models if m in self._models_]
+            mask &= np.isin(self._table_["model"], codes)
+
+        for name, (low, high) in (param_range or {}).items():
+            values = self.parameter_column(name)
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+
+        for condition, value in conditions.items():
+            field, _, op = condition.partition("__")
+            op = op or "eq"
+            if op not in _OPERATORS_:
+                raise Exception(f"Unknown operator '{op}' in '{condition}'. Use one of {', '.join(_OPERATORS_)}.")
+            with np.errstate(invalid='ignore'):
+                mask &= _OPERATORS_[op](self._field_(field), value)
+        return mask
+
+    def query(self, model: str|list[str]|None=None, param_range: dict|None=None, **conditions):
+        """Selects fits by model, parameters and fit statistics without opening any figure.
+
+        Conditions are written as `field__operator=value`, with operators lt, le, gt, ge, eq, ne and in
+        (`field=value` means eq). Fields are the metadata columns (chi2, chi2_red, dof, nfev, ier) or
+        parameter names. Example: `fits.query(model="gaussian", chi2_red__lt=1.5, param_range={"s": (0, 3)})`.
+
+        Parameters:
+            model (str | list[str] | None, optional):
+                Model name or names, as `GenericFitter.name`. Defaults to None, any model.
+            param_range (dict[str, tuple[float|None, float|None]] | None, optional):
+                Closed interval for each parameter. None leaves a side open. Defaults to None.
+            **conditions:
+                Conditions on fields.
+
+        Returns:
+            (FitCollection):
+                Fits that match, in insertion order.
+        """
+        return self._subset_(np.flatnonzero(self.mask(model, param_range, **conditions)))
+
+    def _subset_(self, rows):
+        """New FitCollection with the given internal rows. Records are copied, fits are not rebuilt."""
+        subset = FitCollection()
+        subset._models_ = list(self._models_)
+        subset._names_cache_ = self._names_cache_
+        subset._ids_ = self._ids_ # Shared, ids added to the subset are not reused by this collection
+        # Selections and messages only grow, so they can be shared
+        subset._selections_ = self._selections_
+        subset._selection_codes_ = self._selection_codes_
+        subset._messages_ = self._messages_
+
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = {name: self._table_[name][rows] for name in self._COLUMNS_}
+        for code, family in enumerate(self._families_):
+            in_family = np.flatnonzero(columns["family"] == code)
+            records = family.records[columns["index"][in_family]].copy()
+            records["row"] = in_family
+            columns["family"][in_family] = len(subset._families_)
+            columns["index"][in_family] = np.arange(in_family.size)
+            subset._family_codes_[next(k for k, c in self._family_codes_.items() if c == code)] = len(subset._families_)
+            subset._families_.append(FitFamily.from_records(family, records))
+
+        subset._table_ = ColumnTable.from_columns(columns)
+        keys = columns["key"].tolist()
+        subset._rows_ = dict(zip(keys, range(len(keys))))
+        for key in keys:
+            fit = self._materialized_.get(key)
+            if fit is not None:
+                subset._materialized_[key] = fit
+            if key in self._kept_:
+                subset._kept_[key] = self._kept_[key]
+        return subset
+
+    def memory_items(self):
+        """Yields what the collection keeps in memory, for memory accounting (see `Fitter.memory_report`).
+
+        Returns:
+            (Iterator[tuple[str, str, Any]]):
+                Category, item name and value holding arrays. Categories are "fit data copies", "fit records",
+                "fit diagnostics" and "fit curve caches".
+        """
+        for i, data in enumerate(self._selections_):
+            yield "fit data copies", f"data of fits #{i}", data
+        for family in self._families_:
+            yield "fit records", f"{family.name} records", family._records_
+        yield "fit records", "index", self._table_
+        for key, fit in list(self._kept_.items()) + list(self._materialized_.items()):
+            for category, value in fit.memory_items():
+                yield category, f"fit {key}", value
+
+    def to_npz(self, path, model: str|None=None):
+        """Saves the records of every model family. Each family is written as one structured array,
+        named after the model (with a numeric suffix if several families share a name).
+
+        Parameters:
+            path (str | Path):
+                Output file.
+            model (str | None, optional):
+                Only save this model. Defaults to None, all models.
+        """
+        arrays = {}
+        for family in self.families(model):
+            records = self.live_records(family)
+            label, i = family.name, 1
+            while label in arrays:
+                label, i = f"{family.name}_{i}", i + 1
+            arrays[label] = records
+        np.savez(path, **arrays)
+
+    def to_csv(self, path, model: str|None=None, delimiter: str=','):
+        """Saves one model family as a CSV table with columns id, parameters, parameter errors,
+        chi2_red, cost, nfev, dof and ier. Covariances are only saved by `to_npz`.
+
+        Parameters:
+            path (str | Path):
+                Output file.
+            model (str | None, optional):
+                Model to save. Can be omitted if all fits share one model. Defaults to None.
+            delimiter (str, optional):
+                Column delimiter. Defaults to ','.
+        """
+        families = self.families(model)
+        if len(families) != 1:
+            raise Exception(f"CSV export needs exactly one model family, found {len(families)}. Use the `model` argument.")
+        family = families[0]
+        records = self.live_records(family)
+
+        p = len(family.names)
+        table = np.column_stack((records["id"], records["popt"], records["perr"], records["chi2_red"],
+                                 records["cost"], records["nfev"], records["dof"], records["ier"]))
+        header = delimiter.join(["id", *family.names, *[f"{n}_err" for n in family.names],
+                                 "chi2_red", "cost", "nfev", "dof", "ier"])
+        fmt = ["%d"] + ["%.18e"]*(2*p + 2) + ["%d"]*3
+        np.savetxt(path, table, fmt=fmt, delimiter=delimiter, header=header, comments='')
+
+
+if __name__=='__main__':
+    import os
+    import pickle
+    import tempfile
+    from .fit_container import FitResultContainer
+    from ..data import DataSelection
+
+    def gaussian(x, A, m, s):
+        return A*np.exp(-0.5*(x-m)**2/s**2)
+    def line(x, a, b):
+        return a*x + b
+    data = DataSelection(np.arange(10.), np.arange(10.))
+    def _fit(function, popt, chi2=8.):
+        popt = np.asarray(popt, dtype=float)
+        return FitResultContainer(data, function, (popt, np.eye(popt.size), {"nfev": 3, "chi2": chi2, "dof": 8}, "ok", 1))
+
+    fits = FitCollection()
+    keys = [fits.add(_fit(gaussian, (i, 0, 1), chi2=8.*i)) for i in range(4)]
+    fits.add(_fit(line, (1, 2)))
+    assert keys == [0, 1, 2, 3] and len(fits) == 5                                  , "add error"
+    assert list(fits.query(chi2_red__lt=1.5).keys()) == [0, 1, 4]                   , "lt operator error"
+    assert list(fits.query(model="gaussian", chi2_red__ge=2).keys()) == [2, 3]       , "ge operator error"
+    assert list(fits.query(chi2_red__in=(0, 3)).keys()) == [0, 3]                   , "in operator error"
+    assert list(fits.query(A__ne=1, model="gaussian").keys()) == [0, 2, 3]          , "parameter field error"
+    assert list(fits.query(param_range={"A": (1, 2)}).keys()) == [1, 2]             , "param_range error"
+    assert list(fits.query(param_range={"A": (None, 0)}).keys()) == [0]             , "open param_range error"
+
+    subset = fits.query(model=["gaussian", "line"], param_range={"A": (2, None)})
+    assert list(subset.keys()) == [2, 3] and len(subset.families()) == 2            , "subset families error"
+    assert subset[3].popt[0] == 3 and subset.get_record(2)["row"] == 0              , "subset remapping error"
+    assert subset.add(_fit(line, (0, 0))) != fits.add(_fit(line, (0, 0)))           , "subset id reuse error"
+
+    del fits[1]
+    fits[0] = _fit(line, (5, 6))
+    assert 1 not in fits and fits[0].popt[0] == 5                                   , "delete or replace error"
+    assert list(fits.query(model="gaussian").keys()) == [2, 3]                      , "replaced fit still queried"
+
+    directory = tempfile.mkdtemp()
+    fits.to_csv(os.path.join(directory, "gaussian.csv"), model="gaussian")
+    table = np.loadtxt(os.path.join(directory, "gaussian.csv"), delimiter=',', skiprows=1)
+    assert (table[:, 0] == [2, 3]).all()                                            , "csv exports dead records"
+    with open(os.path.join(directory, "gaussian.csv")) as file:
+        assert file.read().splitlines()[1].startswith("2,")                         , "csv integer format error"
+    fits.to_npz(os.path.join(directory, "fits.npz"))
+    with np.load(os.path.join(directory, "fits.npz")) as arrays:
+        assert sorted(arrays["line"]["id"]) == [0, 4, 6]                            , "npz export error"
+
+    restored = pickle.loads(pickle.dumps(fits))
+    assert list(restored.keys()) == list(fits.keys())                               , "pickle keys error"
+    assert np.allclose(restored[3].popt, fits[3].popt)                              , "pickle records error"
+    assert restored.add(_fit(line, (0, 0))) == fits.add(_fit(line, (0, 0)))         , "pickle id counter error"
+    print("All tests OK")
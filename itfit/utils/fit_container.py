@@ -17,37 +17,147 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from ..data import DataSelection
     from ..fit_functions.common import FunctionContainer, GenericFitter
+    from ..engine.telemetry import FitTelemetry
 
+import atexit
+import shutil
+import tempfile
 
 import numpy as np
 
+from ..engine.model import ModelDescriptor
+
+
+_SPILL_DIRECTORY_: str|None = None
+
+
+def _spill_directory_():
+    """Temporary directory for diagnostics spilled to disk. Created on first use and removed at exit."""
+    global _SPILL_DIRECTORY_
+    if _SPILL_DIRECTORY_ is None:
+        _SPILL_DIRECTORY_ = tempfile.mkdtemp(prefix="itfit-")
+        atexit.register(shutil.rmtree, _SPILL_DIRECTORY_, True)
+    return _SPILL_DIRECTORY_
+
+
+def store_diagnostic(array, mode: str|None):
+    """Stores a scipy diagnostic array as requested by `mode`.
+
+    Parameters:
+        array (NDArray | None):
+            Diagnostic array.
+        mode (str | None):
+            None drops it, "full" keeps it, "float32" keeps a float32 copy of floating arrays (integer arrays such
+            as `ipvt` are kept as they are) and "disk" spills it to a temporary file opened as a read only memory map.
+    Returns:
+        (NDArray | None):
+            Stored array.
+    """
+    if mode is None or array is None:
+        return None
+    if mode == "full":
+        return array
+    if mode == "float32":
+        array = np.asarray(array)
+        return array.astype(np.float32) if np.issubdtype(array.dtype, np.floating) else array
+    if mode == "disk":
+        with tempfile.NamedTemporaryFile(dir=_spill_directory_(), suffix=".npy", delete=False) as file:
+            np.save(file, np.asarray(array))
+        return np.load(file.name, mmap_mode='r')
+    raise Exception(f"Unknown diagnostics mode '{mode}'. Use None, 'full', 'float32' or 'disk'.")
+
 
 class FitResultContainer:
-    def __init__(self, data: DataSelection, fit_manager: FunctionContainer|GenericFitter, scipy_result: dict):
-        """_summary_
+    """Result of a fit. Only parameters, covariance and summary statistics are kept by default.
+    Large scipy diagnostics (`fvec`, `fjac`, `ipvt` and `qtf`) are kept only if requested with `diagnostics`.
+    The model is kept as a figure detached `ModelDescriptor`, so results can be pickled and sent to other processes."""
+    __slots__ = ("data", "model", "popt", "pcov", "nfev", "mesg", "ier",
+                 "chi2", "dof", "diagnostics", "telemetry", "_curve_cache_", "__weakref__")
+    grid_resolution: int = 2000 # Maximum number of points of fit curves and error bands
+    _DIAGNOSTICS_ = ("fvec", "fjac", "ipvt", "qtf")
+
+    def __init__(self, data: DataSelection, fit_manager: FunctionContainer|GenericFitter, scipy_result: dict, diagnostics: str|None=None,
+                 telemetry: FitTelemetry|None=None):
+        """Creates a FitResultContainer.
 
         Parameters:
             data (itfit.data.DataSelection):
                 Data fitted.
-            fit_manager (FunctionContainer|GenericFitter):
-                Fit function used
+            fit_manager (FunctionContainer|GenericFitter|ModelDescriptor):
+                Fit function used. Only its `ModelDescriptor` is kept.
             scipy_result (dict):
                 Dictionary of `scipy.optimize.curve_fit` output.
+            diagnostics (str | None, optional):
+                How to keep `fvec`, `fjac`, `ipvt` and `qtf`: None drops them, "full" keeps them, "float32"
+                keeps float32 copies and "disk" spills them to temporary memory mapped files. Defaults to None.
+            telemetry (itfit.engine.FitTelemetry | None, optional):
+                Timing breakdown of the fit. Defaults to None.
         """
         self.data = data
-        self.function = fit_manager.function
-        self.gradient = fit_manager.gradient
-        self.fit_manager = fit_manager
-        self.scipy_output = {
-            "popt" : scipy_result[0],
-            "pcov" : scipy_result[1],
-            "fvec" : scipy_result[2]["fvec"],
-            "nfev" : scipy_result[2]["nfev"],
-            "fjac" : scipy_result[2]["fjac"],
-            "ipvt" : scipy_result[2]["ipvt"],
-            "qtf"  : scipy_result[2]["qtf"],
-            "mesg" : scipy_result[3],
-            "ier"  : scipy_result[4] 
+        self.model = ModelDescriptor.from_model(fit_manager)
+        self.telemetry = telemetry
+        self._curve_cache_ = None
+
+        info = scipy_result[2]
+        self.popt = scipy_result[0]
+        self.pcov = scipy_result[1]
+        self.nfev = info.get("nfev")
+        self.mesg = scipy_result[3]
+        self.ier = scipy_result[4]
+
+        # Summary statistics, kept even if diagnostics are dropped
+        if info.get("fvec") is not None:
+            fvec = np.ravel(np.asarray(info["fvec"], dtype=float))
+            self.chi2 = float(np.dot(fvec, fvec))
+            self.dof = int(fvec.size - np.size(scipy_result[0]))
+        else:
+            self.chi2 = info.get("chi2", np.nan)
+            self.dof = info.get("dof", 0)
+
+        if diagnostics is None:
+            self.diagnostics = None
+        else:
+            self.diagnostics = {name: store_diagnostic(info.get(name), diagnostics) for name in self._DIAGNOSTICS_}
+
+    @property
+    def function(self):
+        """Fit function `f(x, *args)`."""
+        return self.model.function
+
+    @property
+    def gradient(self):
+        """Gradient of the fit function with respect to the parameters."""
+        return self.model.gradient
+
+    @property
+    def fit_manager(self):
+        """Model of the fit. Kept for compatibility, same as `model`."""
+        return self.model
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__[:-2]}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._curve_cache_ = None
+
+    @property
+    def scipy_output(self):
+        """Dictionary with `scipy.optimize.curve_fit` output. Diagnostics not kept are None."""
+        diagnostics = self.diagnostics or {}
+        return {
+            "popt" : self.popt,
+            "pcov" : self.pcov,
+            "fvec" : diagnostics.get("fvec"),
+            "nfev" : self.nfev,
+            "fjac" : diagnostics.get("fjac"),
+            "ipvt" : diagnostics.get("ipvt"),
+            "qtf"  : diagnostics.get("qtf"),
+            "mesg" : self.mesg,
+            "ier"  : self.ier,
+            "chi2" : self.chi2,
+            "dof"  : self.dof,
         }
         
     def get_parameters(self):
@@ -57,7 +167,7 @@ class FitResultContainer:
             (tuple[float]):
                 tuple of parameters.
         """
-        return self.scipy_output["popt"]
+        return self.popt
         
     def get_parameters_covariance(self):
         """Gets the parameters covariance matrix.
@@ -66,7 +176,7 @@ class FitResultContainer:
             (Ndarray(NxN)[float]):
                 Parameters covariance matrix.
         """
-        return self.scipy_output["pcov"]
+        return self.pcov
         
     def get_parameters_errors(self):
         """Gets the square root of diagonal elements of the covariance matrix.
@@ -77,6 +187,34 @@ class FitResultContainer:
         """
         return np.sqrt(np.diag(self.get_parameters_covariance()))
 
+    def get_chi2(self):
+        """Gets the sum of squared (weighted) residuals at the optimum.
+
+        Returns:
+            (float):
+                Chi squared.
+        """
+        return self.chi2
+
+    def get_dof(self):
+        """Gets the degrees of freedom: number of residuals minus number of parameters.
+
+        Returns:
+            (int):
+                Degrees of freedom.
+        """
+        return self.dof
+
+    def get_chi2_reduced(self):
+        """Gets chi squared divided by the degrees of freedom. NaN if there are no degrees of freedom.
+
+        Returns:
+            (float):
+                Reduced chi squared.
+        """
+        dof = self.get_dof()
+        return self.get_chi2()/dof if dof > 0 else np.nan
+
     def get_xdata(self):
         """Gets the x component of all the data.
 
@@ -167,25 +305,133 @@ class FitResultContainer:
         """
         return np.array(self.data.get_selected()).T
 
-    def prop_errors(self):
+    def _gradient_matrix_(self, x):
+        """Evaluates `gradient` at every `x`. Returns an array of shape (number of parameters, len(x)) or None."""
+        parameters = self.get_parameters()
+        n = len(parameters)
+        try: # Vectorized call, most gradients broadcast over x
+            grad = np.asarray(self.gradient(x, *parameters), dtype=float)
+            if grad.size == n*x.size:
+                return grad.reshape(n, x.size)
+        except (ValueError, TypeError):
+            pass
+        try: # Gradients with constant components only work with scalars
+            grad = np.empty((n, x.size))
+            for i, xi in enumerate(x):
+                grad[:, i] = np.asarray(self.gradient(xi, *parameters), dtype=float).reshape(n)
+        except (ValueError, TypeError):
+            return None
+        return grad
+
+    def prop_errors(self, x=None):
         """ Return the error of the fit, given a gradient of a function.
 
+        Parameters:
+            x (NDArray[float] | None, optional):
+                Points where errors are computed. Defaults to `get_fit_xdata()`.
+
         Returns:
-            (Tuple[float]):
-                errors of the fit
+            (NDArray[float] | None):
+                errors of the fit, None if the gradient is not supported.
         """
+        x = np.atleast_1d(np.asarray(self.get_fit_xdata() if x is None else x, dtype=float))
         try:
-            x_array = self.get_fit_xdata()
-            errors = np.zeros((len(x_array)))
-            cov = self.get_parameters_covariance()
-
-            for i,x in enumerate(x_array):
-                grad = self.gradient(x, *self.get_parameters())
-                errors[i] = np.sqrt( float(grad.T @ cov @ grad))
+            grad = self._gradient_matrix_(x)
         except AttributeError:
             return None
-        return errors
+        if grad is None:
+            return None
+        cov = self.get_parameters_covariance()
+        variance = np.einsum('in,ij,jn->n', grad, cov, grad)
+        return np.sqrt(np.clip(variance, 0, None))
+
+    def memory_items(self):
+        """Yields the large arrays held by the result, for memory accounting. The fitted data is not included.
+
+        Returns:
+            (Iterator[tuple[str, Any]]):
+                Category ("fit diagnostics" or "fit curve caches") and value holding arrays.
+        """
+        yield "fit diagnostics", self.diagnostics
+        yield "fit curve caches", self._curve_cache_
+
+    def get_fit_grid(self, only_selected: bool=True, resolution: int|None=None):
+        """Sorted x grid used to draw the fit curve and its error band. Data x values are used if there are
+        fewer than `resolution`, otherwise `resolution` equally spaced points in the data range.
+
+        Parameters:
+            only_selected (bool, optional):
+                Use the range of selected data. If no data is selected all data is used. Defaults to True.
+            resolution (int | None, optional):
+                Maximum number of points. Defaults to `FitResultContainer.grid_resolution`.
+
+        Returns:
+            (NDArray[float]):
+                Sorted x grid.
+        """
+        resolution = self.grid_resolution if resolution is None else resolution
+        xdata = self.data.get_selected()[0] if only_selected else self.data.xdata
+        if len(xdata) == 0:
+            xdata = self.data.xdata
+        if len(xdata) <= resolution:
+            return np.unique(xdata)
+        return np.linspace(np.min(xdata), np.max(xdata), resolution)
+
+    def get_curve(self, xmin: float, xmax: float, n: int):
+        """Evaluates the fit on `n` equally spaced points between `xmin` and `xmax`. The last curve is cached.
+
+        Parameters:
+            xmin (float):
+                Grid start.
+            xmax (float):
+                Grid end.
+            n (int):
+                Number of points.
+
+        Returns:
+            (NDArray[float]):
+                Fit values on the grid.
+        """
+        key = (xmin, xmax, n)
+        cached = self._curve_cache_
+        if cached is None or cached[0] != key:
+            y = np.broadcast_to(np.asarray(self.evaluate(np.linspace(xmin, xmax, n)), dtype=float), (n,))
+            cached = (key, y)
+            self._curve_cache_ = cached
+        return cached[1]
+
+    def error_band(self, only_selected: bool=True, resolution: int|None=None):
+        """Returns the polygon of the fit confidence band as one array of shape (2N+4, 2).
+        First the upper curve from left to right, between the fit values at both ends, then the lower curve from right to left.
+        It is evaluated on `get_fit_grid`, so its size does not grow with the data.
+
+        Parameters:
+            only_selected (bool, optional):
+                Only cover selected data range. Defaults to True.
+            resolution (int | None, optional):
+                Maximum number of grid points N. Defaults to `FitResultContainer.grid_resolution`.
+
+        Returns:
+            (NDArray[float] | None):
+                Band vertices, None if errors in the function are not supported.
+        """
+        x = self.get_fit_grid(only_selected, resolution)
+        error_fit = self.prop_errors(x)
+        if error_fit is None or x.size == 0:
+            return None
 
+        n = x.size
+        y = self.evaluate(x)
+        band = np.empty((2*n + 4, 2))
+        band[0] = x[0], y[0]
+        band[1:n+1, 0] = x
+        band[1:n+1, 1] = y + error_fit
+        band[n+1] = x[-1], y[-1]
+        band[n+2] = x[-1], y[-1]
+        band[n+3:2*n+3, 0] = x[::-1]
+        band[n+3:2*n+3, 1] = (y - error_fit)[::-1]
+        band[2*n+3] = x[0], y[0]
+        return band
 
     def get_fit_xdata(self):
         """Gets the x component of the fit curve. Equal to get_xdata output.
@@ -248,7 +494,7 @@ class FitResultContainer:
             (str):
                 Scipy output message.
         """
-        return self.scipy_output["mesg"]
+        return self.mesg
     
     def evaluate(self, x):
         """Evaluates the given `x` in the fitting function with the optimal parameters.
@@ -265,7 +511,8 @@ class FitResultContainer:
     
     def error_verts(self, only_selected: bool=True):
         """Returns a tuple of two lists of points representing the error of the optimization. 
-        Each lists size is Nx2 or None if errors in the function are not supported.
+        Each lists size is (N+2)x2 or None if errors in the function are not supported.
+        Kept for compatibility, `error_band` returns the same points as one array.
 
         Parameters:
             only_selected (bool):
@@ -274,16 +521,13 @@ class FitResultContainer:
         Returns:
             (tuple[list]|tuple[None]): Positive and negative error points.
         """
-        xdata, _  = self.data.get_selected() if only_selected else self.data.get_data().T
-        error_fit = self.prop_errors()
-        if error_fit is not None:
-            iy_pos = self.evaluate(xdata)+error_fit
-            verts_positive = [(xdata[0],self.evaluate(xdata[0])), *zip(xdata,iy_pos), (xdata[len(xdata)-1],self.evaluate(xdata[len(xdata)-1]))]
-            
-            iy_neg = self.evaluate(xdata)-error_fit
-            verts_negative = [(xdata[0],self.evaluate(xdata[0])), *zip(xdata,iy_neg), (xdata[len(xdata)-1],self.evaluate(xdata[len(xdata)-1]))]
-            return verts_positive, verts_negative
-        return (None, None)
+        band = self.error_band(only_selected)
+        if band is None:
+            return (None, None)
+        n = (len(band) - 4)//2
+        verts_positive = list(map(tuple, band[:n+2]))
+        verts_negative = list(map(tuple, band[n+2:][::-1]))
+        return verts_positive, verts_negative
                 
 
     def __str__(self):
@@ -15,16 +15,22 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from matplotlib.lines import Line2D
-
     from .. import Fitter
 
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.lines import Line2D
 
 
 class FitSelector:
+    resolution: int = 500 # Points of the shared x grid
+    pick_radius: float = 5. # Maximum distance to a curve in pixels for a click to select it
+
     def __init__(self, app: Fitter):
         """Allows to select fits inside a figure, via click.
+        All fits are drawn as one LineCollection evaluated on a shared x grid. Curves are cached in each fit.
 
         Args:
             app (Fitter): Fitter aplication source of fits and data.
@@ -32,33 +38,96 @@ class FitSelector:
         self.app = app
         
         self.fig, self.ax = plt.subplots()
-        x_data, y_data = self.app.data.get_data().T
-        line_data, = self.ax.plot(x_data, y_data, '.', c='black', label="data")
+        x_data, y_data = self.app.data.xdata, self.app.data.ydata
+        self.ax.plot(x_data, y_data, '.', c='black', label="data")
         
         self._key : int|list[int]
         self._mode_: str
-        self.fit_lines: list[Line2D] = [line_data]
-        self.legend_to_lines_map: dict[Line2D, Line2D] = {}
-        self.lines_to_hash: dict[Line2D, int] = {}
-        
-        for key, fit in self.app.fits.items():
-            line, = self.ax.plot(fit.get_fit_xdata(), fit.get_fit_ydata(), label=f"{fit.fit_manager.name}:{key}")
-            self.fit_lines.append(line)
-            self.lines_to_hash.update({line : key})
-            
+        self.legend_to_index: dict[Line2D, int] = {}
+        self.cids: list[int] = []
+
+        self.keys: list[int] = list(self.app.fits.keys())
+        self.visible = np.ones(len(self.keys), dtype=bool)
+
+        finite = x_data[np.isfinite(x_data)]
+        xmin, xmax = (finite.min(), finite.max()) if finite.size else (0., 1.)
+        self.x = np.linspace(xmin, xmax, self.resolution)
+        self.curves = np.empty((len(self.keys), self.resolution))
+        for i, key in enumerate(self.keys):
+            self.curves[i] = self.app.fits[key].get_curve(xmin, xmax, self.resolution)
+
+        segments = np.empty((len(self.keys), self.resolution, 2))
+        segments[:, :, 0] = self.x
+        segments[:, :, 1] = self.curves
+        cycle = plt.rcParams['axes.prop_cycle'].by_key().get('color', ['C0'])
+        self.colors = np.array([to_rgba(cycle[i % len(cycle)]) for i in range(len(self.keys))]).reshape(-1, 4)
+        self.collection = LineCollection(segments, colors=self.colors)
+        self.ax.add_collection(self.collection)
+        self.ax.autoscale_view()
+
+    def _set_visible_(self, index: int, visible: bool):
+        """Shows or dims the curve of one fit."""
+        self.visible[index] = visible
+        colors = self.colors.copy()
+        colors[~self.visible, 3] = 0.1
+        self.collection.set_colors(colors)
+
+    def pick(self, event):
+        """Finds the fit curve closest to a mouse event.
+
+        Parameters:
+            event (MouseEvent):
+                Mouse event inside the axes.
+        Returns:
+            (int | None):
+                Row of the fit in `self.keys`, None if no curve is closer than `pick_radius` pixels.
+        """
+        if event.inaxes is not self.ax or not self.keys:
+            return None
+        # Only grid segments around the click can be close enough
+        to_display = self.ax.transData
+        (px0, _), (px1, _) = to_display.transform(((self.x[0], 0), (self.x[-1], 0)))
+        spacing = abs(px1 - px0)/max(self.resolution - 1, 1)
+        window = int(np.ceil(self.pick_radius/spacing)) + 1 if spacing > 0 else self.resolution
+        j = int(np.searchsorted(self.x, event.xdata))
+        lo, hi = max(j - window, 0), min(j + window, self.resolution - 1)
+        if hi <= lo:
+            return None
+
+        points = to_display.transform(
+            np.column_stack((np.broadcast_to(self.x[lo:hi+1], self.curves[:, lo:hi+1].shape).ravel(),
+                             self.curves[:, lo:hi+1].ravel()))
+        ).reshape(len(self.keys), hi - lo + 1, 2)
+
+        # Distance from click to every segment of every curve
+        a, b = points[:, :-1], points[:, 1:]
+        click = np.array((event.x, event.y))
+        ab = b - a
+        length2 = np.einsum('fsk,fsk->fs', ab, ab)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.clip(np.einsum('fsk,fsk->fs', click - a, ab)/length2, 0, 1)
+        t = np.nan_to_num(t)
+        closest = a + t[..., None]*ab
+        distance = np.nanmin(np.hypot(*(closest - click).transpose(2, 0, 1)), axis=1)
+        distance[~np.isfinite(distance)] = np.inf
+
+        index = int(np.argmin(distance))
+        return index if distance[index] <= self.pick_radius else None
 
     def set_multiple_selection_mode(self):
         """Starts multiple selection mode picker and sets title.
         """
-        self.ax.set_title('Click on legend line to toggle line on/off')
+        self.ax.set_title('Click on a line or its legend to toggle it on/off')
         self._mode_ = 'm'
-        legend = self.ax.legend()
+        handles = [Line2D([], [], color=c) for c in self.colors]
+        legend = self.ax.legend(handles, [f"{self.app.fits[k].fit_manager.name}:{k}" for k in self.keys])
         
-        for legend_line, original_line in zip(legend.get_lines(), self.fit_lines):
+        for i, legend_line in enumerate(legend.get_lines()):
             legend_line.set_picker(True)
-            self.legend_to_lines_map[legend_line] = original_line
+            self.legend_to_index[legend_line] = i
             
-        self.fig.canvas.mpl_connect('pick_event', self.on_pick_multiple)
+        self.cids.append(self.fig.canvas.mpl_connect('pick_event', self.on_pick_multiple))
+        self.cids.append(self.fig.canvas.mpl_connect('button_press_event', self.on_click_multiple))
         self.fig.show()
     
     def set_single_selection_mode(self):
@@ -66,41 +135,48 @@ class FitSelector:
         """
         self.ax.set_title('Click line to select it')
         self._mode_ = 's'
-        for line in self.fit_lines:
-            line.set_picker(True)
-            
-        self.fig.canvas.mpl_connect('pick_event', self.on_pick_single)
+        self.cids.append(self.fig.canvas.mpl_connect('button_press_event', self.on_pick_single))
         self.fig.show()
-        
+
+    def _toggle_(self, index: int):
+        visible = not self.visible[index]
+        self._set_visible_(index, visible)
+        for legend_line, i in self.legend_to_index.items():
+            if i == index:
+                legend_line.set_alpha(1.0 if visible else 0.2)
+        self.fig.canvas.draw_idle()
         
     def on_pick_multiple(self, event):
-        """Pick event for multiple selection mode.
+        """Pick event for multiple selection mode. Toggles the fit of the legend line picked.
         """
-        legline = event.artist
-        origline = self.legend_to_lines_map[legline]
-        visible = not origline.get_visible()
-        origline.set_visible(visible)
-        
-        legline.set_alpha(1.0 if visible else 0.2)
-        self.fig.canvas.draw()
+        index = self.legend_to_index.get(event.artist)
+        if index is not None:
+            self._toggle_(index)
+
+    def on_click_multiple(self, event):
+        """Click event for multiple selection mode. Toggles the closest fit.
+        Clicks on the legend are left to `on_pick_multiple`.
+        """
+        legend = self.ax.get_legend()
+        if legend is not None and legend.contains(event)[0]:
+            return
+        index = self.pick(event)
+        if index is not None:
+            self._toggle_(index)
 
     def on_pick_single(self, event):
-        """Pick event for single selection mode.
+        """Click event for single selection mode.
         """
-        k = self.lines_to_hash.get(event.artist)
-        if isinstance(k, int):
-            self._key = k
+        index = self.pick(event)
+        if index is None:
+            return
+        self._key = self.keys[index]
         self.fig.canvas.stop_event_loop()
-        return 
         
     def get_selected_from_figure(self):
         """Gets the lines selected on multiple selection mode based on visibility.
         """
-        result: list[int] = []
-        for line in self.fit_lines:
-            if line.get_visible():
-                if val := self.lines_to_hash.get(line):
-                    result.append(val) 
+        result: list[int] = [k for k, visible in zip(self.keys, self.visible) if visible]
         self.fig.canvas.stop_event_loop()
         self._key = result
 
@@ -112,6 +188,8 @@ class FitSelector:
         """
         if self._mode_ == 'm':
             self.get_selected_from_figure()
+        for cid in self.cids:
+            self.fig.canvas.mpl_disconnect(cid)
         plt.close(self.fig)
         return self._key
     
@@ -144,4 +222,3 @@ class FitSelector:
         self.fig.show()
         self.fig.canvas.start_event_loop()
         return self
-        
\ No newline at end of file
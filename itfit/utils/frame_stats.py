@@ -0,0 +1,244 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .blit_manager import BlitManager
+
+import time
+
+import numpy as np
+
+
+class FrameRecorder:
+    """Fixed size ring buffer of frame timings, filled by `BlitManager.draw` and `DragPointManager.on_mouse_move`.
+
+    For each frame it keeps the latency from the oldest pointer event drawn in that frame to the end of the
+    blit, the draw duration, whether the frame was a full redraw and how many pointer events were coalesced
+    into it. Frames without pointer events (e.g. after a fit) have NaN latency. Totals are kept for the whole
+    session, percentiles and histograms only cover the last `capacity` frames.
+    """
+    FIELDS = ("latency", "duration", "coalesced")
+
+    def __init__(self, capacity: int=1024):
+        """Creates an empty FrameRecorder.
+
+        Parameters:
+            capacity (int, optional):
+                Number of frames kept. Defaults to 1024.
+        """
+        if capacity < 1:
+            raise Exception("capacity must be a positive integer.")
+        self.capacity = capacity
+        self._end_ = np.full(capacity, np.nan)
+        self._latency_ = np.full(capacity, np.nan)
+        self._duration_ = np.full(capacity, np.nan)
+        self._full_ = np.zeros(capacity, dtype=bool)
+        self._coalesced_ = np.zeros(capacity, dtype=np.int32)
+        self.reset()
+
+    def reset(self):
+        """Forgets every frame and event recorded."""
+        self.frames = 0
+        self.frame_counts = {"blit": 0, "full": 0}
+        self.events = 0
+        self.coalesced = 0
+        self._first_event_: float|None = None
+        self._pending_events_ = 0
+        self._end_[:] = np.nan
+        self._latency_[:] = np.nan
+        self._duration_[:] = np.nan
+
+    def event(self):
+        """Records a pointer event. The event is drawn by the next frame."""
+        self.events += 1
+        self._pending_events_ += 1
+        if self._first_event_ is None:
+            self._first_event_ = time.perf_counter()
+
+    def frame(self, kind: str, start: float):
+        """Records a frame that just finished.
+
+        Parameters:
+            kind (str):
+                "blit" or "full".
+            start (float):
+                `time.perf_counter()` when drawing started.
+        """
+        end = time.perf_counter()
+        i = self.frames % self.capacity
+        self._end_[i] = end
+        self._duration_[i] = end - start
+        self._latency_[i] = end - self._first_event_ if self._first_event_ is not None else np.nan
+        self._full_[i] = kind == "full"
+        self._coalesced_[i] = max(0, self._pending_events_ - 1)
+
+        self.coalesced += self._coalesced_[i]
+        self.frames += 1
+        self.frame_counts[kind] += 1
+        self._first_event_ = None
+        self._pending_events_ = 0
+
+    def _kept_(self):
+        """Slice of the ring buffer holding recorded frames. Order does not matter for statistics."""
+        return slice(0, min(self.frames, self.capacity))
+
+    def values(self, field: str="latency", kind: str|None=None):
+        """Returns recorded values of the frames kept, in seconds for times.
+
+        Parameters:
+            field (str, optional):
+                "latency", "duration" or "coalesced". Defaults to "latency".
+            kind (str | None, optional):
+                Only "blit" or "full" frames. Defaults to None, every frame.
+        Returns:
+            (NDArray):
+                Values, NaN latencies are dropped.
+        """
+        if field not in self.FIELDS:
+            raise Exception(f"Unknown field '{field}'. Use one of {', '.join(self.FIELDS)}.")
+        kept = self._kept_()
+        values = getattr(self, f"_{field}_")[kept]
+        if kind is not None:
+            values = values[self._full_[kept] == (kind == "full")]
+        if values.dtype.kind == 'f':
+            values = values[~np.isnan(values)]
+        return values
+
+    def histogram(self, field: str="latency", bins=20, range: tuple|None=None, kind: str|None=None):
+        """Histogram of a recorded field. Times are in milliseconds.
+
+        Parameters:
+            field (str, optional):
+                "latency", "duration" or "coalesced". Defaults to "latency".
+            bins (int | list[float], optional):
+                Bins, as in `numpy.histogram`. Defaults to 20.
+            range (tuple | None, optional):
+                Range of the bins, as in `numpy.histogram`. Defaults to None.
+            kind (str | None, optional):
+                Only "blit" or "full" frames. Defaults to None, every frame.
+        Returns:
+            (tuple[NDArray[int], NDArray[float]]):
+                Counts and bin edges.
+        """
+        values = self.values(field, kind)
+        if field != "coalesced":
+            values = 1e3*values
+        return np.histogram(values, bins=bins, range=range)
+
+    def percentiles(self, q=(50, 90, 99), field: str="latency", kind: str|None=None):
+        """Percentiles of a recorded field. Times are in milliseconds.
+
+        Parameters:
+            q (list[float], optional):
+                Percentiles. Defaults to (50, 90, 99).
+            field (str, optional):
+                "latency", "duration" or "coalesced". Defaults to "latency".
+            kind (str | None, optional):
+                Only "blit" or "full" frames. Defaults to None, every frame.
+        Returns:
+            (NDArray[float]):
+                Percentiles, NaN if there are no frames.
+        """
+        values = self.values(field, kind)
+        if values.size == 0:
+            return np.full(len(q), np.nan)
+        return np.percentile(values, q) * (1 if field == "coalesced" else 1e3)
+
+    def fps(self, window: float=1.):
+        """Frames drawn per second over the last `window` seconds.
+
+        Parameters:
+            window (float, optional):
+                Time window in seconds. Defaults to 1.
+        Returns:
+            (float):
+                Frames per second.
+        """
+        ends = self._end_[self._kept_()]
+        return np.count_nonzero(ends > time.perf_counter() - window) / window
+
+    def summary(self):
+        """Returns session totals and latency percentiles of the frames kept.
+
+        Returns:
+            (dict):
+                Frames, blit and full counts, events, coalesced events, frames per second and latency percentiles in ms.
+        """
+        p50, p90, p99 = self.percentiles()
+        return {
+            "frames": self.frames,
+            "blit": self.frame_counts["blit"],
+            "full": self.frame_counts["full"],
+            "events": self.events,
+            "coalesced": self.coalesced,
+            "fps": self.fps(),
+            "latency_p50": p50,
+            "latency_p90": p90,
+            "latency_p99": p99,
+        }
+
+    def __repr__(self):
+        s = self.summary()
+        return (f"FrameRecorder({s['frames']} frames ({s['blit']} blit, {s['full']} full), {s['events']} events, "
+                f"{s['coalesced']} coalesced, latency p50/p90/p99 {s['latency_p50']:.1f}/{s['latency_p90']:.1f}/{s['latency_p99']:.1f} ms)")
+
+
+class FPSOverlay:
+    """Text in a corner of the axes showing frames per second and latency of a FrameRecorder.
+    It is a blitted artist redrawn on every frame, also while dragging."""
+    persistent = True # Shown even when the BlitManager is disabled
+    live = True # Always in the drag layer
+
+    def __init__(self, blit_manager: BlitManager, recorder: FrameRecorder):
+        """Creates an FPSOverlay and adds it to the BlitManager.
+
+        Parameters:
+            blit_manager (BlitManager):
+                Used for automatic ploting.
+            recorder (FrameRecorder):
+                Frame timings shown.
+        """
+        self.blit_manager = blit_manager
+        self.recorder = recorder
+        ax = blit_manager.ax
+        self.poly = ax.text(0.99, 0.99, "", transform=ax.transAxes, ha="right", va="top",
+                            family="monospace", fontsize=8, animated=True)
+        self.blit_manager.add_artist(self)
+
+    def update(self):
+        """Updates the text with the latest statistics."""
+        p50, p99 = self.recorder.percentiles((50, 99))
+        self.poly.set_text(f"{self.recorder.fps():.0f} fps  {p50:.1f}/{p99:.1f} ms")
+
+    def remove(self):
+        """Removes the text from the axes and the BlitManager."""
+        self.blit_manager.remove_artist(self)
+        self.poly.remove()
+
+
+if __name__=='__main__':
+    recorder = FrameRecorder(capacity=4)
+    for i in range(6):
+        recorder.event()
+        recorder.event()
+        recorder.frame("blit" if i else "full", time.perf_counter())
+    assert recorder.frames == 6 and recorder.frame_counts["full"] == 1     , "count error"
+    assert recorder.coalesced == 6                                          , "coalesced error"
+    assert recorder.values().size == 4                                      , "ring buffer error"
+    assert recorder.histogram(bins=3)[0].sum() == 4                         , "histogram error"
+    recorder.frame("full", time.perf_counter())
+    assert recorder.values("latency").size == 3                             , "latency without events error"
+    print("All tests OK")
@@ -0,0 +1,251 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .. import Fitter
+
+import tracemalloc
+
+import numpy as np
+
+
+def _root_(array: np.ndarray):
+    """Array that owns the memory of `array`."""
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+class MemoryReport:
+    """Bytes held by a Fitter session, by category and by item. Arrays shared by several items are counted
+    once, in the first category walked. Memory mapped arrays are reported apart, in `disk_bytes`."""
+    def __init__(self):
+        """Creates an empty MemoryReport."""
+        self.entries: list[tuple[str, str, int]] = [] # (category, item, bytes)
+        self.disk_bytes = 0
+        self.fit_memory: list[dict] = [] # tracemalloc differences around fits, see `Fitter.trace_fit_memory`
+        self._seen_ = set()
+
+    def _array_bytes_(self, array: np.ndarray):
+        root = _root_(array)
+        if id(root) in self._seen_:
+            return 0
+        self._seen_.add(id(root))
+        if isinstance(root, np.memmap):
+            self.disk_bytes += root.nbytes
+            return 0
+        return root.nbytes
+
+    def _walk_(self, value, depth: int, visited: set):
+        """Bytes of the arrays reachable from `value`. Only itfit objects and builtin containers are followed."""
+        if isinstance(value, np.ndarray):
+            return self._array_bytes_(value)
+        if depth == 0 or id(value) in visited:
+            return 0
+        visited.add(id(value))
+
+        if isinstance(value, dict):
+            values = value.values()
+        elif isinstance(value, (list, tuple, set)):
+            values = value
+        elif type(value).__module__.startswith("itfit"):
+            # Attributes only, properties (e.g. StreamingDataSelection views) are not followed
+            values = [getattr(value, name, None) for name in getattr(value, "__slots__", ())]
+            values += list(getattr(value, "__dict__", {}).values())
+        else:
+            return 0
+        return sum(self._walk_(v, depth-1, visited) for v in values)
+
+    def add(self, category: str, item: str, value, depth: int=4):
+        """Adds the arrays reachable from `value`.
+
+        Parameters:
+            category (str):
+                Category, e.g. "data" or "artists".
+            item (str):
+                Item name shown in `largest`.
+            value (Any):
+                Array, itfit object or container.
+            depth (int, optional):
+                Maximum depth followed. Defaults to 4.
+        """
+        self.add_bytes(category, item, self._walk_(value, depth, set()))
+
+    def add_bytes(self, category: str, item: str, nbytes: int):
+        """Adds an item of known size."""
+        if nbytes:
+            self.entries.append((category, item, int(nbytes)))
+
+    def total(self):
+        """Total bytes in memory.
+
+        Returns:
+            (int): Bytes.
+        """
+        return sum(e[2] for e in self.entries)
+
+    def by_category(self):
+        """Bytes per category, largest first.
+
+        Returns:
+            (dict[str, int]): Category to bytes.
+        """
+        categories = {}
+        for category, _, nbytes in self.entries:
+            categories[category] = categories.get(category, 0) + nbytes
+        return dict(sorted(categories.items(), key=lambda c: -c[1]))
+
+    def largest(self, n: int=10):
+        """Largest items.
+
+        Parameters:
+            n (int, optional):
+                Number of items. Defaults to 10.
+        Returns:
+            (list[tuple[str, str, int]]): Category, item and bytes of each item.
+        """
+        return sorted(self.entries, key=lambda e: -e[2])[:n]
+
+    def table(self, n: int=10):
+        """Returns the report as text.
+
+        Parameters:
+            n (int, optional):
+                Number of largest items shown. Defaults to 10.
+        Returns:
+            (str): Report.
+        """
+        def size(nbytes):
+            for unit in ("B", "kB", "MB", "GB"):
+                if abs(nbytes) < 1024 or unit == "GB":
+                    return f"{nbytes:.1f} {unit}" if unit != "B" else f"{nbytes} B"
+                nbytes /= 1024
+
+        lines = [f"{'category':<20}{'size':>12}"]
+        lines += [f"{category:<20}{size(nbytes):>12}" for category, nbytes in self.by_category().items()]
+        lines.append(f"{'total':<20}{size(self.total()):>12}")
+        if self.disk_bytes:
+            lines.append(f"{'memory mapped':<20}{size(self.disk_bytes):>12}")
+        lines.append("")
+        lines.append("largest items:")
+        lines += [f"  {size(nbytes):>10}  {category}: {item}" for category, item, nbytes in self.largest(n)]
+        for trace in self.fit_memory[-n:]:
+            lines.append(f"fit {trace['label']}: {size(trace['difference'])} allocated")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.table()
+
+
+class FitMemoryTracer:
+    """Takes tracemalloc snapshots around fits and keeps the differences. Used by `Fitter.trace_fit_memory`.
+    Tracing slows Python allocations down, so it is only active while this object is."""
+    def __init__(self, top: int=10):
+        """Creates a FitMemoryTracer and starts tracemalloc if it was not running.
+
+        Parameters:
+            top (int, optional):
+                Number of allocation sites kept for each fit. Defaults to 10.
+        """
+        self.top = top
+        self.traces: list[dict] = []
+        self._started_ = not tracemalloc.is_tracing()
+        if self._started_:
+            tracemalloc.start()
+
+    def snapshot(self):
+        """Takes a snapshot. Returns None if tracemalloc was stopped by someone else."""
+        if not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.take_snapshot()
+
+    def record(self, before, label: str):
+        """Stores the difference between `before` and now.
+
+        Parameters:
+            before (tracemalloc.Snapshot | None):
+                Snapshot taken when the fit started.
+            label (str):
+                Fit label.
+        """
+        after = self.snapshot()
+        if before is None or after is None:
+            return
+        statistics = after.compare_to(before, 'lineno')
+        self.traces.append({
+            "label": label,
+            "difference": sum(s.size_diff for s in statistics),
+            "top": [(str(s.traceback), s.size_diff, s.count_diff) for s in statistics[:self.top]],
+        })
+
+    def stop(self):
+        """Stops tracemalloc if this tracer started it."""
+        if self._started_ and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_ = False
+
+
+def memory_report(app: Fitter):
+    """Walks data, selections, fits, blitting bitmaps and figure artists of a Fitter. See `Fitter.memory_report`.
+
+    Returns:
+        (MemoryReport): Report.
+    """
+    report = MemoryReport()
+
+    # Selection colors first, they are also reachable from the data
+    for name, data in [("data", app.data), *[(f"selection {k}", s) for k, s in app.selections.items()]]:
+        report.add("colors", f"{name} colors", getattr(data, "collection_facecolors", None))
+        collection = getattr(data, "collection", None)
+        if collection is not None:
+            report.add("colors", f"{name} collection colors", collection.get_facecolors())
+
+    report.add("data", "data", app.data)
+    report.add("data", "filters", app.filters)
+    for key, selection in app.selections.items():
+        report.add("selections", f"selection {key}", selection)
+
+    for category, item, value in app.fits.memory_items():
+        report.add(category, item, value)
+
+    for ax, compositor in app.blit_manager.compositors.items():
+        for layer in ("background", "overlay"):
+            region = getattr(compositor, layer)
+            if region is not None:
+                report.add_bytes("blit bitmaps", f"{layer} of {ax.get_label() or 'axes'}",
+                                 4*ax.bbox.width*ax.bbox.height)
+
+    for artist in app.figure.findobj():
+        values = list(vars(artist).values())
+        values += [getattr(v, "vertices", None) for v in values] + [getattr(v, "codes", None) for v in values]
+        paths = getattr(artist, "_paths", None) or ()
+        values += [p.vertices for p in paths if hasattr(p, "vertices")]
+        label = artist.get_label() if hasattr(artist, "get_label") else ""
+        report.add("artists", f"{type(artist).__name__} {label}".strip(), [v for v in values if isinstance(v, np.ndarray)], depth=2)
+
+    if app.memory_tracer is not None:
+        report.fit_memory = list(app.memory_tracer.traces)
+    return report
+
+
+if __name__=='__main__':
+    report = MemoryReport()
+    a = np.zeros(1000)
+    report.add("data", "a", a)
+    report.add("copies", "view of a", [a[10:], a.copy()])
+    assert report.by_category() == {"data": 8000, "copies": 8000}          , "shared array counted twice"
+    assert report.largest(1)[0][1] in ("a", "view of a")                    , "largest error"
+    print("All tests OK")
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import itertools
+
 from matplotlib.patches import Circle
 from matplotlib.artist import Artist
 import numpy as np
@@ -69,18 +71,20 @@ class DragPointManager:
         self.canvas = blit_manager.canvas
         
         self.dragpoint.patch.set_transform(None)
+        self.dragpoint.patch.set_animated(True)
         self.blit_manager.ax.add_patch(self.dragpoint.patch)
         
         self.poly = self.dragpoint.patch
         self.connection_callbacks = {}
+        self._cid_counter_ = itertools.count()
         self.restricction_callback = lambda x,y: (x,y)
 
-        self.canvas.mpl_connect('button_press_event', self.on_button_press)
-        self.canvas.mpl_connect('key_press_event', self.on_key_press)
-        self.canvas.mpl_connect('button_release_event', self.on_button_release)
-        self.canvas.mpl_connect('motion_notify_event', self.on_mouse_move)
-        
         self._ind_ = None # Used for enabling mouse motion.
+        self._pending_xy_ = None # Latest pointer position not yet drawn.
+
+        # Canvas events are received through the canvas dispatcher
+        self.dispatcher = blit_manager.dispatcher
+        self.dispatcher.add(self)
 
     def connect(self, function):
         """Connects a callback for change envents. 
@@ -92,7 +96,7 @@ class DragPointManager:
             (Int):
                 Connection id. Can be used in `DragPointManager.disconnect`.
         """
-        cin = np.random.randint(1000000)
+        cin = next(self._cid_counter_)
         self.connection_callbacks.update({cin: function})
         return cin
     
@@ -107,6 +111,16 @@ class DragPointManager:
         if cid in self.connection_callbacks.keys():
             self.connection_callbacks.pop(cid)
             
+    def remove(self):
+        """Removes the point from the figure, stops receiving canvas events and drops all change callbacks."""
+        self.dispatcher.remove(self)
+        self.connection_callbacks.clear()
+        self._pending_xy_ = None
+        self.blit_manager._pending_.pop(self, None)
+        if self.blit_manager.bind_motion == self._ind_:
+            self.blit_manager.bind_motion = None
+        self.dragpoint.remove()
+
     def add_restriction(self, function):
         """Adds a restriction to point movement. 
         
@@ -151,7 +165,7 @@ class DragPointManager:
         return self.ax.transData.transform((x,y))
 
     def on_button_press(self, event):
-        """Callback for mouse button presses"""
+        """Callback for mouse button presses. The dispatcher only calls it if the point was hit."""
         if event.inaxes is None:
             return
         if event.button != 1:
@@ -159,18 +173,16 @@ class DragPointManager:
         if self.blit_manager.bind_motion != -1:
             return
 
-        x, y = event.xdata, event.ydata
-        x, y = self.set_xy(x, y)
-        if np.hypot(*(self.poly.center - np.array([x,y]))) < 1.5*self.poly.get_radius():
-            self._ind_ = hash(self)
-        
-            self.blit_manager.bind_motion = self._ind_
+        self._ind_ = hash(self)
+        self.blit_manager.bind_motion = self._ind_
     
     def on_button_release(self, event):
         """Callback for mouse button releases"""
         if event.button != 1:
             return
 
+        # Latest position must be drawn before releasing the point
+        self.blit_manager.flush()
         if self.blit_manager.bind_motion == self._ind_:
             self.blit_manager.bind_motion = None
         self._ind_ = 0
@@ -191,18 +203,30 @@ class DragPointManager:
             return
         if self.blit_manager.bind_motion != self._ind_:
             return
+        if self.blit_manager.frame_stats is not None:
+            self.blit_manager.frame_stats.event()
         
-        x, y = event.xdata, event.ydata
+        self._pending_xy_ = (event.xdata, event.ydata)
+        self.blit_manager.schedule(self)
+
+    def apply_pending(self):
+        """Moves the point to the latest pointer position received and runs the callbacks.
+        Called by the BlitManager once per frame."""
+        if self._pending_xy_ is None:
+            return
+        x, y = self._pending_xy_
+        self._pending_xy_ = None
+
         x, y = self.restricction_callback(x, y)
         x, y = self.set_xy(x, y)
 
         prop = {'center': np.array([x,y])}
         Artist.update(self.poly, prop)
+        self.dispatcher.move(self, x, y)
         for k,v in self.connection_callbacks.items():
             v(x,y)
-        
-        self.blit_manager.draw()
 
     def update(self):
         x, y = self.dragpoint.get_center()
-        Artist.update(self.poly, {'center': np.array([x,y])})
\ No newline at end of file
+        Artist.update(self.poly, {'center': np.array([x,y])})
+        self.dispatcher.move(self, x, y)
\ No newline at end of file
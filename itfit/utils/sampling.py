@@ -0,0 +1,130 @@
+# Copyright 2023 Unai Lería Fortea & Pablo Vizcaíno García
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+# http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+
+import numpy as np
+
+
+class AdaptiveSampler:
+    """Samples a function for on-screen preview curves.
+    The function is evaluated once per `pixels_per_sample` display pixels over the visible part of the
+    requested interval. Points are then kept with a density proportional to the square root of the local
+    curvature (in display pixels), so a straight line keeps only its end points while oscillating functions
+    keep pixel resolution. Buffers are reused between calls.
+    """
+    def __init__(self, ax: Axes, pixels_per_sample: float=1., tolerance: float=0.25):
+        """Creates an AdaptiveSampler.
+
+        Parameters:
+            ax (Axes):
+                Axes where the curve is drawn.
+            pixels_per_sample (float, optional):
+                Display pixels between evaluations. Defaults to 1.
+            tolerance (float, optional):
+                Maximum distance in pixels between the drawn polyline and the evaluated curve. Defaults to 0.25.
+        """
+        self.ax = ax
+        self.pixels_per_sample = pixels_per_sample
+        self.tolerance = tolerance
+        self._allocate_(0)
+
+    def _allocate_(self, size: int):
+        """Allocates buffers for `size` samples."""
+        self._size_ = size
+        self._xy_ = np.empty((size, 2))
+        self._density_ = np.empty(size)
+        self._keep_ = np.empty(size, dtype=bool)
+        self._x_out_ = np.empty(size)
+        self._y_out_ = np.empty(size)
+
+    def visible_interval(self, xmin: float, xmax: float):
+        """Clips an interval to the visible x range.
+
+        Parameters:
+            xmin (float):
+                Interval start in data coordinates.
+            xmax (float):
+                Interval end in data coordinates.
+
+        Returns:
+            (tuple[float, float] | None):
+                Visible part of the interval, None if it is not visible.
+        """
+        left, right = sorted(self.ax.get_xlim())
+        xmin, xmax = max(min(xmin, xmax), left), min(max(xmin, xmax), right)
+        if not xmin < xmax:
+            return None
+        return xmin, xmax
+
+    def sample(self, function, args, xmin: float, xmax: float):
+        """Samples `function(x, *args)` between `xmin` and `xmax`.
+
+        Parameters:
+            function (callable):
+                Function with signature `f(x, *args)`.
+            args (tuple[float]):
+                Function arguments.
+            xmin (float):
+                Interval start in data coordinates.
+            xmax (float):
+                Interval end in data coordinates.
+
+        Returns:
+            (tuple[NDArray[float], NDArray[float]]):
+                x and y of the curve in display coordinates. Views of internal buffers, valid until next call.
+        """
+        interval = self.visible_interval(xmin, xmax)
+        if interval is None:
+            return self._x_out_[:0], self._y_out_[:0]
+        xmin, xmax = interval
+
+        transform = self.ax.transData
+        (px_min, _), (px_max, _) = transform.transform(((xmin, 0), (xmax, 0)))
+        n = max(int(np.ceil(abs(px_max - px_min) / self.pixels_per_sample)) + 1, 3)
+        if n > self._size_:
+            self._allocate_(n)
+
+        xy = self._xy_[:n]
+        xy[:, 0] = np.arange(n)
+        xy[:, 0] *= (xmax - xmin)/(n - 1)
+        xy[:, 0] += xmin
+        xy[:, 1] = function(xy[:, 0], *args)
+        display = transform.transform(xy)
+
+        # Local curvature in pixels, one sample per `pixels_per_sample`
+        density = self._density_[:n]
+        density[0] = density[-1] = 0
+        np.subtract(display[2:, 1], 2*display[1:-1, 1], out=density[1:-1])
+        density[1:-1] += display[:-2, 1]
+        np.abs(density, out=density)
+        density /= 8*self.tolerance
+        np.sqrt(density, out=density)
+        np.nan_to_num(density, copy=False, nan=1., posinf=1.)
+        np.minimum(density, 1., out=density)
+        np.cumsum(density, out=density)
+        np.floor(density, out=density)
+
+        keep = self._keep_[:n]
+        keep[0] = keep[-1] = True
+        np.not_equal(density[1:-1], density[:-2], out=keep[1:-1])
+
+        k = int(np.count_nonzero(keep))
+        x_out, y_out = self._x_out_[:k], self._y_out_[:k]
+        np.compress(keep, display[:, 0], out=x_out)
+        np.compress(keep, display[:, 1], out=y_out)
+        return x_out, y_out